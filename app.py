@@ -1,39 +1,216 @@
 """
 Teacher Support - 통합 랜딩 페이지
 FastAPI + Gradio 앱들 통합
+
+지연 모드(TS_LAZY_APPS=1): gradio 를 불러오지 않고 / 와 /static 부터 받는다.
+/blueprint · /counter 는 첫 요청 때, 또는 시작 직후 백그라운드 warm-up(TS_WARMUP=0 이면 끔)에서 만들고, 그다음 계산 풀을 띄운다.
+시작 프로파일(TS_PROFILE_STARTUP=1): 단계별 시작 시간을 기록해 /_diag/startup 으로 보여 준다.
+격리 모드(TS_ISOLATE_APPS=1): /blueprint · /counter 를 각자의 자식 프로세스로 띄우고 Unix 소켓으로 넘긴다.
+자식마다 워커 수는 TS_SUBAPP_WORKERS="/blueprint=2,/counter=1", 상태는 /_diag/apps.
 """
 
-from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
-from pathlib import Path
-import gradio as gr
-from apps.exam_blueprint import create_blueprint_app
-from apps.counter_12345 import create_counter_app
+import time
+
+# 시작 시각은 다른 모듈을 불러오기 전에 잰다
+STARTUP_STATS = {"started": time.perf_counter()}
+
+from apps.startup_profile import StartupProfile
+
+startup_profile = StartupProfile(STARTUP_STATS["started"])
+
+with startup_profile.phase("import fastapi"):
+    import asyncio
+    import hashlib
+    import logging
+    import os
+    import re
+    import tempfile
+    from contextlib import asynccontextmanager
+    from email.utils import formatdate, parsedate_to_datetime
+
+    from fastapi import FastAPI, Request
+    from fastapi.responses import HTMLResponse, JSONResponse, Response
+    from pathlib import Path
+    from apps import compute_pool
+    from apps.isolation import SubAppProcess, parse_workers
+    from apps.lazy_apps import FirstByteTimer, LazyGradioApp, build_blocks
+    from apps.static_assets import ETAG_SUFFIX, PrecompressedStatic, compress_bytes, pick_encoding
+
+BASE_DIR = Path(__file__).parent
+TEMPLATE_PATH = BASE_DIR / "templates" / "index.html"
+# 개발 모드(TS_DEV=1): 템플릿 파일이 바뀌면 요청 때 다시 렌더링
+DEV_MODE = os.environ.get("TS_DEV", "") == "1"
+LAZY_APPS = os.environ.get("TS_LAZY_APPS", "") == "1"
+WARMUP = os.environ.get("TS_WARMUP", "1") != "0"
+ISOLATE_APPS = os.environ.get("TS_ISOLATE_APPS", "") == "1"
+SUBAPP_WORKERS = parse_workers(os.environ.get("TS_SUBAPP_WORKERS", ""))
+# 경로 → Blocks 를 만드는 함수 ('모듈:함수')
+SUB_APPS = {
+    "/blueprint": "apps.exam_blueprint:create_blueprint_app",
+    "/counter": "apps.counter_12345:create_counter_app",
+}
+lazy_apps = []
+isolated_apps = []
+logger = logging.getLogger("uvicorn.error")
+
+
+async def _warm_up():
+    for lazy in lazy_apps:
+        try:
+            await lazy.ensure()
+        except Exception:
+            logger.exception("%s warm-up 실패 (첫 요청 때 다시 시도)", lazy.path)
+    # 계산 풀은 하위 앱을 다 만든 뒤에 (forkserver 의 gradio 불러오기가 시작 시간과 CPU 를 다투지 않게).
+    # 하위 앱이 있는 프로세스에서만 — 격리 모드면 자식 프로세스가 띄운다
+    if not ISOLATE_APPS:
+        await compute_pool.warm_up()
+
+
+@asynccontextmanager
+async def lifespan(app):
+    STARTUP_STATS["ready"] = time.perf_counter() - STARTUP_STATS["started"]
+    mode = "격리" if ISOLATE_APPS else "지연" if LAZY_APPS else "즉시"
+    logger.info("요청 받을 준비 %.2f초 (%s 모드)", STARTUP_STATS["ready"], mode)
+    if startup_profile.enabled:
+        logger.info("시작 단계: %s", startup_profile.summary())
+    for sub in isolated_apps:
+        await sub.start()
+    warm = asyncio.create_task(_warm_up()) if WARMUP else None
+    yield
+    if warm is not None:
+        warm.cancel()
+    for lazy in lazy_apps:
+        await lazy.close()
+    for sub in isolated_apps:
+        await sub.close()
+    compute_pool.shutdown()
+
 
 # FastAPI 앱 생성
-app = FastAPI(title="Teacher Support")
+app = FastAPI(title="Teacher Support", lifespan=lifespan)
+app.add_middleware(FirstByteTimer, stats=STARTUP_STATS)
 
-# 정적 파일 마운트
-static_path = Path(__file__).parent / "static"
-app.mount("/static", StaticFiles(directory=str(static_path)), name="static")
+# 정적 파일 마운트 (텍스트 자산은 시작할 때 gzip/brotli 로 미리 압축,
+# 내용 해시 주소 /static/js/main.<해시>.js 는 1년 캐시)
+static_path = BASE_DIR / "static"
+with startup_profile.phase("static precompress"):
+    static_files = PrecompressedStatic(directory=str(static_path), url_prefix="/static")
+app.mount("/static", static_files, name="static")
 
 # Gradio 앱들 생성 및 마운트
-blueprint_app = create_blueprint_app()
-counter_app = create_counter_app()
+if ISOLATE_APPS:
+    socket_dir = tempfile.mkdtemp(prefix="teacher-support-")
+    for path, factory in SUB_APPS.items():
+        sub = SubAppProcess(path, factory, socket_dir, SUBAPP_WORKERS.get(path, 1))
+        isolated_apps.append(sub)
+        app.mount(path, sub)
+elif LAZY_APPS:
+    for path, factory in SUB_APPS.items():
+        lazy = LazyGradioApp(app, path, factory, startup_profile)
+        lazy_apps.append(lazy)
+        app.mount(path, lazy)
+else:
+    with startup_profile.phase("import gradio"):
+        import gradio as gr
+
+    for path, factory in SUB_APPS.items():
+        blocks = build_blocks(path, factory, startup_profile)
+        with startup_profile.phase(f"{path} mount"):
+            app = gr.mount_gradio_app(app, blocks, path=path)
+
+
+# ---------- 랜딩 페이지 (메모리 캐시) ----------
+# Jinja2 의 {{ url_for('static', filename='…') }} → 해시 주소 /static/…
+_URL_FOR = re.compile(r"\{\{\s*url_for\(\s*'static'\s*,\s*filename\s*=\s*'([^']+)'\s*\)\s*\}\}")
+
+
+class LandingPage:
+    """
+    templates/index.html 을 시작할 때 한 번 렌더링해 두고 (본문 + gzip/brotli 본문 + ETag),
+    요청마다 파일을 읽지 않는다. 개발 모드에서는 수정 시각이 바뀌면 다시 렌더링한다.
+    정적 자산 주소는 manifest(AssetManifest)의 내용 해시 주소로 바꾼다.
+    """
+
+    def __init__(self, path, manifest=None):
+        self.path = path
+        self.manifest = manifest
+        self.mtime = None
+        self.load()
+
+    def load(self):
+        mtime = self.path.stat().st_mtime
+        html_content = _URL_FOR.sub(r"/static/\1", self.path.read_text(encoding="utf-8"))
+        if self.manifest is not None:
+            html_content = self.manifest.rewrite_html(html_content)
+        body = html_content.encode("utf-8")
+        self.body = body
+        self.variants = compress_bytes(body)
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        self.last_modified = formatdate(mtime, usegmt=True)
+        self.mtime = mtime
+
+    def refresh(self):
+        if DEV_MODE and self.path.stat().st_mtime != self.mtime:
+            self.load()
+
+    def _not_modified(self, request, etag):
+        inm = request.headers.get("if-none-match")
+        if inm is not None:
+            tags = [t.strip().removeprefix("W/") for t in inm.split(",")]
+            return "*" in tags or etag in tags
+        ims = request.headers.get("if-modified-since")
+        if ims:
+            try:
+                return parsedate_to_datetime(ims).timestamp() >= int(self.mtime)
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def response(self, request):
+        self.refresh()
+        encoding = pick_encoding(request.headers, [e for e in ("br", "gzip") if e in self.variants])
+        etag = self.etag if encoding is None else self.etag[:-1] + ETAG_SUFFIX[encoding] + '"'
+        headers = {
+            "ETag": etag,
+            "Last-Modified": self.last_modified,
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding",
+        }
+        if self._not_modified(request, etag):
+            return Response(status_code=304, headers=headers)
+        if encoding is None:
+            return HTMLResponse(self.body, headers=headers)
+        headers["Content-Encoding"] = encoding
+        return HTMLResponse(self.variants[encoding], headers=headers)
+
+
+with startup_profile.phase("landing page"):
+    landing_page = LandingPage(TEMPLATE_PATH, static_files.manifest)
+
+
+# 시작 프로파일 (TS_PROFILE_STARTUP=1 일 때만)
+@app.get("/_diag/startup", include_in_schema=False)
+async def startup_diagnostics():
+    if not startup_profile.enabled:
+        return JSONResponse({"detail": "TS_PROFILE_STARTUP=1 로 켜 주세요."}, status_code=404)
+    report = startup_profile.report(STARTUP_STATS)
+    report["lazy"] = {lazy.path: lazy.build_seconds for lazy in lazy_apps}
+    return report
+
+
+# 격리 모드 하위 앱 상태 (프로세스 · 재시작 횟수)
+@app.get("/_diag/apps", include_in_schema=False)
+async def subapp_diagnostics():
+    if not ISOLATE_APPS:
+        return JSONResponse({"detail": "TS_ISOLATE_APPS=1 로 켜 주세요."}, status_code=404)
+    apps = [sub.status() for sub in isolated_apps]
+    return JSONResponse({"apps": apps}, status_code=200 if all(a["ready"] for a in apps) else 503)
 
-app = gr.mount_gradio_app(app, blueprint_app, path="/blueprint")
-app = gr.mount_gradio_app(app, counter_app, path="/counter")
 
 # 랜딩 페이지 HTML 직접 제공
 @app.get("/", response_class=HTMLResponse)
-async def index():
-    template_path = Path(__file__).parent / "templates" / "index.html"
-    html_content = template_path.read_text(encoding="utf-8")
-    # Jinja2 템플릿 문법을 실제 경로로 치환
-    html_content = html_content.replace("{{ url_for('static', filename='css/style.css') }}", "/static/css/style.css")
-    html_content = html_content.replace("{{ url_for('static', filename='js/main.js') }}", "/static/js/main.js")
-    return html_content
+async def index(request: Request):
+    return landing_page.response(request)
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,479 @@
+"""
+시험 블루프린트 · 일괄 생성 엔진
+여러 시험(과목/학년) 스펙을 한 번에 받아 build_section 과 동일한 계획을 만든다.
+
+_split_counts → curve/bias 스케일 → _offsets_zero_sum → _correct_to_total_0p1 → 동점 해소
+(_break_cross_difficulty_ties) → 정렬 · 기대 통계 · 기준 배점 단계를 섹션 × 문항 2차원 NumPy 배열
+(0.1점 단위 정수)로 한 번에 계산한다. 단계별 반복(3·5단계)만 파이썬이다. 결과는 build_section 과 같다.
+
+처리량 목표: 문항 30개 안팎의 섹션 기준 단일 코어에서 초당 10,000 섹션.
+달성 여부는 코어 속도에 따라 다르므로 그 환경에서 잰다:
+    python -m apps.blueprint_batch          # 섹션/초
+    python -m benchmarks.bench_tie_break    # 동점 해소 규모별 시간 + 불변식
+남은 시간의 대부분은 섹션마다 만드는 결과 dict(문항 행 · 스펙 해석)라 배열로 줄일 수 없어,
+느린 코어에서는 목표에 못 미칠 수 있다.
+"""
+
+import time
+
+import numpy as np
+
+from apps.exam_blueprint import (
+    _auto_counts,
+    _break_cross_difficulty_ties,
+    _combine_exp,
+    _counts_to_ratios,
+    _empty_section,
+    _finish_section,
+    _level_order,
+    _parse_float,
+    _parse_int,
+    _round1,
+    _scheme_presets,
+)
+
+# 한 번에 배열로 처리할 섹션 수 (패딩/메모리 상한)
+CHUNK_SIZE = 2048
+
+
+# ---------- 벡터 유틸 ----------
+def _to_tenths_batch(x):
+    """exam_blueprint._to_tenths 의 배열 버전"""
+    return np.floor(x * 10 + 0.5).astype(np.int64)
+
+
+def _split_counts_batch(totals, ratios, widths):
+    """_split_counts 의 행 단위 버전 (ratios: S×L, widths: 행별 실제 단계 수)"""
+    s = np.cumsum(ratios, axis=1)[:, -1]
+    col = np.arange(ratios.shape[1])
+    valid = col[None, :] < widths[:, None]
+    fallback = np.where(valid, 1.0 / widths[:, None], 0.0)
+    norm = np.where(s[:, None] > 0, ratios / np.where(s > 0, s, 1.0)[:, None], fallback)
+    raw = norm * totals[:, None]
+    floors = np.floor(raw).astype(np.int64)
+    rem = totals - floors.sum(axis=1)
+    frac = np.where(valid, raw - floors, -1.0)
+    # sorted((frac, i), reverse=True) 와 같은 순서: frac 내림차순, 동률이면 i 내림차순
+    order = np.lexsort((np.broadcast_to(col, frac.shape), frac), axis=1)[:, ::-1]
+    rank = np.empty_like(order)
+    np.put_along_axis(rank, order, np.broadcast_to(col, order.shape), axis=1)
+    return floors + (rank < rem[:, None])
+
+
+def _correct_tenths_batch(k, n, target):
+    """_correct_to_total_0p1 의 행 단위 버전 (k: 0.1점 단위 정수, n: 행별 문항 수)"""
+    col = np.arange(k.shape[1])[None, :]
+    mask = col < n[:, None]
+    diff = target - np.where(mask, k, 0).sum(axis=1)
+    steps = np.abs(diff)
+    # 0.1점씩 순환 배분할 때 i번째 문항이 방문되는 횟수
+    visits = (steps // n)[:, None] + (col < (steps % n)[:, None])
+    visits = np.where(mask, visits, 0)
+    k = np.where(
+        (diff > 0)[:, None],
+        k + visits,
+        np.where((diff < 0)[:, None], k - np.minimum(visits, np.maximum(k - 1, 0)), k),
+    )
+    rest = target - np.where(mask, k, 0).sum(axis=1)
+    rows = np.nonzero(rest != 0)[0]
+    if rows.size:
+        last = n[rows] - 1
+        step = np.sign(rest[rows])
+        ok = k[rows, last] + step >= 1
+        k[rows[ok], last[ok]] += step[ok]
+    return k
+
+
+def _shave_top_batch(ts, seg, floor, amount):
+    """
+    exam_blueprint._shave_top 의 행 단위 버전 (seg: 행마다 오름차순으로 이어진 한 단계의 자리)
+    위에서부터 고르게 깎은 결과는 "배점을 L 로 자르고, L 이상이던 문항 중 앞쪽 r 개는 L-1" 이다.
+    L 은 잘라 낸 양이 회수할 양 이하가 되는 가장 작은 값(floor 이상) — 이분 탐색. 회수한 양을 돌려준다.
+    """
+
+    def excess(cap):
+        return np.where(seg, np.maximum(ts - cap[:, None], 0), 0).sum(axis=1)
+
+    take = np.minimum(np.maximum(amount, 0), excess(floor))
+    lo = floor.copy()
+    hi = np.maximum(np.where(seg, ts, 0).max(axis=1), floor)
+    while True:
+        open_ = lo < hi
+        if not open_.any():
+            break
+        mid = (lo + hi) // 2
+        fits = excess(mid) <= take
+        hi = np.where(open_ & fits, mid, hi)
+        lo = np.where(open_ & ~fits, mid + 1, lo)
+    r = take - excess(lo)
+    top = seg & (ts >= lo[:, None])
+    lower = top & (np.cumsum(top, axis=1) <= r[:, None])
+    ts[...] = np.where(seg, np.minimum(ts, lo[:, None]) - lower, ts)
+    return take
+
+
+def _lift_bottom_batch(ts, seg, amount):
+    """
+    exam_blueprint._lift_bottom 의 행 단위 버전: 배점을 F 까지 채우고 F 인 문항 중 뒤쪽 r 개는 F+1.
+    F 는 채운 양이 얹을 양 이하가 되는 가장 큰 값 — 이분 탐색.
+    """
+
+    def fill(level):
+        return np.where(seg, np.maximum(level[:, None] - ts, 0), 0).sum(axis=1)
+
+    amount = np.where(seg.any(axis=1), np.maximum(amount, 0), 0)
+    lo = np.where(seg, ts, np.iinfo(np.int64).max).min(axis=1)
+    lo = np.where(amount > 0, lo, 0)
+    hi = lo + amount
+    while True:
+        open_ = lo < hi
+        if not open_.any():
+            break
+        mid = (lo + hi + 1) // 2
+        fits = fill(mid) <= amount
+        lo = np.where(open_ & fits, mid, lo)
+        hi = np.where(open_ & ~fits, mid - 1, hi)
+    r = amount - fill(lo)
+    low = seg & (ts <= lo[:, None]) & (amount > 0)[:, None]
+    from_end = np.cumsum(low[:, ::-1], axis=1)[:, ::-1]
+    ts[...] = np.where(low, lo[:, None] + (from_end <= r[:, None]), ts)
+
+
+def _boundary_cut_batch(ts, low, high, floor):
+    """exam_blueprint._boundary_cut 의 행 단위 버전 (low · high: 두 단계의 자리)"""
+
+    def shave(b):
+        return np.where(low, np.maximum(ts - b[:, None] + 1, 0), 0).sum(axis=1)
+
+    def raise_(b):
+        return np.where(high, np.maximum(b[:, None] - ts, 0), 0).sum(axis=1)
+
+    lo = floor + 1
+    hi = np.maximum(np.where(low, ts, 0).max(axis=1), floor) + 1
+    while True:
+        open_ = lo < hi
+        if not open_.any():
+            break
+        mid = (lo + hi) // 2
+        ok = raise_(mid) >= shave(mid)
+        hi = np.where(open_ & ok, mid, hi)
+        lo = np.where(open_ & ~ok, mid + 1, lo)
+    back = (lo > floor + 1) & (shave(lo - 1) < raise_(lo))
+    return np.where(back, lo - 1, lo)
+
+
+def _break_ties_batch(ts, seg_id, n_levels, target):
+    """
+    exam_blueprint._break_cross_difficulty_ties 의 행 단위 버전 (결과 동일, ts 를 고쳐 쓴다)
+    ts: 행마다 (단계 쉬운 순, 배점 오름차순) 으로 정렬된 0.1점 단위 배점,
+    seg_id: 자리별 단계 번호 (비어 있지 않은 단계만 0 부터, 패딩은 어느 행의 단계 수보다도 큰 값).
+    합계가 최소 필요량보다 작거나 회수가 멈춘 행 번호를 돌려준다 (섹션별 함수로 다시 돌려 ValueError).
+    """
+
+    def seg(li):
+        return seg_id == li
+
+    def floor_of(li):
+        if li == 0:
+            return np.ones(len(ts), dtype=np.int64)
+        return np.where(seg(li - 1), ts, 0).max(axis=1) + 1
+
+    sizes = np.stack([seg(li).sum(axis=1) for li in range(int(n_levels.max()))], axis=1)
+    minimum = (sizes * np.arange(1, sizes.shape[1] + 1)).sum(axis=1)
+    stuck = target < minimum
+    debt = np.where(stuck, 0, ts.sum(axis=1) - target)
+
+    # 모자란 몫은 가장 어려운 단계에 고르게 (뒤쪽 r 개는 1 더)
+    short = debt < 0
+    if short.any():
+        top = seg_id == (n_levels - 1)[:, None]
+        m = top.sum(axis=1)
+        q, r = np.divmod(-debt, np.maximum(m, 1))
+        from_end = np.cumsum(top[:, ::-1], axis=1)[:, ::-1]
+        ts += np.where(top & short[:, None], q[:, None] + (from_end <= r[:, None]), 0)
+        debt = np.maximum(debt, 0)
+    for li in range(1, sizes.shape[1]):
+        below, cur = seg(li - 1), seg(li)
+        low_max = np.where(below, ts, 0).max(axis=1)
+        high_min = np.where(cur, ts, np.iinfo(np.int64).max).min(axis=1)
+        ov = (n_levels > li) & (high_min <= low_max)
+        if ov.any():
+            b = _boundary_cut_batch(ts, below & ov[:, None], cur & ov[:, None], floor_of(li - 1))[:, None]
+            moved = np.where(below & ov[:, None], np.minimum(ts, b - 1), ts)
+            moved = np.where(cur & ov[:, None], np.maximum(moved, b), moved)
+            debt = debt + (moved - ts).sum(axis=1)
+            ts[...] = moved
+            _lift_bottom_batch(ts, cur, -debt)
+            debt = np.maximum(debt, 0)
+        for lj in range(li - 1, -1, -1):
+            debt = debt - _shave_top_batch(ts, seg(lj), floor_of(lj), debt)
+    while (debt > 0).any():
+        paid = np.zeros(len(ts), dtype=np.int64)
+        for li in range(sizes.shape[1] - 1, -1, -1):
+            got = _shave_top_batch(ts, seg(li), floor_of(li), debt)
+            debt = debt - got
+            paid += got
+        jam = (debt > 0) & (paid == 0)
+        stuck |= jam
+        debt = np.where(jam, 0, debt)
+    return np.nonzero(stuck)[0]
+
+
+# ---------- 섹션 일괄 계산 ----------
+def _build_chunk(sections):
+    width = max(len(sec[3]) for sec in sections)
+    totals = np.array([sec[0] for sec in sections], dtype=np.int64)
+    pts = np.array([sec[1] for sec in sections], dtype=np.float64)
+    widths = np.array([len(sec[3]) for sec in sections], dtype=np.int64)
+    ratios = np.zeros((len(sections), width))
+    curve_k = np.ones((len(sections), width))
+    bias_k = np.zeros((len(sections), width))
+    p_k = np.zeros((len(sections), width))
+    for r, (_, _, _, rt, curve, bias, p_map, _) in enumerate(sections):
+        w = len(rt)
+        ratios[r, :w] = list(rt.values())
+        curve_k[r, :w] = [curve.get(key, 1.0) for key in rt]
+        bias_k[r, :w] = [bias.get(key, 0.0) for key in rt]
+        p_k[r, :w] = [p_map.get(key, 0.65) for key in rt]
+
+    counts = _split_counts_batch(totals, ratios, widths)
+    n = counts.sum(axis=1)
+    ends = np.cumsum(counts, axis=1)
+    starts = ends - counts
+    col = np.arange(max(1, int(n.max())))[None, :]
+    mask = col < n[:, None]
+    lvl = np.minimum((col[:, :, None] >= ends[:, None, :]).sum(axis=2), width - 1)
+    rows = np.arange(len(sections))[:, None]
+
+    avg = pts / totals
+    raw = np.where(mask, avg[:, None] * curve_k[rows, lvl], 0.0)
+    s = np.cumsum(raw, axis=1)[:, -1]
+    scale = pts / s
+    tenths = _to_tenths_batch(np.maximum(0.1, raw * scale[:, None] + bias_k[rows, lvl]))
+
+    # _offsets_zero_sum: 단계 내 위치별 -1 / 0 / +1 (0.1점 단위)
+    m = counts[rows, lvl]
+    a, r3 = m // 3, m % 3
+    neg = a + (r3 == 2)
+    zero = a + (r3 == 1)
+    pos = col - starts[rows, lvl]
+    off = np.where(pos < neg, -1, np.where(pos < neg + zero, 0, 1))
+    tenths = np.where(mask, np.maximum(1, tenths + off), 1)
+
+    target = _to_tenths_batch(pts)
+    tenths = _correct_tenths_batch(tenths, n, target)
+    return _finish_chunk(sections, counts, n, lvl, mask, tenths, target, avg, scale, curve_k, bias_k, p_k)
+
+
+def _layout(scheme, keys):
+    """(쉬운 순서 [(단계, 열)], 단계 → 순위) — 체계 밖 단계가 있으면 None"""
+    rank = {k: i for i, k in enumerate(_level_order(scheme))}
+    if any(key not in rank for key in keys):
+        return None
+    return sorted(((key, j) for j, key in enumerate(keys)), key=lambda it: rank[it[0]]), rank
+
+
+def _finish_chunk(sections, counts, n, lvl, mask, tenths, target, avg, scale, curve_k, bias_k, p_k):
+    """
+    exam_blueprint._finish_section 의 배열 버전 (결과 동일)
+    (단계, 배점) 정렬 · 기대 통계 · 기준 배점은 배열로 한 번에 계산하고, 정렬한 뒤에도
+    단계 경계에서 배점이 겹치거나 합계가 어긋난 섹션만 모아 _break_ties_batch 를 돈다.
+    """
+    rows = np.arange(len(sections))[:, None]
+    width = counts.shape[1]
+    layouts = {}
+    plan_layouts = []
+    rank_rows = []
+    for sec in sections:
+        keys = tuple(sec[3])
+        if (sec[2], keys) not in layouts:
+            layout = _layout(sec[2], keys)
+            ranks = [layout[1][key] for key in keys] if layout is not None else []
+            layouts[sec[2], keys] = layout, ranks + [width] * (width - len(ranks))
+        layout, ranks = layouts[sec[2], keys]
+        plan_layouts.append(layout)
+        rank_rows.append(ranks)
+    rank_k = np.array(rank_rows, dtype=np.int64)
+
+    # 단계(쉬운 순) → 배점 오름차순. 패딩 열은 순위가 가장 커서 맨 뒤로 간다
+    rank_col = np.where(mask, rank_k[rows, lvl], width)
+    order = np.lexsort((tenths, rank_col), axis=1)
+    ts = np.where(mask, np.take_along_axis(tenths, order, axis=1), 0)
+    rs = np.take_along_axis(rank_col, order, axis=1)
+    ps = np.take_along_axis(np.where(mask, p_k[rows, lvl], 0.0), order, axis=1)
+
+    # 이미 단계 간 엄격히 증가하고 합계가 맞는 섹션은 동점 해소가 아무것도 바꾸지 않는다
+    overlap = mask[:, 1:] & (rs[:, 1:] != rs[:, :-1]) & (ts[:, 1:] <= ts[:, :-1])
+    redo = overlap.any(axis=1) | (ts.sum(axis=1) != target)
+    redo &= np.array([layout is not None for layout in plan_layouts])
+    if redo.any():
+        sub = ts[redo]
+        seg_id = np.zeros(sub.shape, dtype=np.int64)
+        seg_id[:, 1:] = np.cumsum(rs[redo, 1:] != rs[redo, :-1], axis=1)
+        n_levels = seg_id[np.arange(len(sub)), n[redo] - 1] + 1
+        seg_id = np.where(mask[redo], seg_id, sub.shape[1])
+        stuck = _break_ties_batch(sub, seg_id, n_levels, target[redo])
+        ts[redo] = sub
+        rows_redo = np.nonzero(redo)[0]
+        for r in rows_redo[stuck].tolist():
+            # 합계가 모자라거나 회수가 멈춘 섹션: 섹션별 함수가 같은 ValueError 를 낸다
+            layout = plan_layouts[r]
+            codes = [key for key, j in layout[0] for _ in range(int(counts[r, j]))]
+            ts[r, : n[r]] = _break_cross_difficulty_ties(
+                codes, ts[r, : n[r]].tolist(), layout[1], int(target[r])
+            )
+
+    # _expected_stats 와 같은 순서로 더한다 (cumsum 은 앞에서부터 차례로 더함)
+    mean = np.cumsum(ts * ps, axis=1)[:, -1]
+    var = np.cumsum((ts * ts) * ps * (1 - ps), axis=1)[:, -1]
+    anchors = np.maximum(1, _to_tenths_batch(avg[:, None] * curve_k * scale[:, None] + bias_k)) / 10
+
+    count_rows = counts.tolist()
+    lens = n.tolist()
+    vals_rows = ts.tolist()
+    pts_rows = (ts / 10).tolist()
+    anchor_rows = anchors.tolist()
+    mean, var = mean.tolist(), var.tolist()
+    plans = []
+    for r, (n_q, section_pts, scheme, rt, curve, bias, p_map, label) in enumerate(sections):
+        layout = plan_layouts[r]
+        if layout is None:
+            # 체계 밖 단계: 섹션별 마무리로
+            keys = list(rt.keys())
+            count_map = {keys[j]: count_rows[r][j] for j in range(len(keys))}
+            codes = [key for key in keys for _ in range(count_map[key])]
+            plans.append(
+                _finish_section(
+                    codes, tenths[r, : lens[r]].tolist(), count_map, _level_order(scheme),
+                    float(avg[r]), float(scale[r]), curve, bias, p_map, section_pts, label,
+                )
+            )
+            continue
+        cnt = count_rows[r]
+        codes = []
+        for key, j in layout[0]:
+            codes += [key] * cnt[j]
+        m = lens[r]
+        plans.append(
+            {
+                "codes": codes,
+                "rows": [
+                    {"번호": i, "유형": label, "난이도": c, "배점": t}
+                    for i, c, t in zip(range(1, m + 1), codes, pts_rows[r])
+                ],
+                "tenths": vals_rows[r][:m],
+                "counts": {key: cnt[j] for key, j in layout[0]},
+                "anchors": {key: anchor_rows[r][j] for key, j in layout[0]},
+                "section_points": _round1(section_pts),
+                "exp": (_round1(mean[r] / 10), _round1(var[r] ** 0.5 / 10)),
+            }
+        )
+    return plans
+
+
+def build_sections_batch(sections, chunk_size=CHUNK_SIZE):
+    """
+    build_section 인자 튜플 목록 → 계획 목록 (입력 순서 유지)
+    - sections: (n_q, section_pts, scheme, ratios, curve, bias, p_map, label)
+    """
+    plans = [None] * len(sections)
+    live = []
+    for i, sec in enumerate(sections):
+        if sec[0] <= 0 or sec[1] <= 0:
+            plans[i] = _empty_section(sec[1])
+        else:
+            live.append(i)
+    # 문항 수가 비슷한 섹션끼리 묶어 패딩 낭비를 줄인다
+    live.sort(key=lambda i: sections[i][0])
+    for start in range(0, len(live), chunk_size):
+        idxs = live[start : start + chunk_size]
+        for i, plan in zip(idxs, _build_chunk([sections[i] for i in idxs])):
+            plans[i] = plan
+    return plans
+
+
+# ---------- 시험 스펙 ----------
+def _spec_counts(spec, part, total, scheme):
+    """난이도별 문항 수 (없으면 STEP2 자동 채움과 같은 비율)"""
+    given = spec.get(part)
+    if not given:
+        return _auto_counts(total, scheme)
+    order = _level_order(scheme)
+    counts = {k: int(given.get(k, 0) or 0) for k in reversed(order)}
+    if sum(counts.values()) != total:
+        name = "객관식" if part == "mc" else "서술형"
+        raise ValueError(
+            f"{spec.get('subject') or '(과목)'} {name} 난이도별 문항 수 합계"
+            f"({sum(counts.values())})가 문항 수({total})와 다릅니다."
+        )
+    return counts
+
+
+def _spec_ratios(spec, part, total, scheme, auto):
+    """섹션 비율 (자동 배분은 (문항 수, 체계) 마다 한 번만 계산해 auto 에 두고 함께 쓴다)"""
+    if spec.get(part):
+        return _counts_to_ratios(_spec_counts(spec, part, total, scheme), total)
+    if (total, scheme) not in auto:
+        auto[total, scheme] = _counts_to_ratios(_auto_counts(total, scheme), total)
+    return auto[total, scheme]
+
+
+def generate_blueprints(specs, chunk_size=CHUNK_SIZE):
+    """
+    시험 스펙 목록 → 시험별 블루프린트 (STEP1~STEP4 를 한 번에)
+    spec 예: {"subject": "과학", "mc_q": 23, "cr_q": 5, "mc_pts": 80, "cr_pts": 20,
+              "scheme": "3단계", "mc": {"상": 5, "중": 12, "하": 6}, "cr": {...}}
+    mc/cr(난이도별 문항 수)를 생략하면 기본 비율로 자동 배분한다.
+    """
+    sections = []
+    heads = []
+    auto = {}
+    for spec in specs:
+        scheme = spec.get("scheme") or "3단계"
+        mc_total = _parse_int(spec.get("mc_q"), "객관식 문항 수")
+        cr_total = _parse_int(spec.get("cr_q"), "서술형 문항 수")
+        mc_pts = _parse_float(spec.get("mc_pts"), "객관식 만점 점수")
+        cr_pts = _parse_float(spec.get("cr_pts"), "서술형 만점 점수")
+        curve, bias, pmap, order = _scheme_presets(scheme)
+        sections.append(
+            (mc_total, mc_pts, scheme, _spec_ratios(spec, "mc", mc_total, scheme, auto), curve, bias, pmap, "객관식")
+        )
+        sections.append(
+            (cr_total, cr_pts, scheme, _spec_ratios(spec, "cr", cr_total, scheme, auto), curve, bias, pmap, "서술형")
+        )
+        heads.append(
+            {
+                "subject": spec.get("subject") or "(과목)",
+                "scheme": scheme,
+                "order": order,
+                "total_q": mc_total + cr_total,
+                "total_points": _round1(float(spec.get("mc_pts")) + float(spec.get("cr_pts"))),
+            }
+        )
+
+    plans = build_sections_batch(sections, chunk_size)
+    results = []
+    for i, head in enumerate(heads):
+        mc_plan, cr_plan = plans[2 * i], plans[2 * i + 1]
+        results.append({**head, "mc": mc_plan, "cr": cr_plan, "exp": _combine_exp(mc_plan, cr_plan)})
+    return results
+
+
+def _throughput(n_sections=20000, n_q=30):
+    """단일 코어 처리량(섹션/초) 측정"""
+    rng = np.random.default_rng(0)
+    specs = []
+    for i in range(n_sections // 2):
+        scheme = "3단계" if i % 2 == 0 else "5단계"
+        mc_q = int(rng.integers(max(1, n_q - 10), n_q + 10))
+        specs.append(
+            {"subject": f"과목{i}", "mc_q": mc_q, "cr_q": int(rng.integers(1, 8)),
+             "mc_pts": 80, "cr_pts": 20, "scheme": scheme}
+        )
+    t0 = time.perf_counter()
+    generate_blueprints(specs)
+    return n_sections / (time.perf_counter() - t0)
+
+
+if __name__ == "__main__":
+    print(f"{_throughput():,.0f} sections/sec")
@@ -0,0 +1,131 @@
+"""
+시험 블루프린트 · 모의 응시 시뮬레이션 (IRT)
+학생 능력 θ ~ N(0, 1) 하나가 모든 문항에 공통으로 작용하므로 문항 간 상관이 생긴다.
+문항 난이도 b 는 P_3/P_5 의 정답률이 '집단 전체 평균 정답률'이 되도록 맞춘다.
+- 1PL: 모든 문항 변별도 a = 1
+- 2PL: 난이도 단계별 변별도 (DISCRIMINATION)
+학생 × 문항 행렬 연산으로 묶어서 풀고, 아주 큰 실행은 프로세스 풀로 나눈다.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from apps.blueprint_stats import DEFAULT_P
+
+# 로지스틱 → 정규 오자이브 척도 상수
+SCALE_D = 1.702
+DISCRIMINATION = {"하": 0.8, "중하": 1.0, "중": 1.2, "중상": 1.2, "상": 1.0}
+CHUNK_STUDENTS = 20_000
+
+
+# ---------- 문항 모수 ----------
+def _marginal_p(a, b, nodes, weights):
+    """θ ~ N(0,1) 에서 평균 정답률 (Gauss-Hermite 적분)"""
+    z = SCALE_D * a[:, None] * (nodes[None, :] - b[:, None])
+    return (weights[None, :] / (1.0 + np.exp(-z))).sum(axis=1)
+
+
+def item_parameters(codes, p_map, model="1PL", discrimination=None):
+    """문항별 (a, b): 평균 정답률이 p_map 과 같아지도록 b 를 이분법으로 맞춘다"""
+    if model == "2PL":
+        disc = discrimination or DISCRIMINATION
+        a = np.array([disc.get(c, 1.0) for c in codes], dtype=float)
+    else:
+        a = np.ones(len(codes))
+    p = np.clip([p_map.get(c, DEFAULT_P) for c in codes], 1e-6, 1 - 1e-6)
+    nodes, weights = np.polynomial.hermite_e.hermegauss(64)
+    weights = weights / weights.sum()
+    lo = np.full(len(codes), -12.0)
+    hi = np.full(len(codes), 12.0)
+    for _ in range(60):
+        mid = (lo + hi) / 2
+        too_easy = _marginal_p(a, mid, nodes, weights) > p
+        lo = np.where(too_easy, mid, lo)
+        hi = np.where(too_easy, hi, mid)
+    return a, (lo + hi) / 2
+
+
+# ---------- 시뮬레이션 ----------
+def _simulate_chunk(args):
+    """학생 n명 응시 → 누적 통계 (프로세스 풀 작업 단위)"""
+    a, b, tenths, n, seed = args
+    rng = np.random.default_rng(seed)
+    theta = rng.standard_normal(n)
+    prob = 1.0 / (1.0 + np.exp(-SCALE_D * a[None, :] * (theta[:, None] - b[None, :])))
+    correct = rng.random(prob.shape) < prob
+    scores = correct @ tenths
+    true_scores = prob @ tenths
+    return {
+        "n": n,
+        "hist": np.bincount(scores, minlength=int(tenths.sum()) + 1),
+        "item_correct": correct.sum(axis=0),
+        "sum": float(scores.sum()),
+        "sumsq": float((scores.astype(float) ** 2).sum()),
+        "true_sum": float(true_scores.sum()),
+        "true_sumsq": float((true_scores**2).sum()),
+    }
+
+
+def _merge(parts):
+    out = dict(parts[0])
+    for part in parts[1:]:
+        for key in out:
+            out[key] = out[key] + part[key]
+    return out
+
+
+def simulate_plans(
+    plans,
+    p_map,
+    n_students=100_000,
+    model="1PL",
+    discrimination=None,
+    seed=0,
+    processes=None,
+    chunk=CHUNK_STUDENTS,
+):
+    """
+    build_section 계획들(객관식 + 서술형 …)로 가상 학생 n_students 명의 응시를 시뮬레이션
+    반환 점수는 모두 '점' 단위, hist[k] 는 총점 k/10 점인 학생 수.
+    - reliability_alpha: 가중 Cronbach α (KR-20)
+    - reliability_true: 참점수 분산 / 관찰점수 분산
+    processes 를 주면 학생을 나눠 프로세스 풀에서 실행한다.
+    """
+    if n_students < 1:
+        raise ValueError(f"학생 수는 1명 이상이어야 합니다. (입력: {n_students})")
+    codes, tenths = [], []
+    for plan in plans:
+        codes.extend(plan["codes"])
+        tenths.extend(plan["tenths"])
+    tenths = np.asarray(tenths, dtype=np.int64)
+    a, b = item_parameters(codes, p_map, model, discrimination)
+
+    sizes = [min(chunk, n_students - i) for i in range(0, n_students, chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(a, b, tenths, size, s) for size, s in zip(sizes, seeds)]
+    if processes and processes > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            acc = _merge(list(pool.map(_simulate_chunk, jobs)))
+    else:
+        acc = _merge([_simulate_chunk(job) for job in jobs])
+
+    n = acc["n"]
+    mean = acc["sum"] / n
+    var = max(0.0, acc["sumsq"] / n - mean**2)
+    true_mean = acc["true_sum"] / n
+    true_var = max(0.0, acc["true_sumsq"] / n - true_mean**2)
+    p_hat = acc["item_correct"] / n
+    item_var = ((tenths.astype(float) ** 2) * p_hat * (1 - p_hat)).sum()
+    k = len(codes)
+    alpha = k / (k - 1) * (1 - item_var / var) if k > 1 and var > 0 else 0.0
+    return {
+        "n_students": n,
+        "model": model,
+        "mean": mean / 10,
+        "sd": var**0.5 / 10,
+        "hist": acc["hist"],
+        "item_p": p_hat,
+        "reliability_alpha": float(alpha),
+        "reliability_true": float(true_var / var) if var > 0 else 0.0,
+    }
@@ -0,0 +1,112 @@
+"""
+시험 블루프린트 · 총점 분포 (정확 계산)
+문항별 정답률(P_3/P_5)과 배점으로 총점의 전체 확률분포를 0.1점 단위 정수 격자 위에서
+합성곱으로 구한다. 문항이 많으면 FFT 로 한 번에 곱한다.
+- 문항은 독립, 정답이면 배점 전부 / 오답이면 0점 (기대 평균·표준편차와 같은 가정)
+"""
+
+import math
+from collections import Counter
+
+import numpy as np
+
+# 이 문항 수 이상이면 FFT 합성곱
+FFT_MIN_ITEMS = 64
+DEFAULT_P = 0.65
+
+# 성취도 컷 (총점 대비 비율)
+GRADE_CUTOFFS = {"A": 0.9, "B": 0.8, "C": 0.7, "D": 0.6}
+PERCENTILES = (10, 25, 50, 75, 90)
+
+
+# ---------- 분포 계산 ----------
+def _binomial_pmf(m, p):
+    if p <= 0.0:
+        out = np.zeros(m + 1)
+        out[0] = 1.0
+        return out
+    if p >= 1.0:
+        out = np.zeros(m + 1)
+        out[m] = 1.0
+        return out
+    lp, lq = math.log(p), math.log1p(-p)
+    lg = math.lgamma(m + 1)
+    logs = [lg - math.lgamma(k + 1) - math.lgamma(m - k + 1) + k * lp + (m - k) * lq for k in range(m + 1)]
+    return np.exp(np.array(logs))
+
+
+def _convolve_all(parts, use_fft):
+    if not parts:
+        return np.array([1.0])
+    if not use_fft or len(parts) == 1:
+        out = parts[0]
+        for part in parts[1:]:
+            out = np.convolve(out, part)
+        return out
+    size = sum(len(part) for part in parts) - len(parts) + 1
+    n_fft = 1 << (size - 1).bit_length()
+    spec = np.ones(n_fft // 2 + 1, dtype=complex)
+    for part in parts:
+        spec *= np.fft.rfft(part, n_fft)
+    out = np.clip(np.fft.irfft(spec, n_fft)[:size], 0.0, None)
+    return out / out.sum()
+
+
+def score_distribution(codes, tenths, p_map, use_fft=None):
+    """
+    문항별 (난이도, 배점[0.1점 단위]) → 총점 확률분포
+    반환: pmf[k] = P(총점 == k / 10)
+    """
+    groups = Counter((t, p_map.get(c, DEFAULT_P)) for c, t in zip(codes, tenths))
+    parts = []
+    for (w, p), m in groups.items():
+        part = np.zeros(m * w + 1)
+        part[::w] = _binomial_pmf(m, p)
+        parts.append(part)
+    if use_fft is None:
+        use_fft = len(codes) >= FFT_MIN_ITEMS
+    return _convolve_all(parts, use_fft)
+
+
+def plan_distribution(plan, p_map, use_fft=None):
+    """build_section 계획 하나의 총점 분포"""
+    return score_distribution(plan["codes"], plan["tenths"], p_map, use_fft)
+
+
+def exam_distribution(plans, p_map, use_fft=None):
+    """여러 섹션(객관식 + 서술형 …)을 합친 시험 총점 분포"""
+    codes, tenths = [], []
+    for plan in plans:
+        codes.extend(plan["codes"])
+        tenths.extend(plan["tenths"])
+    return score_distribution(codes, tenths, p_map, use_fft)
+
+
+# ---------- 요약 ----------
+def percentile(pmf, q):
+    """P(총점 ≤ s) ≥ q/100 인 가장 작은 점수 s"""
+    cdf = np.cumsum(pmf)
+    k = int(np.searchsorted(cdf, q / 100 * cdf[-1] - 1e-12))
+    return min(k, len(pmf) - 1) / 10
+
+
+def prob_at_least(pmf, cutoff):
+    """P(총점 ≥ cutoff)"""
+    k = max(0, int(math.ceil(round(cutoff * 10, 6))))
+    return float(pmf[k:].sum())
+
+
+def distribution_summary(pmf, total_points, cutoffs=GRADE_CUTOFFS, percentiles=PERCENTILES):
+    """평균/표준편차, 백분위 점수, 성취도 컷별 도달 확률"""
+    scores = np.arange(len(pmf)) / 10
+    mean = float((scores * pmf).sum())
+    sd = float(math.sqrt(max(0.0, (scores**2 * pmf).sum() - mean**2)))
+    return {
+        "mean": mean,
+        "sd": sd,
+        "percentiles": {q: percentile(pmf, q) for q in percentiles},
+        "cutoffs": {
+            name: (ratio * total_points, prob_at_least(pmf, ratio * total_points))
+            for name, ratio in cutoffs.items()
+        },
+    }
@@ -0,0 +1,223 @@
+"""
+시험 블루프린트 · 프리셋 탐색 (ratio × curve × bias × p_map 격자)
+학교/학과별로 CURVE_*/BIAS_*/RATIOS_*/P_* 를 조정할 때, 격자 전체의 기대 평균/표준편차를
+한 번에 계산해 목표 평균에 맞는 조합을 고른다.
+
+- 배점 계획은 p_map 과 무관하므로 (ratio, curve, bias) 조합마다 한 번만 만든다
+  (blueprint_batch 일괄 엔진, 필요하면 프로세스 풀).
+- 계획마다 난이도별 배점 합 Σt, Σt² 만 남겨 두면 p_map 축 전체는 행렬곱 한 번으로 끝난다.
+- 배점 합계가 너무 작아 난이도 순서를 지킬 수 없는 조합은 탐색을 멈추지 않고 불가능(NaN)으로 남긴다.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+
+import numpy as np
+
+from apps.blueprint_batch import build_sections_batch
+from apps.exam_blueprint import (
+    RATIOS_3,
+    RATIOS_5,
+    _counts_to_ratios,
+    _level_order,
+    _parse_float,
+    _parse_int,
+    _scheme_presets,
+    _split_counts,
+)
+from apps.blueprint_stats import DEFAULT_P
+
+AXES = ("ratios", "curve", "bias", "p_map")
+
+
+# ---------- 격자 준비 ----------
+def scaled_presets(base, factors, neutral):
+    """
+    기준 프리셋의 기울기만 바꾼 후보들 {라벨: 프리셋}
+    예) scaled_presets(CURVE_3, [0.5, 1, 1.5], 1.0) → 하/상 간 배점 차이 0.5배/1배/1.5배
+    """
+    return {
+        f"×{f:.3g}": {k: neutral + f * (v - neutral) for k, v in base.items()} for f in factors
+    }
+
+
+def _axis(values, default):
+    if values is None:
+        return [("기본", default)]
+    if isinstance(values, dict):
+        return list(values.items())
+    return [(f"#{i}", v) for i, v in enumerate(values)]
+
+
+def _section_counts(spec, part, total, scheme, ratio_preset):
+    given = spec.get(part)
+    if given:
+        return {k: int(given.get(k, 0) or 0) for k in reversed(_level_order(scheme))}
+    keys = list(reversed(_level_order(scheme)))
+    cnts = _split_counts(total, [ratio_preset.get(k, 0.0) for k in keys])
+    return dict(zip(keys, cnts))
+
+
+def _plans_or_none(sections):
+    """섹션별 계획 (만들 수 없는 섹션은 None)"""
+    try:
+        return build_sections_batch(sections)
+    except ValueError:
+        pass
+    # 불가능한 섹션이 섞여 있으면 하나씩
+    plans = []
+    for sec in sections:
+        try:
+            plans.extend(build_sections_batch([sec]))
+        except ValueError:
+            plans.append(None)
+    return plans
+
+
+def _level_sums_chunk(args):
+    """섹션 묶음 → 섹션별 난이도 단계 Σt, Σt² (프로세스 풀 작업 단위, 불가능한 섹션은 NaN)"""
+    sections, order = args
+    s1 = np.zeros((len(sections), len(order)))
+    s2 = np.zeros((len(sections), len(order)))
+    pos = {lvl: j for j, lvl in enumerate(order)}
+    for i, plan in enumerate(_plans_or_none(sections)):
+        if plan is None:
+            s1[i] = s2[i] = np.nan
+            continue
+        for c, t in zip(plan["codes"], plan["tenths"]):
+            s1[i, pos[c]] += t
+            s2[i, pos[c]] += t * t
+    return s1, s2
+
+
+# ---------- 탐색 ----------
+def sweep_presets(
+    spec,
+    ratios=None,
+    curves=None,
+    biases=None,
+    p_maps=None,
+    target_mean=None,
+    processes=None,
+    top=10,
+):
+    """
+    시험 스펙(generate_blueprints 와 같은 형식) 하나에 대해 프리셋 격자를 평가한다.
+    각 축은 None(현재 프리셋), 프리셋 리스트, 또는 {라벨: 프리셋} 을 받는다.
+    반환:
+    - axes: 축별 라벨 목록 (AXES 순서)
+    - mean, sd: shape = (ratios, curve, bias, p_map) 배열 (점 단위, 반올림 전, 불가능한 조합은 NaN)
+    - table: 조합별 행 목록 (feasible: 배점을 만들 수 있는지), best: target_mean 에 가까운 순 상위 top 개
+    spec 에 난이도별 문항 수(mc/cr)가 있으면 ratios 축은 결과에 영향을 주지 않는다.
+    """
+    scheme = spec.get("scheme") or "3단계"
+    order = _level_order(scheme)
+    curve0, bias0, p0, _ = _scheme_presets(scheme)
+    axes = {
+        "ratios": _axis(ratios, RATIOS_3 if scheme == "3단계" else RATIOS_5),
+        "curve": _axis(curves, curve0),
+        "bias": _axis(biases, bias0),
+        "p_map": _axis(p_maps, p0),
+    }
+    parts = [
+        (_parse_int(spec.get("mc_q"), "객관식 문항 수"), _parse_float(spec.get("mc_pts"), "객관식 만점 점수"), "mc", "객관식"),
+        (_parse_int(spec.get("cr_q"), "서술형 문항 수"), _parse_float(spec.get("cr_pts"), "서술형 만점 점수"), "cr", "서술형"),
+    ]
+
+    # 1) ratio 축 → 섹션별 난이도 비율 (공유)
+    ratio_rows = []
+    for _, ratio_preset in axes["ratios"]:
+        row = []
+        for total, _, part, _ in parts:
+            counts = _section_counts(spec, part, total, scheme, ratio_preset)
+            row.append(_counts_to_ratios(counts, total))
+        ratio_rows.append(row)
+
+    # 2) (ratio, curve, bias, 섹션) 마다 배점 계획 → 단계별 Σt, Σt²
+    sections = []
+    for ri, ci, bi in product(*(range(len(axes[a])) for a in AXES[:3])):
+        curve, bias = axes["curve"][ci][1], axes["bias"][bi][1]
+        for si, (total, pts, _, label) in enumerate(parts):
+            sections.append((total, pts, scheme, ratio_rows[ri][si], curve, bias, p0, label))
+    if processes and processes > 1:
+        step = -(-len(sections) // processes)
+        jobs = [(sections[i : i + step], order) for i in range(0, len(sections), step)]
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            done = list(pool.map(_level_sums_chunk, jobs))
+        s1 = np.concatenate([d[0] for d in done])
+        s2 = np.concatenate([d[1] for d in done])
+    else:
+        s1, s2 = _level_sums_chunk((sections, order))
+
+    # 3) p_map 축: 행렬곱 한 번 (섹션 합산 포함)
+    p = np.array([[pm.get(lvl, DEFAULT_P) for _, pm in axes["p_map"]] for lvl in order])
+    shape = tuple(len(axes[a]) for a in AXES[:3]) + (len(parts), len(order))
+    s1 = s1.reshape(shape).sum(axis=3)
+    s2 = s2.reshape(shape).sum(axis=3)
+    mean = (s1 @ p) / 10
+    sd = np.sqrt(s2 @ (p * (1 - p))) / 10
+
+    labels = {a: [name for name, _ in axes[a]] for a in AXES}
+    table = []
+    for idx in np.ndindex(mean.shape):
+        row = {a: labels[a][i] for a, i in zip(AXES, idx)}
+        row.update(
+            index=idx, mean=float(mean[idx]), sd=float(sd[idx]), feasible=bool(np.isfinite(mean[idx]))
+        )
+        table.append(row)
+    if target_mean is not None:
+        feasible = [r for r in table if r["feasible"]]
+        best = sorted(feasible, key=lambda r: abs(r["mean"] - target_mean))[:top]
+    else:
+        best = []
+    return {
+        "axes": labels,
+        "presets": {a: [preset for _, preset in axes[a]] for a in AXES},
+        "mean": mean,
+        "sd": sd,
+        "table": table,
+        "best": best,
+        "target_mean": target_mean,
+    }
+
+
+# ---------- 히트맵 ----------
+def sweep_heatmap_html(result, rows="curve", cols="bias", value="mean", fixed=None):
+    """
+    두 축을 고른 HTML 히트맵 (나머지 축은 fixed={축: 인덱스}, 기본 0)
+    target_mean 이 있으면 목표에 가까울수록 진한 초록, 없으면 값 크기로 칠한다.
+    """
+    fixed = fixed or {}
+    data = result[value]
+    sel = tuple(
+        slice(None) if a in (rows, cols) else fixed.get(a, 0) for a in AXES
+    )
+    grid = data[sel]
+    if AXES.index(rows) > AXES.index(cols):
+        grid = grid.T
+    target = result.get("target_mean")
+    if target is not None and value == "mean":
+        score = -np.abs(grid - target)
+    else:
+        score = grid
+    finite = score[np.isfinite(score)]
+    lo, hi = (float(finite.min()), float(finite.max())) if finite.size else (0.0, 0.0)
+    span = (hi - lo) or 1.0
+
+    head = "".join(f"<th>{c}</th>" for c in result["axes"][cols])
+    body = []
+    for i, r in enumerate(result["axes"][rows]):
+        cells = []
+        for j in range(grid.shape[1]):
+            if not np.isfinite(grid[i, j]):
+                cells.append("<td title='배점 합계가 모자라 만들 수 없는 조합'>—</td>")
+                continue
+            alpha = 0.1 + 0.8 * (float(score[i, j]) - lo) / span
+            cells.append(
+                f"<td style='background: rgba(34, 197, 94, {alpha:.2f});'>{grid[i, j]:.1f}</td>"
+            )
+        body.append(f"<tr><th>{r}</th>{''.join(cells)}</tr>")
+    return (
+        f"<table class='bp-table'><thead><tr><th>{rows} \\ {cols}</th>{head}</tr></thead>"
+        f"<tbody>{''.join(body)}</tbody></table>"
+    )
@@ -0,0 +1,112 @@
+"""
+계산 프로세스 풀 (CPU 를 많이 쓰는 핸들러를 GIL 밖에서)
+STEP4 최종 생성(final_outputs) · 카운터 표 전체 다시 그리기(create_table_html + 분석)는 Gradio 워커
+스레드에서 GIL 을 잡고 돌아, 여러 교사가 동시에 누르면 서로 줄을 선다.
+크기(문항 · 칸 수)가 MIN_SIZE 이상이면 미리 띄워 둔 ProcessPoolExecutor 로 보내고,
+작은 입력은 IPC 비용이 더 크므로 지금 프로세스(스레드)에서 계산한다.
+- TS_COMPUTE_WORKERS: 풀 워커 수 (기본: CPU 수 / uvicorn 워커 수, 최대 4 · 0 이면 풀 없이)
+- TS_COMPUTE_MIN_SIZE: 풀로 보내는 최소 크기 (기본 500 — 1,000문항 최종 생성이 10ms 남짓)
+- forkserver 가 계산 모듈(PRELOAD)을 한 번 불러 두고 워커를 그 복사본으로 띄우며,
+  warm_up() 이 시작할 때 워커를 모두 띄워 둔다 (첫 요청이 gradio 불러오기를 기다리지 않게).
+  워커 띄우기(submit)는 forkserver 의 PRELOAD 불러오기(수 초)가 끝날 때까지 막히므로
+  warm_up() · offload() 모두 이벤트 루프 밖 스레드에서 submit 한다.
+- 워커가 죽어 풀이 깨지면 새 풀을 만들고, 그 요청은 지금 프로세스에서 계산한다.
+- 넘기는 함수는 모듈 최상위 함수, 인자 · 결과는 dict/list/CounterState 처럼 pickle 되는 값만.
+
+    summary, mc_html, cr_html = await offload(final_outputs, stb, stc, size=문항 수)
+
+작업을 여러 개로 나눠 보내는 동기 코드(다중 양식 · 일괄 분석)는 get_pool() 에 직접 submit 하고,
+BrokenProcessPool 이면 discard(pool) 뒤 남은 작업을 지금 프로세스에서 계산한다.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from apps.session_state import WORKERS
+
+logger = logging.getLogger("uvicorn.error")
+
+MAX_DEFAULT_WORKERS = 4
+POOL_WORKERS = int(
+    os.environ.get("TS_COMPUTE_WORKERS", "")
+    or min(MAX_DEFAULT_WORKERS, max(1, (os.cpu_count() or 1) // WORKERS))
+)
+MIN_SIZE = int(os.environ.get("TS_COMPUTE_MIN_SIZE", "") or 500)
+PRELOAD = ["apps.exam_blueprint", "apps.counter_12345"]
+
+_pool = None
+_lock = threading.Lock()
+
+
+def _ready():
+    return os.getpid()
+
+
+def _start_workers(pool):
+    """워커를 모두 띄우고 pid 목록을 돌려준다 (막히는 호출 — 스레드에서)"""
+    futures = [pool.submit(_ready) for _ in range(POOL_WORKERS)]
+    return [f.result() for f in futures]
+
+
+def get_pool():
+    """풀 (없으면 만든다). TS_COMPUTE_WORKERS=0 이면 None"""
+    global _pool
+    if POOL_WORKERS <= 0:
+        return None
+    with _lock:
+        if _pool is None:
+            ctx = multiprocessing.get_context("forkserver")
+            ctx.set_forkserver_preload(PRELOAD)
+            _pool = ProcessPoolExecutor(max_workers=POOL_WORKERS, mp_context=ctx)
+        return _pool
+
+
+def discard(pool):
+    """깨진 풀을 버린다 (다음 get_pool() 이 새로 만든다)"""
+    global _pool
+    with _lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def warm_up():
+    """워커를 모두 띄워 둔다 (lifespan 에서 백그라운드로)"""
+    pool = get_pool()
+    if pool is None:
+        return
+    try:
+        pids = await asyncio.to_thread(_start_workers, pool)
+    except BrokenProcessPool:
+        logger.exception("계산 풀 워커를 띄우지 못했습니다 (첫 요청 때 다시 시도)")
+        discard(pool)
+        return
+    logger.info("계산 풀 준비: 워커 %d개 (pid %s)", len(set(pids)), ", ".join(map(str, sorted(set(pids)))))
+
+
+def shutdown():
+    """남은 작업은 취소하고 워커가 끝날 때까지 기다린다 (서버가 먼저 끝나면 워커가 남는다)"""
+    global _pool
+    with _lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+async def offload(fn, *args, size=0):
+    """fn(*args) 를 크기에 따라 풀 또는 지금 프로세스(스레드)에서 계산해 결과를 돌려준다"""
+    pool = get_pool() if size >= MIN_SIZE else None
+    if pool is None:
+        return await asyncio.to_thread(fn, *args)
+    try:
+        future = await asyncio.to_thread(pool.submit, fn, *args)
+        return await asyncio.wrap_future(future)
+    except BrokenProcessPool:
+        logger.warning("계산 풀이 깨져 새로 만듭니다 (%s 는 지금 프로세스에서 계산)", fn.__name__)
+        discard(pool)
+        return await asyncio.to_thread(fn, *args)
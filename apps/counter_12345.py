@@ -4,12 +4,124 @@
 Flask 통합용 모듈
 """
 
+import html
 import json
+import re
+import threading
+import uuid
+from collections import OrderedDict
+
 import gradio as gr
+import numpy as np
+
+from apps.compute_pool import offload
+from apps.counter_engine import (
+    DEFAULT_CHOICES,
+    EMPTY,
+    analyze,
+    analyze_codes,
+    cell_code,
+    choice_list,
+    codes_from_digits,
+    parse_answers,
+    parse_cell,
+    parse_choices,
+    positions_of,
+    spread,
+)
+from apps.counter_bulk import run_bulk_upload
+from apps.counter_forms import MAX_FORMS, stream_forms
+from apps.counter_patterns import PatternTracker, detect_patterns, pattern_messages
+from apps.counter_rebalance import suggest_rebalance
+from apps.session_state import QUEUE, dump_state, load_state
 
 
 # ----------------- 1. 공통 함수 (표 생성 및 재생성) ----------------- #
 
+# 표 스타일 · 키보드 처리는 페이지마다 한 번만 심는다 (counter_js) — 표 마크업에는 행만 남긴다
+COUNTER_CSS = """
+.custom-table-container {
+    max-height: 600px;
+    overflow-y: auto;
+    border: 1px solid #e5e7eb;
+    background: white;
+    padding: 5px;
+    border-radius: 8px;
+}
+.custom-table { width: 100%; border-collapse: collapse; }
+.custom-table th {
+    position: sticky; top: 0;
+    background: #f8fafc;
+    padding: 10px;
+    border-bottom: 2px solid #e2e8f0;
+    color: #475569;
+    z-index: 10;
+}
+.custom-table td {
+    border-bottom: 1px solid #f1f5f9;
+    padding: 4px;
+    text-align: center;
+}
+.custom-table td b { color: #64748b; }
+
+.ans-input {
+    width: 100%; max-width: 100px; padding: 10px; text-align: center;
+    border: 1px solid #cbd5e1; border-radius: 6px; font-size: 16px; font-weight: 600;
+    color: #334155;
+    -moz-appearance: textfield;
+    transition: all 0.2s;
+}
+.ans-input:focus {
+    border-color: #3b82f6;
+    background-color: #eff6ff;
+    box-shadow: 0 0 0 3px rgba(59, 130, 246, 0.1);
+    outline: none;
+}
+
+/* 1. 최다 빈도 (빨강) */
+.highlight-row { background-color: #fee2e2; }
+.highlight-row input { background-color: #fff1f2; border-color: #fca5a5; color: #be123c; }
+
+/* 2. 빈칸 (노랑 Warning) */
+.empty-row { background-color: #fef9c3; }
+.empty-row input { background-color: #fefce8; border-color: #fde047; }
+
+/* 3. 오류 값 (보라 Error) */
+.invalid-row { background-color: #f3e8ff; }
+.invalid-row input { background-color: #faf5ff; border-color: #d8b4fe; color: #7e22ce; }
+
+/* 4. 패턴 (주황): 연속 · 순서 · 순환 · 위치 쏠림 */
+.pattern-row { background-color: #ffedd5; }
+.pattern-row input { background-color: #fff7ed; border-color: #fdba74; color: #c2410c; }
+
+.big-input textarea, .big-input input {
+    height: 60px !important;
+    min-height: 60px !important;
+    font-size: 24px !important;
+    text-align: center !important;
+    padding: 10px !important;
+    line-height: normal !important;
+}
+
+/* 요약표 스타일 */
+.summary-table { width: 100%; border-collapse: collapse; margin-top: 10px; border: 1px solid #e5e7eb; }
+.summary-table th { background: #f1f5f9; padding: 8px; text-align: center; border-bottom: 2px solid #e2e8f0; }
+.summary-table td { padding: 8px; text-align: center; border-bottom: 1px solid #e5e7eb; }
+
+.row-max { background-color: #fee2e2; color: #991b1b; font-weight: bold; } /* 최다 */
+.row-min { background-color: #eff6ff; color: #1e40af; font-weight: bold; } /* 최소 */
+"""
+
+TABLE_HEAD = (
+    "<div class='custom-table-container'{state_attr}><table class='custom-table'>"
+    "<thead><tr><th>번호</th><th>정답</th></tr></thead><tbody>"
+)
+TABLE_TAIL = "</tbody></table></div>"
+ROW_TEMPLATE = (
+    "<tr class='{cls}'><td><b>{i}번</b></td><td><input type='number' id='q_{i}' "
+    "value='{val}' class='ans-input' autocomplete='off'></td></tr>"
+)
+
 
 def create_table_html(
     num_questions,
@@ -17,12 +129,16 @@ def create_table_html(
     highlight_nums=None,
     empty_idxs=None,
     invalid_idxs=None,
+    state_id=None,
+    pattern_idxs=None,
 ):
     """
     HTML 표를 생성하는 함수
     - highlight_nums: 최다 빈도 (빨강)
     - empty_idxs: 빈칸 (노랑)
-    - invalid_idxs: 1~5 이외의 값 (보라)
+    - invalid_idxs: 1~k 이외의 값 (보라)
+    - state_id: 서버 세션 상태(CounterState)와 짝을 맞추는 표 식별자
+    - pattern_idxs: 연속/순환/위치 쏠림 패턴 문항 (주황)
     """
     try:
         n = int(num_questions)
@@ -39,131 +155,36 @@ def create_table_html(
     target_nums = set(highlight_nums) if highlight_nums else set()
     empty_set = set(empty_idxs) if empty_idxs else set()
     invalid_set = set(invalid_idxs) if invalid_idxs else set()
+    pattern_set = set(pattern_idxs) if pattern_idxs else set()
 
-    # CSS 스타일
-    style = """
-    <style>
-        .custom-table-container {
-            max-height: 600px;
-            overflow-y: auto;
-            border: 1px solid #e5e7eb;
-            background: white;
-            padding: 5px;
-            border-radius: 8px;
-        }
-        .custom-table { width: 100%; border-collapse: collapse; }
-        .custom-table th {
-            position: sticky; top: 0;
-            background: #f8fafc;
-            padding: 10px;
-            border-bottom: 2px solid #e2e8f0;
-            color: #475569;
-            z-index: 10;
-        }
-        .custom-table td {
-            border-bottom: 1px solid #f1f5f9;
-            padding: 4px;
-            text-align: center;
-        }
-
-        .ans-input {
-            width: 100%; max-width: 100px; padding: 10px; text-align: center;
-            border: 1px solid #cbd5e1; border-radius: 6px; font-size: 16px; font-weight: 600;
-            color: #334155;
-            -moz-appearance: textfield;
-            transition: all 0.2s;
-        }
-        .ans-input:focus {
-            border-color: #3b82f6;
-            background-color: #eff6ff;
-            box-shadow: 0 0 0 3px rgba(59, 130, 246, 0.1);
-            outline: none;
-        }
+    rows = []
+    n_vals = len(current_values)
+    for idx in range(n):
+        raw_val = current_values[idx] if idx < n_vals else None
+        val_str = str(raw_val) if raw_val is not None else ""
+        rows.append(_row_html(idx + 1, val_str, _row_class(idx, val_str, target_nums, empty_set, invalid_set, pattern_set)))
 
-        /* 1. 최다 빈도 (빨강) */
-        .highlight-row { background-color: #fee2e2; }
-        .highlight-row input { background-color: #fff1f2; border-color: #fca5a5; color: #be123c; }
-
-        /* 2. 빈칸 (노랑 Warning) */
-        .empty-row { background-color: #fef9c3; }
-        .empty-row input { background-color: #fefce8; border-color: #fde047; }
-
-        /* 3. 오류 값 (보라 Error) */
-        .invalid-row { background-color: #f3e8ff; }
-        .invalid-row input { background-color: #faf5ff; border-color: #d8b4fe; color: #7e22ce; }
-
-        .big-input textarea, .big-input input {
-            height: 60px !important;
-            min-height: 60px !important;
-            font-size: 24px !important;
-            text-align: center !important;
-            padding: 10px !important;
-            line-height: normal !important;
-        }
+    state_attr = f" data-state='{state_id}'" if state_id else ""
+    return f"{TABLE_HEAD.format(state_attr=state_attr)}{''.join(rows)}{TABLE_TAIL}"
 
-        /* 요약표 스타일 */
-        .summary-table { width: 100%; border-collapse: collapse; margin-top: 10px; border: 1px solid #e5e7eb; }
-        .summary-table th { background: #f1f5f9; padding: 8px; text-align: center; border-bottom: 2px solid #e2e8f0; }
-        .summary-table td { padding: 8px; text-align: center; border-bottom: 1px solid #e5e7eb; }
 
-        .row-max { background-color: #fee2e2; color: #991b1b; font-weight: bold; } /* 최다 */
-        .row-min { background-color: #eff6ff; color: #1e40af; font-weight: bold; } /* 최소 */
-    </style>
-    """
+def _row_class(idx, val_str, target_nums, empty_set, invalid_set, pattern_set=()):
+    # 클래스 우선순위 결정 (오류 > 빈칸 > 최다빈도 > 패턴)
+    if idx in invalid_set:
+        return "invalid-row"  # 보라색
+    if idx in empty_set:
+        return "empty-row"  # 노란색
+    if val_str and val_str.isdigit() and int(val_str) in target_nums:
+        return "highlight-row"  # 빨간색
+    if idx in pattern_set:
+        return "pattern-row"  # 주황색
+    return ""
 
-    rows = ""
-    for i in range(1, n + 1):
-        idx = i - 1
-        val_str = ""
-
-        # 값 가져오기
-        if idx < len(current_values):
-            raw_val = current_values[idx]
-            val_str = str(raw_val) if raw_val is not None else ""
-
-        # 클래스 우선순위 결정 (오류 > 빈칸 > 최다빈도)
-        row_class = ""
-
-        if idx in invalid_set:
-            row_class = "invalid-row"  # 보라색
-        elif idx in empty_set:
-            row_class = "empty-row"  # 노란색
-        elif val_str and val_str.isdigit() and int(val_str) in target_nums:
-            row_class = "highlight-row"  # 빨간색
-
-        # [키보드 로직]
-        on_keydown_code = (
-            "if(event.key==='Enter'){"
-            "  event.preventDefault();"
-            f"  var next = document.getElementById('q_{i+1}');"
-            "  if(next){ next.focus(); next.select(); }"
-            "  else { document.getElementById('analyze_btn').click(); }"
-            "} else if(event.key==='ArrowDown'){"
-            "  event.preventDefault();"
-            f"  var next = document.getElementById('q_{i+1}');"
-            "  if(next){ next.focus(); next.select(); }"
-            "} else if(event.key==='ArrowUp'){"
-            "  event.preventDefault();"
-            f"  var prev = document.getElementById('q_{i-1}');"
-            "  if(prev){ prev.focus(); prev.select(); }"
-            "}"
-        )
 
-        rows += f"""
-            <tr class="{row_class}">
-                <td><b style="color:#64748b;">{i}번</b></td>
-                <td>
-                    <input type='number'
-                           id='q_{i}'
-                           value='{val_str}'
-                           class='ans-input'
-                           onkeydown="{on_keydown_code}"
-                           autocomplete='off'>
-                </td>
-            </tr>
-        """
-
-    return f"{style}<div class='custom-table-container'><table class='custom-table'><thead><tr><th>번호</th><th>정답</th></tr></thead><tbody>{rows}</tbody></table></div>"
+def _row_html(i, val_str, row_class):
+    if not val_str.isdigit():
+        val_str = html.escape(val_str)
+    return ROW_TEMPLATE.format(i=i, cls=row_class, val=val_str)
 
 
 # ----------------- 2. Gradio 연결 함수 ----------------- #
@@ -173,86 +194,106 @@ def init_table(num_questions):
     return create_table_html(num_questions)
 
 
-def analyze_and_update(num_questions, json_data):
-    CHOICES = [1, 2, 3, 4, 5]
+CHOICES = choice_list(DEFAULT_CHOICES)
+
+
+def classify_answers(values, nq, k=DEFAULT_CHOICES):
+    """
+    입력값 목록 → (표시용 값, 유효 정답, 빈칸 idx, 오류 idx)
+    - 설정된 문항 수(nq)만큼만 처리, 모자라면 빈칸
+    """
+    result = analyze(values, nq, k)
+    shown = result["values"]
+    invalid = set(result["invalid_idxs"])
+    valid_answers = [v for i, v in enumerate(shown) if v is not None and i not in invalid]
+    return shown, valid_answers, result["empty_idxs"], result["invalid_idxs"]
+
+
+def analyze_answers(values, nq=None, k=DEFAULT_CHOICES):
+    """
+    정답 목록 하나의 분포 분석 (화면 없이 쓰는 공통 로직 — counter_engine.analyze)
+    - 최다/최소 번호는 최다-최소 차이가 2개 이상일 때만 지정
+    """
+    return analyze(values, nq, k)
+
 
-    # 원본 데이터(화면 표시용)와 유효 데이터(계산용) 분리
-    raw_values_for_display = []
-    valid_answers = []
+# ---------- 압축 전송 (한 글자 = 한 문항) ----------
+# '0'~'9' 는 그 숫자, '_' 는 빈칸. 두 자리 이상이거나 숫자가 아닌 값이 하나라도 있으면
+# 브라우저가 JSON 목록으로 보낸다 (표시용 원래 값을 잃지 않도록).
+EMPTY_CODE = 255
+_WIRE_DIGITS = b"0123456789_"
+_WIRE_TABLE = bytes.maketrans(_WIRE_DIGITS, bytes(range(10)) + bytes([EMPTY_CODE]))
 
-    empty_idxs = []
-    invalid_idxs = []
 
+def decode_answers(payload):
+    """압축 문자열 → bytearray (칸마다 숫자 0~9 또는 EMPTY_CODE). 압축 형식이 아니면 None"""
+    if not isinstance(payload, str) or payload[:1] in ("[", "{"):
+        return None
+    try:
+        raw = payload.encode("ascii")
+    except UnicodeEncodeError:
+        return None
+    if raw.translate(None, _WIRE_DIGITS):
+        return None
+    return bytearray(raw.translate(_WIRE_TABLE))
+
+
+def analyze_compact(buf, nq=None, k=DEFAULT_CHOICES):
+    """decode_answers 결과로 analyze_answers 와 같은 분석 (파싱 없이 바이트 → 코드 배열)"""
+    shown, codes = codes_from_digits(buf, nq, EMPTY_CODE)
+    return analyze_codes(codes, k, shown)
+
+
+def analyze_and_update(num_questions, json_data, num_choices=DEFAULT_CHOICES):
     try:
         nq = int(num_questions)
     except:
         nq = 0
     if nq < 1:
         nq = 1
+    k = parse_choices(num_choices)
 
-    if json_data:
-        raw_list = json.loads(json_data)
-
-        # 설정된 문항 수(nq)만큼만 처리
-        for i in range(nq):
-            if i < len(raw_list):
-                s = str(raw_list[i]).strip()
-            else:
-                s = ""
-
-            if s == "":
-                # 1. 빈칸인 경우
-                empty_idxs.append(i)
-                raw_values_for_display.append(None)
-            else:
-                try:
-                    val = int(float(s))
-                    raw_values_for_display.append(val)
-
-                    if val in CHOICES:
-                        valid_answers.append(val)
-                    else:
-                        # 2. 1~5 범위를 벗어난 경우
-                        invalid_idxs.append(i)
-                except:
-                    # 숫자가 아닌 문자
-                    invalid_idxs.append(i)
-                    raw_values_for_display.append(s)
-
-    total_input = len(valid_answers)
+    # 입력이 없으면 빈 목록으로 (빈칸 표시 없음)
+    # 코드 배열은 한 번만 만들어 분포 분석과 패턴 탐지에 같이 쓴다
+    buf = decode_answers(json_data) if json_data else None
+    if buf is not None:
+        shown, codes = codes_from_digits(buf, nq, EMPTY_CODE)
+    else:
+        values = json.loads(json_data) if json_data else []
+        shown, codes = parse_answers(values, nq if json_data else 0)
+    result = analyze_codes(codes, k, shown)
+    patterns = detect_patterns(codes, k)
 
-    # ---------------------------------------------------------
-    # 통계 계산
-    # ---------------------------------------------------------
-    counts = {i: 0 for i in CHOICES}
-    for ans in valid_answers:
-        counts[ans] += 1
+    full_result_html, full_warning_msg, progress_text = render_analysis(result, nq, patterns)
 
-    # 최다/최소 계산
-    if total_input > 0:
-        max_count = max(counts.values())
-        min_count = min(counts.values())
-        diff = max_count - min_count
-    else:
-        max_count = 0
-        min_count = 0
-        diff = 0
+    # 표 재생성
+    new_table_html = create_table_html(
+        nq,
+        result["values"],
+        result["max_targets"],
+        result["empty_idxs"],
+        result["invalid_idxs"],
+        pattern_idxs=patterns["cells"],
+    )
+
+    return new_table_html, full_result_html, full_warning_msg, progress_text
 
-    max_targets = []
-    min_targets = []
-    highlight_nums = []
 
-    # 차이가 2개 이상일 때만 하이라이트
-    if diff >= 2:
-        max_targets = [k for k, v in counts.items() if v == max_count]
-        min_targets = [k for k, v in counts.items() if v == min_count]
-        highlight_nums = max_targets
+def render_analysis(result, nq, patterns=None):
+    """분석 결과 (+ detect_patterns 결과) → (요약표 + 상세 HTML, 경고 메시지, 입력 현황)"""
+    empty_idxs = result["empty_idxs"]
+    invalid_idxs = result["invalid_idxs"]
+    total_input = result["total_input"]
+    counts = result["counts"]
+    diff = result["diff"]
+    max_targets = result["max_targets"]
+    min_targets = result["min_targets"]
 
     # ---------------------------------------------------------
     # 요약표 생성
     # ---------------------------------------------------------
     summary_rows = ""
-    for i in CHOICES:
+    for i in counts:
         cnt = counts[i]
         ratio = (cnt / total_input) * 100 if total_input > 0 else 0
 
@@ -296,7 +337,7 @@ def analyze_and_update(num_questions, json_data):
     if invalid_idxs:
         invalid_str = ", ".join([f"{x+1}번" for x in invalid_idxs])
         warning_msgs.append(
-            f"🚫 <b>{invalid_str}</b>에 1~5 이외의 숫자가 있습니다. (보라색 칸)"
+            f"🚫 <b>{invalid_str}</b>에 1~{len(counts)} 이외의 숫자가 있습니다. (보라색 칸)"
         )
 
     if empty_idxs:
@@ -312,11 +353,8 @@ def analyze_and_update(num_questions, json_data):
             detail_lines.append("### 📌 최다 빈도 문항 분석")
 
             for t in max_targets:
-                # 유효 데이터 내에서 해당 번호 위치 찾기
-                q_list = []
-                for idx, val in enumerate(raw_values_for_display):
-                    if val == t:
-                        q_list.append(f"{idx + 1}번")
+                # 유효 데이터 내에서 해당 번호 위치
+                q_list = [f"{idx + 1}번" for idx in result["max_positions"][t]]
                 q_str = ", ".join(q_list)
 
                 detail_lines.append(
@@ -343,6 +381,10 @@ def analyze_and_update(num_questions, json_data):
     else:
         warning_msgs.append("ℹ️ 유효한 정답이 하나도 없습니다.")
 
+    # 3. 배열 패턴 (연속 · 순서 · 순환 · 위치 쏠림)
+    if patterns:
+        warning_msgs.extend(pattern_messages(patterns))
+
     # 메시지 합치기
     full_warning_msg = "<br>".join(warning_msgs)
     full_result_html = summary_html + "\n\n" + "\n".join(detail_lines)
@@ -350,21 +392,468 @@ def analyze_and_update(num_questions, json_data):
     progress_ratio = min(total_input / nq, 1.0)
     progress_text = f"입력 현황: {total_input} / {nq} 문항 ({progress_ratio * 100:.1f}%)"
 
-    # 표 재생성
-    new_table_html = create_table_html(
-        nq, raw_values_for_display, highlight_nums, empty_idxs, invalid_idxs
+    return full_result_html, full_warning_msg, progress_text
+
+
+# ----------------- 2-1. 세션 상태 (증분 분석) ----------------- #
+
+
+class CounterState:
+    """
+    세션별 카운터 상태
+    브라우저는 바뀐 칸만 보내고, 개수 · 빈칸/오류 집합 · 번호별 위치는 칸마다 O(1) 로 고친다.
+    id 는 표 마크업(data-state)에 찍어 두고, 브라우저 표와 상태가 어긋났는지 확인하는 데 쓴다.
+    """
+
+    def __init__(self, nq, k=DEFAULT_CHOICES):
+        self.id = uuid.uuid4().hex[:12]
+        self.nq = nq
+        self.values = [None] * nq
+        self.codes = np.full(nq, EMPTY, dtype=np.int16)
+        self.highlight = []
+        # 새 표는 색이 없으므로 첫 분석은 모든 행을 패치한다
+        self.painted = False
+        self.set_choices(k)
+
+    def set_choices(self, k):
+        """선택지 수를 바꾸고 코드 배열에서 개수 · 위치 · 빈칸/오류 집합을 다시 만든다"""
+        self.k = k
+        choices = choice_list(k)
+        valid = (self.codes >= 1) & (self.codes <= k)
+        empty = self.codes == EMPTY
+        self.counts = dict.fromkeys(choices, 0)
+        self.positions = {c: set(pos) for c, pos in positions_of(self.codes, choices).items()}
+        for c in choices:
+            self.counts[c] = len(self.positions[c])
+        self.empty = set(np.flatnonzero(empty).tolist())
+        self.invalid = set(np.flatnonzero(~(valid | empty)).tolist())
+        # 패턴 표시 칸은 tracker 가 칸마다 고쳐 간다 (pattern 은 그 집합)
+        self.tracker = PatternTracker(self.codes, k)
+        self.pattern = self.tracker.cells
+
+    def set(self, i, raw):
+        old = self.values[i]
+        if old is None:
+            self.empty.discard(i)
+        elif old in self.counts:
+            self.counts[old] -= 1
+            self.positions[old].discard(i)
+        else:
+            self.invalid.discard(i)
+
+        val = parse_cell(raw)
+        self.values[i] = val
+        self.codes[i] = cell_code(val)
+        if val is None:
+            self.empty.add(i)
+        elif val in self.counts:
+            self.counts[val] += 1
+            self.positions[val].add(i)
+        else:
+            self.invalid.add(i)
+
+    def load(self, values):
+        self.values, self.codes = parse_answers(values, self.nq)
+        self.set_choices(self.k)
+
+    def load_compact(self, buf):
+        """새 상태에 decode_answers 결과를 한 번에 채운다"""
+        self.values, self.codes = codes_from_digits(buf, self.nq, EMPTY_CODE)
+        self.set_choices(self.k)
+
+    def analysis(self):
+        """analyze_answers 와 같은 모양의 결과"""
+        counts = dict(self.counts)
+        total_input = sum(counts.values())
+        diff, max_targets, min_targets = spread(counts, total_input)
+        return {
+            "nq": self.nq,
+            "k": self.k,
+            "values": self.values,
+            "empty_idxs": sorted(self.empty),
+            "invalid_idxs": sorted(self.invalid),
+            "total_input": total_input,
+            "counts": counts,
+            "diff": diff,
+            "max_targets": max_targets,
+            "min_targets": min_targets,
+            "max_positions": {t: sorted(self.positions[t]) for t in max_targets},
+        }
+
+    def row_patch(self, idxs):
+        """바뀐 행만 [idx, 행 클래스, 표시 값] 목록으로"""
+        target_nums = set(self.highlight)
+        out = []
+        for idx in sorted(idxs):
+            val = self.values[idx]
+            val_str = str(val) if val is not None else ""
+            row_class = _row_class(idx, val_str, target_nums, self.empty, self.invalid, self.pattern)
+            out.append([idx, row_class, val_str])
+        return out
+
+
+# ---------- 서명한 세션 상태 (여러 워커) ----------
+# 상태는 숨긴 Textbox 에 서명 토큰(apps/session_state.py)으로 두어 어느 워커든 이어 받는다.
+# 토큰에는 칸 값 · id · 선택지 수 · 강조 번호만 담고, 개수 · 위치 · 패턴은 받을 때 다시 만든다.
+# 같은 워커로 다시 온 토큰은 최근 상태를 그대로 쓴다 (칸마다 다시 만들지 않도록).
+LIVE_STATES = 64
+_live_states = OrderedDict()
+_live_lock = threading.Lock()
+
+
+def _dump_values(values):
+    """칸 값 → 압축 문자열 (한 자리 숫자 · 빈칸만일 때) 또는 목록 (빈칸은 '')"""
+    if all(v is None or (type(v) is int and 0 <= v <= 9) for v in values):
+        return "".join("_" if v is None else str(v) for v in values)
+    return ["" if v is None else v for v in values]
+
+
+def dump_counter_state(state):
+    """CounterState → 서명 토큰 (없으면 빈 문자열)"""
+    if state is None:
+        return ""
+    token = dump_state({
+        "id": state.id,
+        "nq": state.nq,
+        "k": state.k,
+        "values": _dump_values(state.values),
+        "highlight": state.highlight,
+        "painted": state.painted,
+    })
+    with _live_lock:
+        _live_states[token] = state
+        while len(_live_states) > LIVE_STATES:
+            _live_states.popitem(last=False)
+    return token
+
+
+def load_counter_state(token):
+    """
+    서명 토큰 → CounterState (비었거나 서명이 틀리면 None → 브라우저에 전체 값을 다시 요청)
+    최근 상태는 꺼내 쓰므로(핸들러가 고친다) 같은 토큰이 또 오면 토큰에서 다시 만든다.
+    """
+    if not token:
+        return None
+    with _live_lock:
+        state = _live_states.pop(token, None)
+    if state is not None:
+        return state
+    data = load_state(token)
+    if not isinstance(data, dict):
+        return None
+    try:
+        state = CounterState(int(data["nq"]), parse_choices(data["k"]))
+        values = data["values"]
+        buf = decode_answers(values) if isinstance(values, str) else None
+        if buf is not None:
+            state.load_compact(buf)
+        else:
+            state.load(values if isinstance(values, list) else [])
+        state.id = str(data["id"])
+        state.highlight = [h for h in data["highlight"] if h in state.counts]
+        state.painted = bool(data["painted"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    return state
+
+
+def init_table_state(num_questions, num_choices=DEFAULT_CHOICES):
+    """새 표 + 새 세션 상태"""
+    try:
+        n = int(num_questions)
+    except (TypeError, ValueError):
+        n = 0
+    if n < 1:
+        return create_table_html(0), None
+    state = CounterState(n, parse_choices(num_choices))
+    return create_table_html(n, state_id=state.id), state
+
+
+def _render_full(state):
+    """상태 전체 → (표 HTML, 빈 패치, 요약, 경고, 입력 현황) — 이후 증분 분석의 기준이 된다"""
+    state.painted = True
+    result = state.analysis()
+    state.highlight = result["max_targets"]
+    patterns = state.tracker.patterns()
+    table = create_table_html(
+        state.nq,
+        state.values,
+        result["max_targets"],
+        result["empty_idxs"],
+        result["invalid_idxs"],
+        state.id,
+        state.pattern,
     )
+    return (table, "", *render_analysis(result, state.nq, patterns))
+
+
+def analyze_delta(num_questions, delta_json, state, num_choices=DEFAULT_CHOICES):
+    """
+    증분 분석 핸들러
+    delta_json: {"rows": 표 행 수, "sid": 표의 상태 id, "changes": {idx: 값}}
+                또는 {"full": 압축 문자열 | [값…]}
+    반환: (표 HTML 또는 그대로, 행 패치 JSON, 요약, 경고, 입력 현황, 상태)
+    - 상태와 표가 맞으면 바뀐 칸 + 최다 번호가 바뀐 행만 패치로 돌려준다.
+    - 표가 없거나 문항 수가 바뀌었으면 전체를 새로 그린다.
+    - 상태를 잃었으면(서버 재시작 등) 브라우저에 전체 값을 다시 요청한다.
+    - 선택지 수만 바뀌었으면 상태의 코드 배열로 다시 세고 모든 행을 패치한다.
+    """
+    try:
+        nq = int(num_questions)
+    except (TypeError, ValueError):
+        nq = 0
+    if nq < 1:
+        nq = 1
+    k = parse_choices(num_choices)
+
+    try:
+        delta = json.loads(delta_json) if delta_json else {}
+    except ValueError:
+        delta = {}
+    if not isinstance(delta, dict):
+        delta = {}
+    rows = delta.get("rows") or 0
+    full = delta.get("full")
+
+    in_sync = (
+        state is not None
+        and state.nq == nq
+        and rows == nq
+        and delta.get("sid") == state.id
+    )
+    if full is None and not in_sync and rows > 0:
+        resync = json.dumps({"resync": True})
+        return gr.update(), resync, gr.update(), gr.update(), gr.update(), state
+
+    if full is not None or not in_sync:
+        # 전체 다시 그리기
+        state = CounterState(nq, k)
+        buf = decode_answers(full)
+        if buf is not None:
+            state.load_compact(buf)
+        else:
+            state.load(full if isinstance(full, list) else [])
+        return (*_render_full(state), state)
+
+    if state.k != k:
+        state.set_choices(k)
+        state.painted = False
+
+    changed = set()
+    for key, raw in (delta.get("changes") or {}).items():
+        try:
+            idx = int(key)
+        except (TypeError, ValueError):
+            continue
+        if 0 <= idx < nq:
+            state.set(idx, raw)
+            changed.add(idx)
+
+    # 패턴은 바뀐 칸 주변만 다시 본다
+    changed |= state.tracker.update(state.codes, changed)
+    result = state.analysis()
+    if not state.painted:
+        changed = set(range(nq))
+        state.painted = True
+    for t in set(state.highlight) ^ set(result["max_targets"]):
+        changed |= state.positions[t]
+    state.highlight = result["max_targets"]
+    patterns = state.tracker.patterns()
+    patch = json.dumps({"rows": state.row_patch(changed)})
+    return (gr.update(), patch, *render_analysis(result, nq, patterns), state)
+
+
+# ----------------- 2-2. 붙여넣기 ----------------- #
+
+_SPLIT_CELLS = re.compile(r"[,\s]+")
+
+
+def parse_pasted(text):
+    """
+    붙여넣은 정답 → 칸 값 목록 (한 번 훑기)
+    - '13524_1…' 한 줄 숫자열: 한 글자 = 한 문항 ('_' 는 빈칸)
+    - 스프레드시트 열: 한 줄 = 한 문항 (빈 줄은 빈칸, 여러 열이면 마지막 열)
+    - 한 줄에 쉼표/공백으로 나열: '1, 3, 5, 2'
+    반환: (값 목록, 압축 버퍼 또는 None)
+    """
+    text = str(text or "").rstrip("\r\n")
+    if not text.strip():
+        return [], None
+    one_line = "\n" not in text
+    if one_line:
+        packed = decode_answers(text.strip())
+        if packed is not None:
+            return list(text.strip()), packed
+        return [v for v in _SPLIT_CELLS.split(text.strip()) if v], None
+    values = []
+    for line in text.splitlines():
+        cells = line.split("\t")
+        values.append(cells[-1].strip() if len(cells) > 1 else line.strip())
+    return values, None
+
+
+def paste_answers(num_questions, text, num_choices=DEFAULT_CHOICES):
+    """
+    붙여넣기 핸들러: 문항 수를 비워 두면 붙여넣은 개수로 표를 만들고, 한 번에 채워 분석한다.
+    반환: (표, 패치, 요약, 경고, 입력 현황, 상태, 문항 수)
+    분류 · 색 · 경고는 같은 값을 한 칸씩 입력하고 분석한 결과와 같다.
+    """
+    values, packed = parse_pasted(text)
+    if not values:
+        return (gr.update(),) * 4 + ("붙여넣은 정답이 없습니다.", gr.update(), gr.update())
+    try:
+        nq = int(num_questions)
+    except (TypeError, ValueError):
+        nq = 0
+    if nq < 1:
+        nq = len(values)
+
+    state = CounterState(nq, parse_choices(num_choices))
+    if packed is not None:
+        state.load_compact(packed)
+    else:
+        state.load(values)
+    table, patch, summary, warning, progress = _render_full(state)
+    if len(values) > nq:
+        warning = f"✂️ 붙여넣은 {len(values)}개 중 {nq}개만 채웠습니다. (문항 수 {nq})<br>" + warning
+    return table, patch, summary, warning, progress, state, str(nq)
 
-    return new_table_html, full_result_html, full_warning_msg, progress_text
+
+# ----------------- 2-3. 표에서 바로 (재배치 · 양식) ----------------- #
+
+def table_state(num_questions, payload, num_choices=DEFAULT_CHOICES):
+    """
+    표 전체 값(get_data_js 의 압축 문자열 또는 JSON) → 새 CounterState (표가 없으면 None)
+    세션 상태에 기대지 않으므로 요청이 어느 워커로 가도, 증분 분석이 다시 맞추는 중이어도 같은 결과
+    """
+    try:
+        nq = int(num_questions)
+    except (TypeError, ValueError):
+        return None
+    if nq < 1 or not payload:
+        return None
+    state = CounterState(nq, parse_choices(num_choices))
+    buf = decode_answers(payload)
+    if buf is not None:
+        state.load_compact(buf)
+        return state
+    try:
+        values = json.loads(payload)
+    except ValueError:
+        return None
+    state.load(values if isinstance(values, list) else [])
+    return state
+
+
+def rebalance_table(num_questions, payload, num_choices, locked_text):
+    return suggest_rebalance(table_state(num_questions, payload, num_choices), locked_text)
+
+
+def forms_table(num_questions, payload, num_choices, n_forms, blocks_text):
+    yield from stream_forms(table_state(num_questions, payload, num_choices), n_forms, blocks_text)
+
+
+def forms_table_once(num_questions, payload, num_choices, n_forms, blocks_text):
+    """큐 없이(워커 여럿) 부를 때: 스트리밍 없이 마지막 표만"""
+    out = None
+    for out in forms_table(num_questions, payload, num_choices, n_forms, blocks_text):
+        pass
+    return out
 
 
 # ----------------- 3. 자바스크립트 ----------------- #
 
+# 표의 현재 값 전체 (압축 문자열, 안 되면 JSON) + 나머지 입력은 그대로 — 재배치 · 양식에서 사용
 get_data_js = """
-(num, _ignored) => {
+(num, _ignored, ...rest) => {
     const inputs = document.querySelectorAll('.ans-input');
     const values = Array.from(inputs).map(i => i.value);
-    return [num, JSON.stringify(values)];
+    const packed = window.__counterEncode && window.__counterEncode(values);
+    return [num, packed || JSON.stringify(values), ...rest];
+}
+"""
+
+# 페이지 로드 때 한 번: 스타일 주입 + 표 전체에 대한 위임 키보드 처리
+# [Enter] 다음 칸 (마지막 칸이면 분석) / [↓][↑] 위아래 이동
+counter_js = """
+() => {
+  if (!document.getElementById("counter-style")) {
+    const s = document.createElement("style");
+    s.id = "counter-style";
+    s.textContent = %s;
+    document.head.appendChild(s);
+  }
+  // 압축 전송: 한 칸 한 글자 ('_' = 빈칸), 안 되는 값이 있으면 null → 호출 쪽이 JSON 으로
+  window.__counterEncode = function(values) {
+    let out = "";
+    for (const v of values) {
+      const t = v.trim();
+      if (t === "") out += "_";
+      else if (t.length === 1 && t >= "0" && t <= "9") out += t;
+      else return null;
+    }
+    return out;
+  };
+  if (window.__counterKeysBound) return;
+  window.__counterKeysBound = true;
+
+  document.addEventListener("keydown", function(event) {
+    const el = event.target;
+    if (!el.classList || !el.classList.contains("ans-input")) return;
+    const i = parseInt(el.id.slice(2), 10);
+    let target = null;
+    if (event.key === "Enter" || event.key === "ArrowDown") {
+      event.preventDefault();
+      target = document.getElementById("q_" + (i + 1));
+      if (!target && event.key === "Enter") {
+        document.getElementById("analyze_btn").click();
+        return;
+      }
+    } else if (event.key === "ArrowUp") {
+      event.preventDefault();
+      target = document.getElementById("q_" + (i - 1));
+    }
+    if (target) { target.focus(); target.select(); }
+  });
+}
+""" % json.dumps(COUNTER_CSS)
+
+# 바뀐 칸(value ≠ defaultValue)만 보낸다. 서버가 재동기화를 요청하면 전체 값을 한 번 보낸다.
+get_delta_js = """
+(num, _ignored, _state, k) => {
+    const box = document.querySelector('.custom-table-container[data-state]');
+    const inputs = document.querySelectorAll('.ans-input');
+    const msg = {rows: inputs.length, sid: box ? box.dataset.state : null};
+    if (window.__counterResync) {
+        window.__counterResync = false;
+        const values = Array.from(inputs).map(i => i.value);
+        msg.full = (window.__counterEncode && window.__counterEncode(values)) ?? values;
+    } else {
+        const changes = {};
+        inputs.forEach((el, i) => { if (el.value !== el.defaultValue) changes[i] = el.value; });
+        msg.changes = changes;
+    }
+    return [num, JSON.stringify(msg), null, k];
+}
+"""
+
+# 서버가 돌려준 행 패치 적용 (행 클래스 + 정리된 값, defaultValue 도 맞춰 둔다)
+apply_patch_js = """
+(patch) => {
+    if (!patch) return;
+    const p = JSON.parse(patch);
+    if (p.resync) {
+        window.__counterResync = true;
+        document.getElementById('analyze_btn').click();
+        return;
+    }
+    for (const [idx, cls, val] of p.rows) {
+        const el = document.getElementById('q_' + (idx + 1));
+        if (!el) continue;
+        el.closest('tr').className = cls;
+        el.value = val;
+        el.defaultValue = val;
+    }
 }
 """
 
@@ -374,7 +863,6 @@ get_data_js = """
 
 def create_counter_app():
     """Gradio 앱 생성 함수"""
-
     with gr.Blocks(title="①②③④⑤ 카운터") as demo:
         gr.Markdown("# 💯 ①②③④⑤ 카운터")
         gr.Markdown(
@@ -393,6 +881,12 @@ def create_counter_app():
                     elem_classes="big-input",
                 )
 
+                num_choices = gr.Dropdown(
+                    label="선택지 수",
+                    choices=list(range(2, 11)),
+                    value=DEFAULT_CHOICES,
+                )
+
                 set_btn = gr.Button("새 표 만들기", variant="secondary")
 
                 gr.Markdown("---")
@@ -404,6 +898,35 @@ def create_counter_app():
                     elem_id="analyze_btn",
                 )
 
+                with gr.Accordion("📋 정답 붙여넣기", open=False):
+                    paste_box = gr.Textbox(
+                        label="정답 (숫자열 또는 스프레드시트 열)",
+                        placeholder="예: 13524135… 또는 엑셀에서 복사한 한 열",
+                        lines=4,
+                    )
+                    paste_btn = gr.Button("표에 채우기", variant="secondary")
+
+                with gr.Accordion("🔧 정답 재배치 제안", open=False):
+                    locked_box = gr.Textbox(
+                        label="고정 문항 (바꾸지 않을 문항)", placeholder="예: 3, 7, 12-15"
+                    )
+                    rebalance_btn = gr.Button("재배치 계산", variant="secondary")
+
+                with gr.Accordion("📑 다중 양식 (A/B/C/D형)", open=False):
+                    n_forms = gr.Number(
+                        label=f"양식 수 (최대 {MAX_FORMS})", value=4, precision=0, minimum=1, maximum=MAX_FORMS
+                    )
+                    blocks_box = gr.Textbox(
+                        label="난이도 블록 (블록 안에서만 문항을 섞음)",
+                        placeholder="예: 1-10, 11-25, 26-30 (비우면 전체)",
+                    )
+                    forms_btn = gr.Button("양식 만들기", variant="secondary")
+
+                with gr.Accordion("📁 일괄 분석 (CSV/ZIP)", open=False):
+                    gr.Markdown("한 행에 한 시험: `시험 이름, 1번 정답, 2번 정답, …`")
+                    bulk_file = gr.File(label="정답 파일", file_types=[".csv", ".zip"])
+                    bulk_btn = gr.Button("일괄 분석", variant="secondary")
+
             # 가운데: 표
             with gr.Column(scale=1.5):
                 gr.Markdown("### 📝 정답 입력")
@@ -417,16 +940,114 @@ def create_counter_app():
                 warning_out = gr.HTML("")
                 progress_out = gr.Markdown("")
 
-        # ----- 이벤트 연결 -----
+        rebalance_out = gr.HTML("")
+        forms_out = gr.HTML("")
+        bulk_out = gr.HTML("")
+        patch_out = gr.Textbox(visible=False)
+        # 세션 상태: 서명 토큰 (gr.State 는 워커마다 따로라 여러 워커 배포에서 끊긴다)
+        counter_state = gr.Textbox("", visible=False)
 
-        set_btn.click(init_table, inputs=[num_questions], outputs=[table_html])
-        num_questions.submit(init_table, inputs=[num_questions], outputs=[table_html])
+        # ----- 이벤트 연결 -----
+        # 표 전체를 그리는 핸들러는 크기(문항 수 · 보낸 칸 수)가 크면 계산 풀에서 (apps/compute_pool.py).
+        # 상태(CounterState)는 토큰에서 꺼내 넘겼다가 돌려받은 것을 다시 토큰으로 만든다.
+
+        async def on_init(num_q, k):
+            try:
+                size = int(num_q)
+            except (TypeError, ValueError):
+                size = 0
+            table, state = await offload(init_table_state, num_q, k, size=size)
+            return table, dump_counter_state(state)
+
+        async def on_analyze(num_q, delta_json, token, k):
+            # 증분(바뀐 칸만)은 작아서 그대로, 전체 다시 그리기는 보낸 값 길이만큼
+            state = load_counter_state(token)
+            *out, state = await offload(
+                analyze_delta, num_q, delta_json, state, k, size=len(delta_json or "")
+            )
+            return (*out, dump_counter_state(state))
+
+        async def on_paste(num_q, text, k):
+            *out, state, nq = await offload(paste_answers, num_q, text, k, size=len(text or ""))
+            if isinstance(state, CounterState):
+                state = dump_counter_state(state)
+            return (*out, state, nq)
+
+        set_btn.click(
+            on_init,
+            inputs=[num_questions, num_choices],
+            outputs=[table_html, counter_state],
+            queue=QUEUE,
+            api_name="init_table_state",
+        )
+        # Enter 는 버튼과 같은 동작 — API 는 버튼 쪽 이름 하나만
+        num_questions.submit(
+            on_init,
+            inputs=[num_questions, num_choices],
+            outputs=[table_html, counter_state],
+            queue=QUEUE,
+            api_name=False,
+        )
 
         analyze_btn.click(
-            analyze_and_update,
-            inputs=[num_questions, table_html],
-            outputs=[table_html, summary_out, warning_out, progress_out],
+            on_analyze,
+            inputs=[num_questions, table_html, counter_state, num_choices],
+            outputs=[table_html, patch_out, summary_out, warning_out, progress_out, counter_state],
+            js=get_delta_js,
+            queue=QUEUE,
+            api_name="analyze_delta",
+        ).then(fn=None, inputs=[patch_out], js=apply_patch_js)
+
+        demo.load(fn=None, inputs=[], outputs=[], js=counter_js)
+
+        paste_btn.click(
+            on_paste,
+            inputs=[num_questions, paste_box, num_choices],
+            outputs=[
+                table_html,
+                patch_out,
+                summary_out,
+                warning_out,
+                progress_out,
+                counter_state,
+                num_questions,
+            ],
+            queue=QUEUE,
+            api_name="paste_answers",
+        )
+
+        # 표의 최신 값을 먼저 반영(증분 분석)한 뒤, 표 전체 값으로 계산 (세션 상태 없이)
+        # 앞의 증분 분석은 analyze_btn 과 같은 내부 단계라 API 로 내놓지 않는다
+        rebalance_btn.click(
+            on_analyze,
+            inputs=[num_questions, table_html, counter_state, num_choices],
+            outputs=[table_html, patch_out, summary_out, warning_out, progress_out, counter_state],
+            js=get_delta_js,
+            queue=QUEUE,
+            api_name=False,
+        ).then(fn=None, inputs=[patch_out], js=apply_patch_js).then(
+            rebalance_table,
+            inputs=[num_questions, table_html, num_choices, locked_box],
+            outputs=[rebalance_out],
             js=get_data_js,
+            queue=QUEUE,
         )
 
+        forms_btn.click(
+            on_analyze,
+            inputs=[num_questions, table_html, counter_state, num_choices],
+            outputs=[table_html, patch_out, summary_out, warning_out, progress_out, counter_state],
+            js=get_delta_js,
+            queue=QUEUE,
+            api_name=False,
+        ).then(fn=None, inputs=[patch_out], js=apply_patch_js).then(
+            forms_table if QUEUE else forms_table_once,
+            inputs=[num_questions, table_html, num_choices, n_forms, blocks_box],
+            outputs=[forms_out],
+            js=get_data_js,
+            queue=QUEUE,
+        )
+
+        bulk_btn.click(run_bulk_upload, inputs=[bulk_file, num_choices], outputs=[bulk_out], queue=QUEUE)
+
     return demo
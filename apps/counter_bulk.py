@@ -0,0 +1,247 @@
+"""
+①②③④⑤ 카운터 · 일괄 분석
+학기말에 학교 전체 시험의 정답 분포를 한 번에 점검하기 위한 CSV/ZIP 일괄 분석.
+analyze_answers 와 같은 규칙(빈칸 · 1~k 이외 값 · 최다 빈도, 최다-최소 차이 2개 이상)을
+행 단위로 읽으면서 공용 계산 풀(apps.compute_pool)에 나눠 돌리고, 시험별 페이지 대신 하나의 보고서로 묶는다.
+선택지 수 k 는 화면의 선택지 수를 따른다 (모든 시험에 같은 k).
+
+입력 형식
+- CSV: 한 행이 한 시험. 첫 칸은 시험 이름, 나머지 칸은 1번부터의 정답.
+       첫 칸이 '시험'/'시험명'/'과목'/'name'/'exam' 인 첫 행은 머리글로 보고 건너뛴다.
+       정답 칸이 하나뿐이고 숫자만 있으면 '13524…' 같은 한 줄 정답으로 본다.
+- ZIP: 안의 .csv 는 위와 같이, .txt 는 파일 하나가 한 시험(공백/쉼표/줄바꿈 구분 또는 숫자열).
+"""
+
+import csv
+import html
+import io
+import logging
+import re
+import zipfile
+from collections import deque
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from apps import compute_pool
+from apps.counter_engine import DEFAULT_CHOICES, analyze_codes, choice_list, parse_answers, parse_choices
+
+logger = logging.getLogger("uvicorn.error")
+
+HEADER_NAMES = {"시험", "시험명", "과목", "name", "exam"}
+CHUNK_KEYS = 64
+# 동시에 처리 중인 묶음 수 상한 (워커 수의 배수) — 큰 파일도 메모리에 다 올리지 않는다
+MAX_PENDING_PER_WORKER = 4
+
+
+# ---------- 읽기 ----------
+def _split_answers(cells):
+    cells = [c.strip() for c in cells]
+    while cells and cells[-1] == "":
+        cells.pop()
+    if len(cells) == 1 and cells[0].isdigit() and len(cells[0]) > 1:
+        return list(cells[0])
+    return cells
+
+
+def _decode_lines(raw):
+    """바이너리 스트림 → 텍스트 줄 (UTF-8 우선, 엑셀 한글 CSV 는 CP949)"""
+    head = raw.peek(65536)
+    encoding = "utf-8-sig"
+    try:
+        head.decode(encoding)
+    except UnicodeDecodeError as e:
+        # 미리보기 끝에서 잘린 글자는 무시
+        if e.start < len(head) - 3:
+            encoding = "cp949"
+    return io.TextIOWrapper(raw, encoding=encoding, errors="replace", newline="")
+
+
+def _iter_csv(stream, prefix=""):
+    for row_no, row in enumerate(csv.reader(stream), start=1):
+        if not row or not any(c.strip() for c in row):
+            continue
+        if row_no == 1 and row[0].strip().lower() in HEADER_NAMES:
+            continue
+        name = row[0].strip() or f"{row_no}행"
+        yield f"{prefix}{name}", _split_answers(row[1:])
+
+
+def _iter_txt(text, name):
+    tokens = [t for t in re.split(r"[\s,]+", text) if t]
+    if len(tokens) == 1 and tokens[0].isdigit():
+        tokens = list(tokens[0])
+    yield name, tokens
+
+
+def iter_answer_keys(path):
+    """CSV/ZIP 파일 → (시험 이름, 정답 목록) 을 한 행씩"""
+    path = Path(path)
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as zf:
+            for info in zf.infolist():
+                if info.is_dir():
+                    continue
+                member = info.filename
+                stem = Path(member).stem
+                ext = Path(member).suffix.lower()
+                if ext == ".csv":
+                    with zf.open(info) as raw:
+                        yield from _iter_csv(_decode_lines(raw), f"{stem}:")
+                elif ext == ".txt":
+                    with zf.open(info) as raw:
+                        yield from _iter_txt(_decode_lines(raw).read(), stem)
+        return
+    with open(path, "rb") as raw:
+        yield from _iter_csv(_decode_lines(raw))
+
+
+# ---------- 분석 ----------
+def _analyze_chunk(chunk, k=DEFAULT_CHOICES):
+    """(이름, 정답 목록) 묶음 → 시험별 요약 (계산 풀 작업 단위)"""
+    out = []
+    for name, values in chunk:
+        shown, codes = parse_answers(values)
+        r = analyze_codes(codes, k, shown)
+        out.append(
+            {
+                "name": name,
+                "nq": r["nq"],
+                "total_input": r["total_input"],
+                "counts": r["counts"],
+                "diff": r["diff"],
+                "empty": [i + 1 for i in r["empty_idxs"]],
+                "invalid": [i + 1 for i in r["invalid_idxs"]],
+                "max_targets": r["max_targets"],
+                "min_targets": r["min_targets"],
+            }
+        )
+    return out
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def analyze_bulk(rows, k=DEFAULT_CHOICES, use_pool=True, chunk_size=CHUNK_KEYS):
+    """
+    (이름, 정답 목록) 스트림 → 통합 보고서 (시험 순서 그대로)
+    k: 선택지 수, use_pool: 공용 계산 풀 사용 (False 이거나 풀이 없으면 현재 프로세스에서)
+    """
+    pool = compute_pool.get_pool() if use_pool else None
+    chunks = _chunks(rows, chunk_size)
+    exams = []
+    if pool is not None:
+        limit = compute_pool.POOL_WORKERS * MAX_PENDING_PER_WORKER
+        pending = deque()
+        unsent = None
+        try:
+            for unsent in chunks:
+                pending.append((pool.submit(_analyze_chunk, unsent, k), unsent))
+                unsent = None
+                if len(pending) >= limit:
+                    exams.extend(pending[0][0].result())
+                    pending.popleft()
+            while pending:
+                exams.extend(pending[0][0].result())
+                pending.popleft()
+        except BrokenProcessPool:
+            logger.warning("계산 풀이 깨져 남은 일괄 분석은 지금 프로세스에서 계산합니다")
+            compute_pool.discard(pool)
+            for _, chunk in pending:
+                exams.extend(_analyze_chunk(chunk, k))
+            if unsent is not None:
+                exams.extend(_analyze_chunk(unsent, k))
+        finally:
+            for fut, _ in pending:
+                fut.cancel()
+    # 풀 없이, 또는 풀이 깨진 뒤 남은 행
+    for chunk in chunks:
+        exams.extend(_analyze_chunk(chunk, k))
+    return _consolidate(exams, k)
+
+
+def analyze_bulk_file(path, k=DEFAULT_CHOICES, use_pool=True):
+    return analyze_bulk(iter_answer_keys(path), k, use_pool)
+
+
+def _consolidate(exams, k=DEFAULT_CHOICES):
+    choices = choice_list(k)
+    totals = {c: 0 for c in choices}
+    for e in exams:
+        for c in choices:
+            totals[c] += e["counts"][c]
+    return {
+        "exams": exams,
+        "n_exams": len(exams),
+        "n_unbalanced": sum(1 for e in exams if e["diff"] >= 2),
+        "n_with_empty": sum(1 for e in exams if e["empty"]),
+        "n_with_invalid": sum(1 for e in exams if e["invalid"]),
+        "choice_totals": totals,
+    }
+
+
+# ---------- 보고서 ----------
+def _nums(xs, limit=10):
+    s = ", ".join(f"{x}번" for x in xs[:limit])
+    return s + (f" 외 {len(xs) - limit}개" if len(xs) > limit else "")
+
+
+def bulk_report_html(report):
+    """시험별 한 줄 + 전체 요약 표 (summary-table 스타일 재사용)"""
+    choices = list(report["choice_totals"])
+    total_all = sum(report["choice_totals"].values())
+    head = "".join(f"<th>{c}번</th>" for c in choices)
+    overall = "".join(
+        f"<td>{report['choice_totals'][c]}개<br>"
+        f"({report['choice_totals'][c] / total_all * 100 if total_all else 0:.1f}%)</td>"
+        for c in choices
+    )
+    rows = []
+    for e in report["exams"]:
+        if e["invalid"]:
+            cls = "invalid-row"
+        elif e["empty"]:
+            cls = "empty-row"
+        elif e["diff"] >= 2:
+            cls = "row-max"
+        else:
+            cls = ""
+        notes = []
+        if e["diff"] >= 2:
+            notes.append(f"최다 {', '.join(f'{x}번' for x in e['max_targets'])} (차이 {e['diff']})")
+        if e["empty"]:
+            notes.append(f"빈칸 {_nums(e['empty'])}")
+        if e["invalid"]:
+            notes.append(f"오류 {_nums(e['invalid'])}")
+        cells = "".join(f"<td>{e['counts'][c]}</td>" for c in choices)
+        rows.append(
+            f"<tr class='{cls}'><td>{html.escape(e['name'])}</td><td>{e['total_input']} / {e['nq']}</td>"
+            f"{cells}<td>{' · '.join(notes) or '✅'}</td></tr>"
+        )
+    return (
+        "<h3>📊 일괄 분석 보고서</h3>"
+        f"<p>시험 <b>{report['n_exams']}</b>개 · 분포 불균형 <b>{report['n_unbalanced']}</b>개 · "
+        f"빈칸 포함 <b>{report['n_with_empty']}</b>개 · 오류 값 포함 <b>{report['n_with_invalid']}</b>개</p>"
+        f"<table class='summary-table'><thead><tr>{head}</tr></thead><tbody><tr>{overall}</tr></tbody></table>"
+        "<div class='custom-table-container'><table class='summary-table'><thead><tr>"
+        f"<th>시험</th><th>유효/문항</th>{head}<th>점검</th></tr></thead>"
+        f"<tbody>{''.join(rows)}</tbody></table></div>"
+    )
+
+
+def run_bulk_upload(file, num_choices=DEFAULT_CHOICES):
+    """Gradio 업로드 핸들러 (선택지 수는 카운터 화면의 값)"""
+    if file is None:
+        return "<p style='color:gray'>CSV 또는 ZIP 파일을 올려주세요.</p>"
+    path = file if isinstance(file, str) else getattr(file, "name", file)
+    try:
+        return bulk_report_html(analyze_bulk_file(path, parse_choices(num_choices)))
+    except (OSError, zipfile.BadZipFile, csv.Error) as e:
+        return f"<p>🚫 파일을 읽을 수 없습니다: {e}</p>"
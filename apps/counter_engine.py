@@ -0,0 +1,140 @@
+"""
+①②③④⑤ 카운터 · 분석 엔진 (선택지 수 k 설정)
+4지선다 · 5지선다 · 10지선다와 수천 문항 문제은행까지 같은 규칙으로 분석한다.
+- 정답은 NumPy 정수 배열(코드)로 들고, 개수는 bincount, 위치는 flatnonzero 로 한 번에 구한다.
+- 코드: 빈칸 EMPTY(-1), 범위 밖 숫자 · 숫자가 아닌 값 OTHER(0), 그 외에는 입력한 숫자 그대로.
+  코드가 k 와 무관하므로 선택지 수만 바꿔 다시 분석할 때 파싱을 되풀이하지 않는다.
+- 최다/최소 번호는 최다-최소 차이가 2개 이상일 때만 지정 (화면과 같은 규칙)
+
+화면 없이 쓰기:
+    from apps.counter_engine import analyze
+    r = analyze(["1", "3", "", "4", ...], k=4)
+    r["counts"], r["max_targets"], r["max_positions"]
+"""
+
+import numpy as np
+
+DEFAULT_CHOICES = 5
+# 코드로 담는 숫자 상한 (이보다 큰 숫자는 어느 k 에서도 오류 값)
+MAX_CHOICES = 99
+EMPTY = -1
+OTHER = 0
+
+
+def choice_list(k):
+    """선택지 번호 목록 [1, …, k]"""
+    return list(range(1, int(k) + 1))
+
+
+def parse_choices(num_choices):
+    """화면 입력 → 선택지 수 (2 ~ MAX_CHOICES, 읽을 수 없으면 기본값)"""
+    try:
+        k = int(num_choices)
+    except (TypeError, ValueError):
+        return DEFAULT_CHOICES
+    return min(max(k, 2), MAX_CHOICES)
+
+
+# ---------- 입력 → 코드 ----------
+def parse_cell(raw):
+    """칸 하나 → 표시용 값 (빈칸 None / 숫자 int / 숫자가 아니면 문자열 그대로)"""
+    s = str(raw).strip()
+    if s == "":
+        return None
+    try:
+        return int(float(s))
+    except (ValueError, OverflowError):
+        return s
+
+
+def cell_code(val):
+    """표시용 값 → 코드"""
+    if val is None:
+        return EMPTY
+    if type(val) is int and 1 <= val <= MAX_CHOICES:
+        return val
+    return OTHER
+
+
+def parse_answers(values, nq=None):
+    """입력값 목록 → (표시용 값 목록, 코드 배열). nq 만큼 자르거나 빈칸으로 채운다"""
+    if nq is None:
+        nq = len(values)
+    shown = [parse_cell(v) for v in values[:nq]]
+    shown.extend([None] * (nq - len(shown)))
+    codes = np.fromiter((cell_code(v) for v in shown), dtype=np.int16, count=nq)
+    return shown, codes
+
+
+def codes_from_digits(buf, nq=None, empty_byte=255):
+    """한 칸 한 바이트(0~9, 빈칸 empty_byte) 버퍼 → (표시용 값 목록, 코드 배열)"""
+    raw = np.frombuffer(bytes(buf), dtype=np.uint8)
+    if nq is None:
+        nq = len(raw)
+    codes = np.full(nq, EMPTY, dtype=np.int16)
+    m = min(nq, len(raw))
+    codes[:m] = raw[:m]
+    codes[codes == empty_byte] = EMPTY
+    shown = codes.tolist()
+    for i in np.flatnonzero(codes == EMPTY).tolist():
+        shown[i] = None
+    # 숫자 0 은 표시값은 0, 코드는 OTHER(0) 로 같다
+    return shown, codes
+
+
+# ---------- 분석 ----------
+def spread(counts, total_input):
+    """최다-최소 차이와 최다/최소 번호 (차이가 2개 이상일 때만 지정)"""
+    if total_input <= 0:
+        return 0, [], []
+    max_count = max(counts.values())
+    min_count = min(counts.values())
+    diff = max_count - min_count
+    if diff < 2:
+        return diff, [], []
+    max_targets = [c for c, v in counts.items() if v == max_count]
+    min_targets = [c for c, v in counts.items() if v == min_count]
+    return diff, max_targets, min_targets
+
+
+def positions_of(codes, targets):
+    """번호별 문항 위치 {번호: [idx…]} — 대상 번호 칸을 한 번에 골라 번호별로 나눈다"""
+    if not targets:
+        return {}
+    idx = np.flatnonzero(np.isin(codes, targets))
+    order = np.argsort(codes[idx], kind="stable")
+    idx, vals = idx[order], codes[idx][order]
+    cuts = np.searchsorted(vals, targets)
+    ends = np.searchsorted(vals, targets, side="right")
+    return {t: idx[a:b].tolist() for t, a, b in zip(targets, cuts, ends)}
+
+
+def analyze_codes(codes, k=DEFAULT_CHOICES, shown=None):
+    """코드 배열 → analyze_answers 와 같은 모양의 분석 결과 (+ 선택지 수 k)"""
+    codes = np.asarray(codes)
+    k = int(k)
+    empty = codes == EMPTY
+    valid = (codes >= 1) & (codes <= k)
+    per_choice = np.bincount(codes[valid], minlength=k + 1)[1:]
+    counts = dict(zip(choice_list(k), per_choice.tolist()))
+    total_input = int(per_choice.sum())
+    diff, max_targets, min_targets = spread(counts, total_input)
+    return {
+        "nq": len(codes),
+        "k": k,
+        "values": shown,
+        "empty_idxs": np.flatnonzero(empty).tolist(),
+        "invalid_idxs": np.flatnonzero(~(valid | empty)).tolist(),
+        "total_input": total_input,
+        "counts": counts,
+        "diff": diff,
+        "max_targets": max_targets,
+        "min_targets": min_targets,
+        "max_positions": positions_of(codes, max_targets),
+    }
+
+
+def analyze(values, nq=None, k=DEFAULT_CHOICES):
+    """정답 목록 하나의 분포 분석 (프로그램에서 바로 쓰는 진입점)"""
+    shown, codes = parse_answers(values, nq)
+    return analyze_codes(codes, k, shown)
@@ -0,0 +1,226 @@
+"""
+①②③④⑤ 카운터 · 다중 양식(A/B/C/D형) 생성
+기준 정답 하나로 문항 순서와 선택지 순서를 섞은 N개 양식을 만든다.
+- 문항은 같은 난이도 블록(블루프린트 plan["codes"] 또는 직접 준 블록 이름) 안에서만 섞는다.
+- 선택지 순서를 섞어 정답 위치가 바뀌고, 그 뒤 재배치(counter_rebalance)로 몇 문항의
+  선택지를 맞바꿔 양식마다 번호별 개수 차이 1 이하(최다-최소 2개 이상 경고 없음),
+  같은 번호 연속 3개 이하를 맞춘다.
+- 양식마다 시드가 정해져 있어(SeedSequence) 병렬로 만들어도 결과가 같다.
+  N 이 크면 공용 계산 풀(apps.compute_pool)에서 묶음으로 만들고, 끝나는 대로 하나씩 내보낸다.
+- 양식 수는 MAX_FORMS 까지 (화면 입력과 함수 모두).
+"""
+
+import html
+import logging
+import re
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from apps import compute_pool
+from apps.counter_engine import DEFAULT_CHOICES, analyze_codes, parse_answers
+from apps.counter_rebalance import MAX_RUN, rebalance_codes
+
+logger = logging.getLogger("uvicorn.error")
+
+FORM_NAMES = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+MAX_FORMS = 500
+# 이 양식 수 이상이면 계산 풀 (작으면 보내고 받는 비용이 더 크다)
+PARALLEL_MIN_FORMS = 64
+FORMS_PER_JOB = 16
+MAX_PENDING_PER_WORKER = 4
+# 화면 표에 보여 줄 양식 수 (나머지는 개수만)
+MAX_ROWS_SHOWN = 200
+
+
+def form_name(i):
+    return FORM_NAMES[i] if i < len(FORM_NAMES) else f"{i + 1}형"
+
+
+# ---------- 입력 ----------
+def parse_blocks(text, nq):
+    """
+    '1-10, 11-25, 26-30' → 문항별 블록 이름 목록
+    비워 두면 전체가 한 블록, 범위에 없는 문항은 제자리에 둔다.
+    """
+    text = str(text or "").strip()
+    if not text:
+        return ["전체"] * nq
+    blocks = [f"고정{i}" for i in range(nq)]
+    for part in re.split(r"[\s,]+", text):
+        if not part:
+            continue
+        m = re.fullmatch(r"(\d+)\s*[-~]\s*(\d+)", part)
+        if not m:
+            raise ValueError(f"블록 형식이 올바르지 않습니다: {part} (예: 1-10)")
+        a, b = sorted((int(m.group(1)), int(m.group(2))))
+        for q in range(max(a, 1), min(b, nq) + 1):
+            blocks[q - 1] = part
+    return blocks
+
+
+def _block_groups(blocks):
+    """블록 이름별 문항 위치 배열"""
+    groups = {}
+    for i, b in enumerate(blocks):
+        groups.setdefault(b, []).append(i)
+    return [np.array(idx) for idx in groups.values() if len(idx) > 1]
+
+
+# ---------- 양식 하나 ----------
+def make_form(master, groups, k, seed, index, max_run=MAX_RUN):
+    """
+    master: 기준 정답 코드 배열 (1~k), groups: _block_groups 결과
+    반환: {index, name, order(기준 문항 번호), key, options, counts, diff, swaps}
+    options[p] 는 p번 자리에 보이는 선택지들의 기준 선택지 번호 (왼쪽부터)
+    """
+    rng = np.random.default_rng(seed)
+    n = len(master)
+    order = np.arange(n)
+    for idx in groups:
+        order[idx] = idx[rng.permutation(len(idx))]
+
+    options = rng.permuted(np.tile(np.arange(1, k + 1), (n, 1)), axis=1)
+    key = np.argmax(options == master[order][:, None], axis=1) + 1
+
+    plan = rebalance_codes(key, k, max_run=max_run)
+    for p, old, new in plan["changes"]:
+        options[p, [old - 1, new - 1]] = options[p, [new - 1, old - 1]]
+    key = plan["key"]
+    result = analyze_codes(key, k)
+    return {
+        "index": index,
+        "name": form_name(index),
+        "order": (order + 1).tolist(),
+        "key": key.tolist(),
+        "options": options.tolist(),
+        "counts": result["counts"],
+        "diff": result["diff"],
+        "swaps": len(plan["changes"]),
+    }
+
+
+def _forms_job(args):
+    """양식 묶음 (프로세스 풀 작업 단위)"""
+    master, groups, k, seeds, first, max_run = args
+    return [make_form(master, groups, k, s, first + j, max_run) for j, s in enumerate(seeds)]
+
+
+# ---------- 여러 양식 ----------
+def _master_codes(master, k):
+    _, codes = parse_answers(list(master))
+    bad = np.flatnonzero((codes < 1) | (codes > k))
+    if len(bad):
+        nums = ", ".join(f"{i + 1}번" for i in bad[:10].tolist())
+        raise ValueError(f"기준 정답에 빈칸 또는 1~{k} 이외의 값이 있습니다: {nums}")
+    return codes
+
+
+def iter_forms(
+    master,
+    n_forms,
+    k=DEFAULT_CHOICES,
+    blocks=None,
+    seed=0,
+    use_pool=None,
+    max_run=MAX_RUN,
+):
+    """
+    기준 정답 → 양식 N개를 만들어지는 대로 하나씩 (순서는 완료 순, 'index' 로 구분)
+    blocks: 문항별 블록 이름 (None 이면 전체 한 블록)
+    use_pool: 공용 계산 풀 사용 (None 이면 양식이 PARALLEL_MIN_FORMS 이상일 때만, False 면 현재 프로세스)
+    """
+    if not 1 <= n_forms <= MAX_FORMS:
+        raise ValueError(f"양식 수는 1~{MAX_FORMS} 사이로 입력하세요.")
+    codes = _master_codes(master, k)
+    groups = _block_groups(blocks if blocks is not None else ["전체"] * len(codes))
+    seeds = np.random.SeedSequence(seed).spawn(n_forms)
+    jobs = deque(
+        (codes, groups, k, seeds[i : i + FORMS_PER_JOB], i, max_run)
+        for i in range(0, n_forms, FORMS_PER_JOB)
+    )
+    if use_pool is None:
+        use_pool = n_forms >= PARALLEL_MIN_FORMS
+    pool = compute_pool.get_pool() if use_pool and len(jobs) > 1 else None
+    if pool is not None:
+        yield from _pool_forms(pool, jobs)
+    while jobs:
+        yield from _forms_job(jobs.popleft())
+
+
+def _pool_forms(pool, jobs):
+    """jobs 를 풀에 나눠 보내며 끝나는 대로 내보낸다. 풀이 깨지면 못 끝낸 작업을 jobs 앞에 돌려놓는다"""
+    limit = compute_pool.POOL_WORKERS * MAX_PENDING_PER_WORKER
+    pending = {}
+    try:
+        while jobs or pending:
+            while jobs and len(pending) < limit:
+                # 깨진 풀은 submit 에서도 실패하므로 보낸 뒤에 꺼낸다
+                fut = pool.submit(_forms_job, jobs[0])
+                pending[fut] = jobs.popleft()
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                forms = fut.result()
+                del pending[fut]
+                yield from forms
+    except BrokenProcessPool:
+        logger.warning("계산 풀이 깨져 남은 양식 %d묶음은 지금 프로세스에서 만듭니다", len(pending) + len(jobs))
+        compute_pool.discard(pool)
+        jobs.extendleft(reversed(list(pending.values())))
+        pending.clear()
+    finally:
+        # 화면을 닫아 스트림이 끝나면 남은 작업은 취소
+        for fut in pending:
+            fut.cancel()
+
+
+def generate_forms(master, n_forms, k=DEFAULT_CHOICES, blocks=None, seed=0, use_pool=None, max_run=MAX_RUN):
+    """iter_forms 를 모두 모아 A, B, C … 순서로"""
+    forms = list(iter_forms(master, n_forms, k, blocks, seed, use_pool, max_run))
+    return sorted(forms, key=lambda f: f["index"])
+
+
+# ---------- 화면 ----------
+def forms_html(forms, total=None):
+    """양식별 정답 요약 표 (summary-table 스타일 재사용)"""
+    forms = sorted(forms, key=lambda f: f["index"])
+    if not forms:
+        return "<p style='color:gray'>양식이 없습니다.</p>"
+    choices = list(forms[0]["counts"])
+    head = "".join(f"<th>{c}번</th>" for c in choices)
+    rows = []
+    for f in forms[:MAX_ROWS_SHOWN]:
+        cells = "".join(f"<td>{f['counts'][c]}</td>" for c in choices)
+        key = "".join(str(v) for v in f["key"]) if len(choices) <= 9 else " ".join(map(str, f["key"]))
+        rows.append(
+            f"<tr><td><b>{html.escape(f['name'])}</b></td>{cells}<td>{f['diff']}</td>"
+            f"<td style='font-family: monospace; text-align: left;'>{key}</td></tr>"
+        )
+    if len(forms) > MAX_ROWS_SHOWN:
+        rows.append(f"<tr><td colspan='{len(choices) + 3}'>… 외 {len(forms) - MAX_ROWS_SHOWN}개</td></tr>")
+    done = f"{len(forms)} / {total}" if total else f"{len(forms)}"
+    return (
+        f"<h3>📑 양식 {done}개</h3>"
+        "<div class='custom-table-container'><table class='summary-table'>"
+        f"<thead><tr><th>양식</th>{head}<th>차이</th><th>정답</th></tr></thead>"
+        f"<tbody>{''.join(rows)}</tbody></table></div>"
+    )
+
+
+def stream_forms(state, n_forms, blocks_text):
+    """Gradio 핸들러 (제너레이터): 세션 상태의 정답을 기준으로 양식을 만들며 표를 갱신"""
+    if state is None:
+        yield "<p style='color:gray'>먼저 표를 만들고 기준 정답을 입력해 주세요.</p>"
+        return
+    try:
+        n = int(n_forms)
+        blocks = parse_blocks(blocks_text, state.nq)
+        forms = []
+        for form in iter_forms(state.codes.tolist(), n, state.k, blocks):
+            forms.append(form)
+            if len(forms) % FORMS_PER_JOB == 0 or len(forms) == n:
+                yield forms_html(forms, n)
+    except (TypeError, ValueError) as e:
+        yield f"<p>🚫 {html.escape(str(e))}</p>"
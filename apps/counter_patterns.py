@@ -0,0 +1,458 @@
+"""
+①②③④⑤ 카운터 · 정답 패턴 탐지
+번호별 개수가 고르더라도 학생이 찍기로 노릴 수 있는 배열을 찾는다.
+- 연속: 같은 번호가 max_run(기본 3)개를 넘게 이어짐  예) 3-3-3-3
+- 순서: 1-2-3-4-5 처럼 1씩 오르내리는 줄 (STEP_MIN_LEN 개 이상, 5지선다 이상에서만)
+- 순환: 1-3-1-3-1-3 / 2-4-5-2-4-5 같은 짧은 주기 반복
+- 위치 쏠림: 시험을 구간(기본 4등분)으로 나눴을 때 한 구간에서 한 번호가 균등 기대보다 크게 많음
+  예) 마지막 1/4 에 3번이 몰림 (이항분포 z 점수)
+모두 코드 배열(counter_engine) 위의 배열 연산이라 수천 문항도 1 ms 안팎이다.
+칸을 고칠 때(analyze_delta)는 PatternTracker 가 바뀐 칸 주변 창과 쏠림 개수표만 고친다.
+"""
+
+import bisect
+import math
+
+import numpy as np
+
+from apps.counter_engine import DEFAULT_CHOICES
+
+MAX_RUN = 3
+# 1씩 오르내리는 줄: 이 길이 이상. 선택지가 이보다 적으면(2~4지선다) 검사하지 않는다
+# (길이를 선택지 수로 줄이면 1-2, 1-2-3 같은 흔한 줄이 모두 걸린다)
+STEP_MIN_LEN = 5
+# 주기 반복: 주기 2~CYCLE_MAX_PERIOD, 전체 길이 max(2·주기, CYCLE_MIN_SPAN) 이상
+CYCLE_MAX_PERIOD = 5
+CYCLE_MIN_SPAN = 6
+SEGMENTS = 4
+BIAS_Z = 2.5
+BIAS_MIN_COUNT = 4
+# 이 길이 이하는 numpy 대신 파이썬 루프로 훑는다 (짧은 표 · 증분 탐지 창)
+SMALL_N = 100
+# 종류별로 화면에 보여 줄 메시지 수
+MAX_MESSAGES = 10
+
+
+# ---------- 보조 ----------
+def _true_runs(mask, min_len=1):
+    """불리언 배열에서 길이 min_len 이상인 True 구간 [(시작, 길이)]"""
+    padded = np.zeros(len(mask) + 2, dtype=np.int8)
+    padded[1:-1] = mask
+    edges = np.diff(padded)
+    starts = np.flatnonzero(edges == 1)
+    lengths = np.flatnonzero(edges == -1) - starts
+    keep = lengths >= min_len
+    return list(zip(starts[keep].tolist(), lengths[keep].tolist()))
+
+
+def segment_label(i, segments):
+    if segments == 4:
+        return ("첫", "둘째", "셋째", "마지막")[i] + " 1/4"
+    return f"{i + 1}/{segments} 구간"
+
+
+# ---------- 탐지 ----------
+def _runs_small(flags, min_len):
+    """_true_runs 의 리스트 판 (짧은 배열은 numpy 호출 비용이 계산보다 크다)"""
+    out = []
+    start = None
+    for i, f in enumerate(flags):
+        if f:
+            if start is None:
+                start = i
+        elif start is not None:
+            if i - start >= min_len:
+                out.append((start, i - start))
+            start = None
+    if start is not None and len(flags) - start >= min_len:
+        out.append((start, len(flags) - start))
+    return out
+
+
+def _local_patterns_small(codes, k, max_run, max_period):
+    """_local_patterns 의 순수 파이썬 판 — 같은 결과"""
+    n = len(codes)
+    valid = [1 <= c <= k for c in codes]
+    runs, steps, cycles = [], [], []
+
+    same = [valid[i + 1] and codes[i + 1] == codes[i] for i in range(n - 1)]
+    for s, m in _runs_small(same, max_run):
+        runs.append((s, m + 1, codes[s]))
+
+    if k >= STEP_MIN_LEN:
+        for step in (1, -1):
+            flags = [valid[i] and valid[i + 1] and codes[i + 1] - codes[i] == step for i in range(n - 1)]
+            for s, m in _runs_small(flags, STEP_MIN_LEN - 1):
+                steps.append((s, m + 1, codes[s : s + m + 1]))
+
+    taken = [False] * n
+    for p in range(2, max_period + 1):
+        span_min = max(2 * p, CYCLE_MIN_SPAN)
+        eq = [valid[i] and valid[i + p] and codes[i + p] == codes[i] for i in range(n - p)]
+        for s, m in _runs_small(eq, span_min - p):
+            span = m + p
+            if all(taken[s : s + span]):
+                continue
+            unit = codes[s : s + p]
+            if unit.count(unit[0]) == p:
+                continue
+            cycles.append((s, span, unit))
+            taken[s : s + span] = [True] * span
+    return runs, steps, cycles
+
+
+def _local_patterns(codes, valid, k, max_run, max_period):
+    """
+    연속 · 순서 · 순환 — 이웃 문항(최대 주기 거리)끼리만 비교하므로 배열 일부에서도 같은 결과
+    max_period 는 전체 문항 수로 정한 값을 넘겨야 한다 (일부만 볼 때도 같은 주기까지)
+    반환: (runs, steps, cycles)
+    """
+    if len(codes) <= SMALL_N:
+        return _local_patterns_small(codes.tolist(), k, max_run, max_period)
+    runs, steps, cycles = [], [], []
+
+    # 1) 같은 번호 연속
+    same = valid[1:] & (codes[1:] == codes[:-1])
+    for s, m in _true_runs(same, max_run):
+        runs.append((s, m + 1, int(codes[s])))
+
+    # 2) 1씩 오르내리는 줄 (1-2-3-4-5, 5-4-3-2-1)
+    if k >= STEP_MIN_LEN:
+        both = valid[1:] & valid[:-1]
+        d = np.diff(codes)
+        for step in (1, -1):
+            for s, m in _true_runs(both & (d == step), STEP_MIN_LEN - 1):
+                steps.append((s, m + 1, codes[s : s + m + 1].tolist()))
+
+    # 3) 짧은 주기 반복 — 같은 번호 연속은 1) 에서 잡았으므로 서로 다른 번호가 섞인 것만,
+    #    짧은 주기로 이미 잡힌 구간(1-2-1-2 는 주기 4 로도 반복)은 건너뛴다
+    taken = np.zeros(len(codes), dtype=bool)
+    for p in range(2, max_period + 1):
+        span_min = max(2 * p, CYCLE_MIN_SPAN)
+        eq = valid[p:] & valid[:-p] & (codes[p:] == codes[:-p])
+        for s, m in _true_runs(eq, span_min - p):
+            span = m + p
+            if taken[s : s + span].all():
+                continue
+            unit = codes[s : s + p]
+            if (unit == unit[0]).all():
+                continue
+            cycles.append((s, span, unit.tolist()))
+            taken[s : s + span] = True
+    return runs, steps, cycles
+
+
+def _max_period(n):
+    return min(CYCLE_MAX_PERIOD, n // 2)
+
+
+def _segment_count(n, segments):
+    return max(1, min(int(segments), n))
+
+
+def _segment_bounds(si, n, segments):
+    """구간 si 의 (첫 idx, 끝 idx) — (idx · segments) // n == si 인 범위"""
+    return -(-si * n // segments), -(-(si + 1) * n // segments) - 1
+
+
+def _bias_table(codes, valid, k, segments):
+    """구간 × 번호(0 열은 비움) 개수표 — bincount 한 번"""
+    n = len(codes)
+    seg = (np.arange(n) * segments) // n
+    return np.bincount(
+        seg[valid] * (k + 1) + codes[valid], minlength=segments * (k + 1)
+    ).reshape(segments, k + 1)
+
+
+def _bias_hits(table, k, bias_z):
+    """개수표 → [(구간, 번호, 개수, 기대 개수)] (구간 · 번호 순) — 표가 작아 파이썬으로"""
+    p0 = 1.0 / k
+    out = []
+    for si, row in enumerate(table[:, 1:].tolist()):
+        m = sum(row)
+        expected = m * p0
+        sd = math.sqrt(max(m * p0 * (1 - p0), 1e-12))
+        for ci, cnt in enumerate(row):
+            if cnt >= BIAS_MIN_COUNT and (cnt - expected) / sd >= bias_z:
+                out.append((si, ci + 1, cnt, expected))
+    return out
+
+
+def _bias_entries(hits, n, segments):
+    out = []
+    for si, c, cnt, exp in hits:
+        start, end = _segment_bounds(si, n, segments)
+        out.append((si, start, end, c, cnt, exp))
+    return out
+
+
+def detect_patterns(
+    codes,
+    k=DEFAULT_CHOICES,
+    max_run=MAX_RUN,
+    segments=SEGMENTS,
+    bias_z=BIAS_Z,
+):
+    """
+    코드 배열 → 패턴 목록
+    - runs: [(시작 idx, 길이, 번호)]
+    - steps: [(시작 idx, 길이, 번호 줄 [번호…])]
+    - cycles: [(시작 idx, 길이, 반복 단위 [번호…])]
+    - bias: [(구간, 시작 idx, 끝 idx, 번호, 개수, 기대 개수)]
+    - cells: 표에 표시할 문항 idx (정렬된 목록)
+    """
+    codes = np.asarray(codes, dtype=np.int64)
+    n = len(codes)
+    k = int(k)
+    out = {"runs": [], "steps": [], "cycles": [], "bias": [], "cells": []}
+    if n == 0:
+        return out
+    valid = (codes >= 1) & (codes <= k)
+    flagged = np.zeros(n, dtype=bool)
+
+    out["runs"], out["steps"], out["cycles"] = _local_patterns(codes, valid, k, max_run, _max_period(n))
+    for kind in ("runs", "steps", "cycles"):
+        for s, length, _ in out[kind]:
+            flagged[s : s + length] = True
+
+    # 4) 위치 쏠림: 구간 × 번호 개수를 bincount 한 번으로
+    segments = _segment_count(n, segments)
+    out["bias"] = _bias_entries(_bias_hits(_bias_table(codes, valid, k, segments), k, bias_z), n, segments)
+    for _, start, end, c, _, _ in out["bias"]:
+        flagged[start : end + 1] |= codes[start : end + 1] == c
+
+    out["cells"] = np.flatnonzero(flagged).tolist()
+    return out
+
+
+# ---------- 증분 탐지 ----------
+# 칸 하나가 바뀌면 그 칸을 지나는 연속 · 순서 · 순환만 달라진다.
+# 창은 바뀐 칸 ± 가장 긴 최소 길이: 창 끝에서 잘린 패턴도 최소 길이는 남아 찾히고,
+# 찾힌 패턴이 창 밖으로 이어지면 창을 넓혀 다시 훑는다. 양 끝에 비교용 칸(_CONTEXT)을 더 본다.
+_CONTEXT = CYCLE_MAX_PERIOD + 1
+_WINDOW = max(2 * CYCLE_MAX_PERIOD, CYCLE_MIN_SPAN)
+
+
+class PatternTracker:
+    """
+    칸 단위로 고쳐 가는 패턴 탐지 (CounterState 가 들고 다닌다)
+    - 연속 · 순서 · 순환: 바뀐 칸 주변 창(+ 그 창에 걸친 기존 패턴)만 다시 훑는다
+    - 위치 쏠림: 구간 × 번호 개수표를 칸마다 ±1, 표시 칸은 쏠림 (구간, 번호) 가 바뀔 때만 다시 모은다
+    patterns() 는 detect_patterns 와 같은 목록 (cells 제외), cells 는 표시할 문항 idx 집합.
+    """
+
+    def __init__(self, codes, k=DEFAULT_CHOICES, max_run=MAX_RUN, segments=SEGMENTS, bias_z=BIAS_Z):
+        self.codes = np.array(codes, dtype=np.int64)
+        self.n = n = len(self.codes)
+        self.k = k = int(k)
+        self.max_run = max_run
+        self.bias_z = bias_z
+        self.max_period = _max_period(n)
+        self.segments = _segment_count(n, segments) if n else 1
+        valid = (self.codes >= 1) & (self.codes <= k)
+
+        # 시작 idx → [(종류, 패턴)], 종류별 정렬 목록, 칸마다 덮은 패턴 수
+        self.by_start = {}
+        self.lists = {"runs": [], "steps": [], "cycles": []}
+        self.cover = np.zeros(n, dtype=np.int32)
+        found = _local_patterns(self.codes, valid, k, max_run, self.max_period) if n else ([], [], [])
+        for kind, items in zip(("runs", "steps", "cycles"), found):
+            for item in items:
+                self._add(kind, item)
+
+        self.table = _bias_table(self.codes, valid, k, self.segments) if n else np.zeros((1, k + 1), np.int64)
+        self.hits = _bias_hits(self.table, k, bias_z) if n else []
+        self.bias_cells = set()
+        for si, c, _, _ in self.hits:
+            self.bias_cells |= self._segment_cells(si, c)
+        self.cells = set(np.flatnonzero(self.cover > 0).tolist()) | self.bias_cells
+
+    # ---------- 보조 ----------
+    @staticmethod
+    def _order(kind, item):
+        """detect_patterns 목록 순서 — 순서는 오름 줄 먼저, 순환은 주기 먼저"""
+        s, _, unit = item
+        if kind == "steps":
+            return (0 if unit[1] > unit[0] else 1, s)
+        if kind == "cycles":
+            return (len(unit), s)
+        return (s,)
+
+    def _add(self, kind, item):
+        s, length, _ = item
+        self.by_start.setdefault(s, []).append((kind, item))
+        bisect.insort(self.lists[kind], (self._order(kind, item), item))
+        self.cover[s : s + length] += 1
+
+    def _remove(self, kind, item):
+        s, length, _ = item
+        items = self.lists[kind]
+        items.pop(bisect.bisect_left(items, (self._order(kind, item), item)))
+        self.cover[s : s + length] -= 1
+
+    def _segment(self, i):
+        return i * self.segments // self.n
+
+    def _segment_cells(self, si, c):
+        start, end = _segment_bounds(si, self.n, self.segments)
+        return set((start + np.flatnonzero(self.codes[start : end + 1] == c)).tolist())
+
+    def _flagged(self, i):
+        return self.cover[i] > 0 or i in self.bias_cells
+
+    # ---------- 고치기 ----------
+    def update(self, codes, idxs):
+        """
+        codes 의 idxs 칸이 바뀐 뒤 호출 → 표시 여부가 바뀐 칸 idx 집합
+        (긴 표에서 바뀐 칸이 많으면 처음부터 다시 세는 편이 빠르다)
+        """
+        idxs = [i for i in idxs if self.codes[i] != codes[i]]
+        if not idxs:
+            return set()
+        if self.n > SMALL_N and len(idxs) * _WINDOW * 4 > self.n:
+            return self._rebuild(codes)
+
+        touched = set(idxs)
+        # 1) 쏠림 개수표 ±1
+        k = self.k
+        for i in idxs:
+            si = self._segment(i)
+            old, new = int(self.codes[i]), int(codes[i])
+            if 1 <= old <= k:
+                self.table[si, old] -= 1
+            if 1 <= new <= k:
+                self.table[si, new] += 1
+            self.codes[i] = new
+        touched |= self._update_bias(idxs)
+
+        # 2) 바뀐 칸 주변 창을 다시 훑기 (가까운 칸끼리는 한 창으로)
+        idxs.sort()
+        lo = hi = idxs[0]
+        for i in idxs[1:]:
+            if i - hi > _WINDOW * 2:
+                touched |= self._rescan(lo, hi)
+                lo = i
+            hi = i
+        touched |= self._rescan(lo, hi)
+
+        flips = set()
+        for i in touched:
+            now = self._flagged(i)
+            if now != (i in self.cells):
+                flips.add(i)
+                if now:
+                    self.cells.add(i)
+                else:
+                    self.cells.discard(i)
+        return flips
+
+    def _rebuild(self, codes):
+        fresh = PatternTracker(codes, self.k, self.max_run, self.segments, self.bias_z)
+        flips = self.cells ^ fresh.cells
+        old_cells = self.cells
+        self.__dict__.update(fresh.__dict__)
+        # 상태가 들고 있는 집합을 그대로 쓰도록 같은 객체에 담는다
+        old_cells.clear()
+        old_cells |= fresh.cells
+        self.cells = old_cells
+        return flips
+
+    def _update_bias(self, idxs):
+        """쏠림 (구간, 번호) 목록을 다시 보고 표시 칸을 고친다 → 다시 볼 칸"""
+        hits = _bias_hits(self.table, self.k, self.bias_z)
+        old_pairs = {(si, c) for si, c, _, _ in self.hits}
+        new_pairs = {(si, c) for si, c, _, _ in hits}
+        self.hits = hits
+        touched = set()
+        for si, c in old_pairs - new_pairs:
+            # 번호가 바뀐 칸은 아래에서 따로 본다
+            cells = self._segment_cells(si, c)
+            self.bias_cells -= cells
+            touched |= cells
+        for si, c in new_pairs - old_pairs:
+            cells = self._segment_cells(si, c)
+            self.bias_cells |= cells
+            touched |= cells
+        for i in idxs:
+            if (self._segment(i), int(self.codes[i])) in new_pairs:
+                self.bias_cells.add(i)
+            else:
+                self.bias_cells.discard(i)
+        return touched
+
+    def _rescan(self, lo, hi):
+        """[lo, hi] 주변을 다시 훑어 패턴을 바꾼다 → 다시 볼 칸"""
+        n = self.n
+        lo, hi = max(0, lo - _WINDOW), min(n - 1, hi + _WINDOW)
+        while True:
+            # 창에 걸친 기존 패턴까지 (덮인 칸이 이어지는 데까지) 넓힌다
+            while lo > 0 and self.cover[lo - 1] > 0:
+                lo -= 1
+            while hi < n - 1 and self.cover[hi + 1] > 0:
+                hi += 1
+            s0, s1 = max(0, lo - _CONTEXT), min(n, hi + 1 + _CONTEXT)
+            codes = self.codes[s0:s1]
+            valid = (codes >= 1) & (codes <= self.k)
+            found = [
+                (kind, (s + s0, length, unit))
+                for kind, items in zip(("runs", "steps", "cycles"),
+                                       _local_patterns(codes, valid, self.k, self.max_run, self.max_period))
+                for s, length, unit in items
+            ]
+            # 창 안 칸을 지나는 새 패턴이 창 밖으로 나가면 창을 넓혀 다시
+            grow_lo = min([s for _, (s, length, _) in found if s < lo <= s + length - 1] or [lo])
+            grow_hi = max([s + length - 1 for _, (s, length, _) in found if s <= hi < s + length - 1] or [hi])
+            if (grow_lo, grow_hi) == (lo, hi):
+                break
+            lo, hi = grow_lo, grow_hi
+
+        for s in range(lo, hi + 1):
+            for kind, item in self.by_start.pop(s, ()):
+                self._remove(kind, item)
+        for kind, item in found:
+            if lo <= item[0] <= hi:
+                self._add(kind, item)
+        return set(range(lo, hi + 1))
+
+    # ---------- 결과 ----------
+    def patterns(self):
+        """detect_patterns 와 같은 모양 — cells 는 빼고 (표시 칸은 self.cells 집합)"""
+        out = {kind: [item for _, item in items] for kind, items in self.lists.items()}
+        out["bias"] = _bias_entries(self.hits, self.n, self.segments)
+        return out
+
+
+def _capped(items, fmt):
+    msgs = [fmt(*item) for item in items[:MAX_MESSAGES]]
+    if len(items) > MAX_MESSAGES:
+        msgs.append(f"… 외 {len(items) - MAX_MESSAGES}곳")
+    return msgs
+
+
+def _seq(unit):
+    return "-".join(map(str, unit[:6])) + ("…" if len(unit) > 6 else "")
+
+
+def pattern_messages(patterns, segments=SEGMENTS):
+    """경고 영역에 붙일 한 줄 메시지들"""
+    msgs = []
+    msgs += _capped(
+        patterns["runs"],
+        lambda s, n, c: f"🔁 <b>{s + 1}~{s + n}번</b>: {c}번이 {n}개 연속입니다. (주황색 칸)",
+    )
+    msgs += _capped(
+        patterns["steps"],
+        lambda s, n, unit: f"🔢 <b>{s + 1}~{s + n}번</b>: {_seq(unit)} 순서로 이어집니다. (주황색 칸)",
+    )
+    msgs += _capped(
+        patterns["cycles"],
+        lambda s, n, unit: f"🔄 <b>{s + 1}~{s + n}번</b>: {_seq(unit)} 순서가 반복됩니다. (주황색 칸)",
+    )
+    msgs += _capped(
+        patterns["bias"],
+        lambda si, start, end, c, cnt, exp: (
+            f"📍 {segment_label(si, segments)}({start + 1}~{end + 1}번)에 {c}번이 {cnt}개 몰려 있습니다."
+            f" (고르게면 약 {exp:.1f}개)"
+        ),
+    )
+    return msgs
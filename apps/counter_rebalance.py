@@ -0,0 +1,260 @@
+"""
+①②③④⑤ 카운터 · 정답 재배치 제안
+"최다 번호 일부를 최소 번호로 바꾸라"는 TIP 대신, 실제로 바꿀 문항과 바꿀 번호를 계산한다.
+- 목표: 모든 번호의 개수 차이가 1 이하 (n = q·k + r 이면 r 개 번호가 q+1 개, 나머지는 q 개)
+- 제약: 같은 번호 연속 max_run(기본 3)개 이하, 고정(locked) 문항은 바꾸지 않는다
+- 바꾸는 문항 수를 최소로: 빈칸/오류 칸 + 번호별 초과분이 하한이고, 연속 제약을 깨는 칸은
+  가능하면 초과 번호의 몫으로 센다. 수천 문항도 배열 연산 + 바꿀 칸만 도는 탐욕 배정으로 수 ms.
+"""
+
+import html
+import re
+
+import numpy as np
+
+from apps.counter_engine import DEFAULT_CHOICES, choice_list, parse_answers
+
+MAX_RUN = 3
+
+
+# ---------- 입력 ----------
+def parse_locked(text, nq=None):
+    """'3, 7, 12-15' → 0부터 시작하는 문항 idx 집합"""
+    out = set()
+    for part in re.split(r"[\s,]+", str(text or "").strip()):
+        if not part:
+            continue
+        m = re.fullmatch(r"(\d+)(?:\s*[-~]\s*(\d+))?", part)
+        if not m:
+            raise ValueError(f"고정 문항 형식이 올바르지 않습니다: {part}")
+        a = int(m.group(1))
+        b = int(m.group(2) or a)
+        # 문항 범위로 먼저 자른다 (오타로 들어온 큰 범위를 끝까지 돌지 않게)
+        lo = max(1, min(a, b))
+        hi = max(a, b) if nq is None else min(max(a, b), nq)
+        out.update(range(lo - 1, hi))
+    return out
+
+
+# ---------- 보조 ----------
+def _run_lengths(codes):
+    """칸마다 자기가 속한 연속 구간의 (시작, 길이)"""
+    n = len(codes)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    lengths = np.diff(np.r_[starts, n])
+    run_id = np.repeat(np.arange(len(starts)), lengths)
+    return starts[run_id], lengths[run_id]
+
+
+def _long_runs(codes, k, max_run):
+    """번호 k 이하로 이뤄진 max_run 초과 연속 구간 [(시작, 길이, 번호)]"""
+    n = len(codes)
+    if n == 0:
+        return []
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    lengths = np.diff(np.r_[starts, n])
+    vals = codes[starts]
+    sel = (lengths > max_run) & (vals >= 1) & (vals <= k)
+    return list(zip(starts[sel].tolist(), lengths[sel].tolist(), vals[sel].tolist()))
+
+
+def _streak(final, i, d, max_run, pending=None):
+    """i 에 d 를 넣었을 때 i 를 포함한 연속 길이 (pending 이면 아직 정하지 않은 칸에서 멈춘다)"""
+    n = len(final)
+    left = 0
+    j = i - 1
+    while j >= 0 and left <= max_run and final[j] == d:
+        left += 1
+        j -= 1
+    right = 0
+    j = i + 1
+    while j < n and right <= max_run and final[j] == d and (pending is None or not pending[j]):
+        right += 1
+        j += 1
+    return left + 1 + right
+
+
+def _targets(counts, locked_counts, n_fill, k):
+    """개수 차이 1 이하 목표 — 남는 r 개의 +1 은 지금 많은 번호부터 (바꿀 칸이 가장 적다)"""
+    base, r = divmod(n_fill, k)
+    choices = choice_list(k)
+    forced = [c for c in choices if locked_counts[c] > base]
+    for c in forced:
+        if locked_counts[c] > base + 1:
+            raise ValueError(
+                f"고정 문항만으로 {c}번이 {locked_counts[c]}개입니다. (목표 최대 {base + 1}개)"
+            )
+    if len(forced) > r:
+        raise ValueError("고정 문항 때문에 개수 차이를 1 이하로 맞출 수 없습니다.")
+    rest = sorted((c for c in choices if c not in forced), key=lambda c: (-counts[c], c))
+    plus = set(forced) | set(rest[: r - len(forced)])
+    return {c: base + (1 if c in plus else 0) for c in choices}
+
+
+# ---------- 재배치 ----------
+def rebalance_codes(codes, k=DEFAULT_CHOICES, locked=(), max_run=MAX_RUN):
+    """
+    counter_engine 코드 배열 → 재배치 계획
+    반환:
+    - changes: [(idx, 이전 코드, 새 번호)] (idx 는 0부터)
+    - key: 바꾼 뒤 코드 배열, targets/before/after: 번호별 개수
+    - lower_bound: 연속 제약이 없을 때의 최소 변경 수
+    - violations: 고정 문항 때문에 남는 연속 위반 [(시작 idx, 길이, 번호)]
+    """
+    orig = np.asarray(codes, dtype=np.int64)
+    n = len(orig)
+    k = int(k)
+    choices = choice_list(k)
+    is_locked = np.zeros(n, dtype=bool)
+    if locked:
+        is_locked[[i for i in locked if 0 <= i < n]] = True
+
+    valid = (orig >= 1) & (orig <= k)
+    counts = dict(zip(choices, np.bincount(orig[valid], minlength=k + 1)[1:].tolist()))
+    locked_counts = dict(
+        zip(choices, np.bincount(orig[valid & is_locked], minlength=k + 1)[1:].tolist())
+    )
+    # 고정된 빈칸/오류 칸은 그대로 남는다
+    n_fill = n - int((~valid & is_locked).sum())
+    targets = _targets(counts, locked_counts, n_fill, k)
+    excess = {c: counts[c] - targets[c] for c in choices}
+
+    # 1) 반드시 바꿀 칸: 고정되지 않은 빈칸/오류 칸
+    change = ~valid & ~is_locked
+
+    # 2) 연속 제약을 깨는 칸: 긴 구간마다 max_run 개를 넘는 자리 (고정이면 앞쪽의 빈 자리)
+    for start, length, _ in _long_runs(orig, k, max_run):
+        streak = 0
+        for i in range(start, start + length):
+            streak += 1
+            if streak <= max_run:
+                continue
+            for j in range(i, max(start, i - max_run) - 1, -1):
+                if not is_locked[j] and not change[j]:
+                    change[j] = True
+                    streak = i - j
+                    break
+            else:
+                streak = 0
+
+    # 3) 번호별 초과분을 채울 때까지 추가 — 뭉친 구간의 칸부터
+    _, run_len = _run_lengths(orig)
+    for c in choices:
+        need = excess[c] - int((change & (orig == c)).sum())
+        if need <= 0:
+            continue
+        cand = np.flatnonzero((orig == c) & ~change & ~is_locked)
+        order = np.lexsort((cand, -run_len[cand]))
+        change[cand[order[:need]]] = True
+
+    # 4) 바꿀 칸에 번호 배정: 모자란 번호부터, 연속 제약을 지키면서 왼쪽부터
+    demand = {c: int((change & (orig == c)).sum()) - excess[c] for c in choices}
+    final = orig.copy()
+    pending = change.copy()
+    for i in np.flatnonzero(change).tolist():
+        old = int(orig[i])
+        pending[i] = False
+        options = sorted((c for c in choices if demand[c] > 0), key=lambda c: -demand[c])
+        pick = None
+        for d in options:
+            if d != old and _streak(final, i, d, max_run, pending) <= max_run:
+                pick = d
+                break
+        if pick is None:
+            if demand.get(old, 0) > 0 and _streak(final, i, old, max_run, pending) <= max_run:
+                pick = old
+            else:
+                others = [d for d in options if d != old]
+                pick = others[0] if others else old
+        final[i] = pick
+        demand[pick] -= 1
+
+    # 5) 남은 연속 위반은 다른 번호 칸과 맞바꿔 푼다 (개수는 그대로)
+    _repair_runs(final, is_locked, k, max_run)
+
+    changed = np.flatnonzero(final != orig)
+    after = dict(zip(choices, np.bincount(final[(final >= 1) & (final <= k)], minlength=k + 1)[1:].tolist()))
+    return {
+        "k": k,
+        "max_run": max_run,
+        "changes": [(i, int(orig[i]), int(final[i])) for i in changed.tolist()],
+        "key": final,
+        "targets": targets,
+        "before": counts,
+        "after": after,
+        "lower_bound": int((~valid & ~is_locked).sum()) + sum(max(0, e) for e in excess.values()),
+        "violations": _long_runs(final, k, max_run),
+    }
+
+
+def _repair_runs(final, is_locked, k, max_run):
+    for start, length, c in _long_runs(final, k, max_run):
+        i = start + max_run
+        while i < start + length:
+            spots = [j for j in range(i, max(start, i - max_run) - 1, -1) if not is_locked[j]]
+            done = False
+            for a in spots:
+                for b in range(len(final)):
+                    e = int(final[b])
+                    if e == c or is_locked[b] or not (1 <= e <= k) or abs(b - a) <= 1:
+                        continue
+                    final[a], final[b] = e, c
+                    if _streak(final, a, e, max_run) <= max_run and _streak(final, b, c, max_run) <= max_run:
+                        done = True
+                        break
+                    final[a], final[b] = c, e
+                if done:
+                    break
+            i = (a if done else i) + max_run + 1
+
+
+def rebalance_key(values, k=DEFAULT_CHOICES, locked=(), max_run=MAX_RUN):
+    """입력값 목록(문자열/숫자, 빈칸 포함) → 재배치 계획 (프로그램에서 바로 쓰는 진입점)"""
+    _, codes = parse_answers(list(values))
+    return rebalance_codes(codes, k, locked, max_run)
+
+
+# ---------- 화면 ----------
+def rebalance_html(plan):
+    """재배치 계획 → 요약 + 바꿀 문항 표 (summary-table 스타일 재사용)"""
+    choices = list(plan["targets"])
+    head = "".join(f"<th>{c}번</th>" for c in choices)
+    before = "".join(f"<td>{plan['before'][c]}</td>" for c in choices)
+    after = "".join(f"<td>{plan['after'][c]}</td>" for c in choices)
+    n_changes = len(plan["changes"])
+    lines = [
+        "<h3>🔧 정답 재배치 제안</h3>",
+        f"<p>바꿀 문항 <b>{n_changes}</b>개 (개수만 맞출 때 최소 {plan['lower_bound']}개) · "
+        f"같은 번호 연속 최대 {plan['max_run']}개</p>",
+        f"<table class='summary-table'><thead><tr><th></th>{head}</tr></thead><tbody>"
+        f"<tr><td>현재</td>{before}</tr><tr class='row-min'><td>재배치 후</td>{after}</tr></tbody></table>",
+    ]
+    if plan["changes"]:
+        rows = "".join(
+            f"<tr><td>{i + 1}번</td><td>{old if 1 <= old <= plan['k'] else '–'}</td><td><b>{new}</b></td></tr>"
+            for i, old, new in plan["changes"]
+        )
+        lines.append(
+            "<div class='custom-table-container'><table class='summary-table'>"
+            f"<thead><tr><th>문항</th><th>현재</th><th>변경</th></tr></thead><tbody>{rows}</tbody></table></div>"
+        )
+    else:
+        lines.append("<p>✅ 바꿀 문항이 없습니다.</p>")
+    if plan["violations"]:
+        spots = ", ".join(f"{s + 1}~{s + n}번({c}번)" for s, n, c in plan["violations"])
+        lines.append(f"<p>⚠️ 고정 문항 때문에 연속 제약을 지키지 못한 구간: {html.escape(spots)}</p>")
+    return "".join(lines)
+
+
+def suggest_rebalance(state, locked_text, max_run=MAX_RUN):
+    """Gradio 핸들러: 세션 상태(CounterState)의 현재 정답으로 재배치 제안"""
+    if state is None:
+        return "<p style='color:gray'>먼저 표를 만들고 정답을 입력해 주세요.</p>"
+    try:
+        locked = parse_locked(locked_text, state.nq)
+        plan = rebalance_codes(state.codes, state.k, locked, int(max_run or MAX_RUN))
+    except ValueError as e:
+        return f"<p>🚫 {html.escape(str(e))}</p>"
+    return rebalance_html(plan)
@@ -4,9 +4,15 @@ Flask 통합용 모듈
 """
 
 import math
+import threading
+from collections import OrderedDict
 from pathlib import Path
 import gradio as gr
 
+from apps.blueprint_stats import distribution_summary, exam_distribution
+from apps.compute_pool import offload
+from apps.session_state import QUEUE, dump_state, load_state
+
 
 # ---------- 테마 ----------
 def _get_theme():
@@ -17,8 +23,13 @@ def _get_theme():
 
 
 # ---------- 유틸 ----------
+# 배점 계산은 모두 0.1점 단위 정수(tenths)로 하고, 화면에 보일 때만 실수로 바꾼다.
+def _to_tenths(x: float) -> int:
+    return int(math.floor(x * 10 + 0.5))
+
+
 def _round1(x: float) -> float:
-    return float(f"{x:.1f}")
+    return _to_tenths(x) / 10
 
 
 def _split_counts(total: int, ratios):
@@ -37,12 +48,13 @@ def _split_counts(total: int, ratios):
 
 
 def _offsets_zero_sum(n: int):
+    """합이 0인 -0.1/0/+0.1 오프셋 (0.1점 단위 정수)"""
     if n <= 0:
         return []
     if n == 1:
-        return [0.0]
+        return [0]
     if n == 2:
-        return [-0.1, +0.1]
+        return [-1, +1]
     a = n // 3
     rem = n % 3
     neg, zero, pos = a, a, a
@@ -51,34 +63,32 @@ def _offsets_zero_sum(n: int):
     elif rem == 2:
         neg += 1
         pos += 1
-    return ([-0.1] * neg) + ([0.0] * zero) + ([+0.1] * pos)
+    return ([-1] * neg) + ([0] * zero) + ([+1] * pos)
 
 
-def _correct_to_total_0p1(values, target_sum):
-    if not values:
+def _correct_to_total_0p1(tenths, target):
+    """
+    합계가 target(0.1점 단위)이 되도록 0.1점씩 앞에서부터 순환 배분한 결과를 한 번에 계산
+    - 감점 시 0.1점 아래로는 내려가지 않는다 (그 차례는 건너뜀)
+    - 그래도 남는 차이는 마지막 문항에서 한 번 더 보정
+    """
+    if not tenths:
         return []
-    rounded = [_round1(v) for v in values]
-    cur = _round1(sum(rounded))
-    diff = _round1(target_sum - cur)
-    if abs(diff) < 0.1:
-        return rounded
-    steps = int(round(abs(diff) * 10))
-    sign = +0.1 if diff > 0 else -0.1
-    i = 0
-    n = len(rounded)
-    if n == 0:
-        return rounded
-    for _ in range(steps):
-        if rounded[i] + sign >= 0.1:
-            rounded[i] = _round1(rounded[i] + sign)
-        i = (i + 1) % n
-    final = _round1(sum(rounded))
-    if final != _round1(target_sum) and len(rounded) > 0:
-        delta = _round1(target_sum - final)
-        step = 0.1 if delta > 0 else -0.1
-        if abs(delta) >= 0.1 and rounded[-1] + step >= 0.1:
-            rounded[-1] = _round1(rounded[-1] + step)
-    return rounded
+    n = len(tenths)
+    diff = target - sum(tenths)
+    if diff == 0:
+        return list(tenths)
+    q, r = divmod(abs(diff), n)
+    if diff > 0:
+        out = [t + q + (i < r) for i, t in enumerate(tenths)]
+    else:
+        out = [t - min(q + (i < r), t - 1) for i, t in enumerate(tenths)]
+    rest = target - sum(out)
+    if rest != 0:
+        step = 1 if rest > 0 else -1
+        if out[-1] + step >= 1:
+            out[-1] += step
+    return out
 
 
 # ---------- 프리셋(요청 비율) ----------
@@ -95,61 +105,239 @@ BIAS_3 = {"하": -0.05, "중": 0.00, "상": +0.05}
 BIAS_5 = {"하": -0.05, "중하": -0.02, "중": 0.00, "중상": +0.02, "상": +0.05}
 
 
-def _expected_stats(codes, points, p_map):
-    if not codes or not points:
+def _expected_stats(codes, tenths, p_map):
+    if not codes or not tenths:
         return 0.0, 0.0
     mean = 0.0
     var = 0.0
-    for c, w in zip(codes, points):
+    for c, t in zip(codes, tenths):
         p = p_map.get(c, 0.65)
-        mean += w * p
-        var += (w * w) * p * (1 - p)
-    return _round1(mean), _round1(var**0.5)
-
-
-def _break_cross_difficulty_ties(codes, points, rank):
-    for _ in range(12):
-        changed = False
-        idxs = sorted(range(len(points)), key=lambda i: (rank.get(codes[i], 999), points[i]))
-        seen = {}
-        for i in idxs:
-            sc = points[i]
-            r = rank.get(codes[i], 999)
-            if sc in seen:
-                easier = [j for j in seen[sc]["idxs"] if rank.get(codes[j], 999) < r]
-                if easier:
-                    donor = None
-                    for j in easier:
-                        if points[j] - 0.1 >= 0.1:
-                            donor = j
-                            break
-                    if donor is not None:
-                        points[i] = _round1(points[i] + 0.1)
-                        points[donor] = _round1(points[donor] - 0.1)
-                        changed = True
-                        break
-            if sc not in seen:
-                seen[sc] = {"min_rank": r, "idxs": [i]}
-            else:
-                seen[sc]["min_rank"] = min(seen[sc]["min_rank"], r)
-                seen[sc]["idxs"].append(i)
-        if not changed:
-            break
-    return points
+        mean += t * p
+        var += (t * t) * p * (1 - p)
+    return _round1(mean / 10), _round1(var**0.5 / 10)
+
+
+def _shave_top(vals, floor, amount):
+    """
+    오름차순 vals 를 위에서부터 고르게 깎아 amount(0.1점 단위)를 회수한다.
+    floor 아래로는 내리지 않으며, 실제 회수한 양을 돌려준다. O(len(vals))
+    """
+    n = len(vals)
+    if amount <= 0 or n == 0 or vals[-1] <= floor:
+        return 0
+    remaining = amount
+    cap = vals[-1]
+    i = n - 1
+    while True:
+        while i > 0 and vals[i - 1] >= cap:
+            i -= 1
+        k = n - i
+        nxt = max(vals[i - 1], floor) if i > 0 else floor
+        cost = k * (cap - nxt)
+        if cost >= remaining or nxt == floor:
+            take = min(remaining, cost)
+            q, r = divmod(take, k)
+            for j in range(i, n):
+                vals[j] = cap - q - (1 if j - i < r else 0)
+            return amount - remaining + take
+        remaining -= cost
+        cap = nxt
+
+
+def _lift_bottom(vals, amount):
+    """오름차순 vals 를 아래에서부터 고르게 올려 amount(0.1점 단위)를 모두 얹는다. O(len(vals))"""
+    n = len(vals)
+    if amount <= 0 or n == 0:
+        return
+    level = vals[0]
+    k = 1
+    while True:
+        while k < n and vals[k] <= level:
+            k += 1
+        nxt = vals[k] if k < n else None
+        cost = k * (nxt - level) if nxt is not None else amount
+        if cost >= amount:
+            q, r = divmod(amount, k)
+            for j in range(k):
+                vals[j] = level + q + (1 if j >= k - r else 0)
+            return
+        amount -= cost
+        level = nxt
+
+
+def _boundary_cut(low, high, floor):
+    """
+    겹친 두 단계(오름차순 low · high)의 경계 b: low 는 b-1 이하로 깎고 high 는 b 이상으로 올린다.
+    깎는 양 s(b) 와 올리는 양 r(b) 중 큰 쪽이 가장 작은 b (low 는 floor 아래로 내리지 않음) — 이분 탐색.
+    """
+
+    def shave(b):
+        return sum(v - b + 1 for v in low if v > b - 1)
+
+    def raise_(b):
+        return sum(b - v for v in high if v < b)
+
+    lo, hi = floor + 1, max(low[-1], floor) + 1
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if raise_(mid) >= shave(mid):
+            hi = mid
+        else:
+            lo = mid + 1
+    if lo > floor + 1 and shave(lo - 1) < raise_(lo):
+        return lo - 1
+    return lo
+
+
+def _break_cross_difficulty_ties(codes, tenths, rank, total=None):
+    """
+    쉬운 단계부터 한 번 훑으며 난이도 간 배점을 엄격히 증가시킨다 (합계 유지).
+    total(0.1점 단위)을 주면 합계를 그 값으로 맞춘다 (앞 단계 보정이 0.1점 하한에 걸려 못 맞춘 경우).
+    이미 단계 간 엄격히 증가하고 합계가 맞으면 그대로 돌려준다.
+    - 바로 아래 단계와 겹치면 경계 b(_boundary_cut)를 골라 아래 단계는 b-0.1 이하로 깎고 이 단계는
+      b 이상으로 올린다 (움직이는 배점이 가장 적게). 더 올린 만큼은 더 쉬운 단계의 높은 배점부터
+      0.1점씩 회수하고, 더 깎인 만큼은 이 단계의 낮은 배점에 고르게 얹는다.
+    - 어느 단계든 바로 아래 단계 최댓값 + 0.1 밑으로는 깎지 않으므로 순서가 깨지지 않는다.
+      아래 단계가 깎여 생긴 여유는 어려운 단계부터 다시 회수하고, 합계가 맞을 때까지 반복한다.
+    - 단계 i(쉬운 쪽부터 0)의 문항을 모두 (i+1)×0.1점으로 해도 합계를 넘으면 ValueError.
+    정렬 1회 + 단계 수 × 문항 수 (3·5단계이므로 사실상 선형).
+    """
+    groups = {}
+    for i, c in enumerate(codes):
+        groups.setdefault(rank.get(c, 999), []).append(i)
+    levels = [sorted(groups[r], key=lambda i: tenths[i]) for r in sorted(groups)]
+    vals = [[tenths[i] for i in idxs] for idxs in levels]
+
+    debt = sum(tenths) - (total if total is not None else sum(tenths))
+    if debt == 0 and all(vals[li][0] > vals[li - 1][-1] for li in range(1, len(vals))):
+        return tenths
+    minimum = sum((li + 1) * len(vs) for li, vs in enumerate(vals))
+    total = sum(tenths) - debt
+    if total < minimum:
+        raise ValueError(
+            f"배점 합계({total / 10:.1f}점)가 너무 작아 난이도가 높을수록 배점이 커지게 나눌 수 없습니다. "
+            f"(문항 수와 난이도 단계로 최소 {minimum / 10:.1f}점 필요)"
+        )
+
+    def floor_of(li):
+        return vals[li - 1][-1] + 1 if li > 0 else 1
+
+    if debt < 0:
+        # 모자란 몫은 가장 어려운 단계에 고르게 (순서는 그대로)
+        top = vals[-1]
+        q, r = divmod(-debt, len(top))
+        vals[-1] = [v + q + (j >= len(top) - r) for j, v in enumerate(top)]
+        debt = 0
+    for li in range(1, len(vals)):
+        below, cur = vals[li - 1], vals[li]
+        if cur[0] <= below[-1]:
+            b = _boundary_cut(below, cur, floor_of(li - 1))
+            for j in range(len(below) - 1, -1, -1):
+                if below[j] < b:
+                    break
+                debt -= below[j] - b + 1
+                below[j] = b - 1
+            for j, v in enumerate(cur):
+                if v >= b:
+                    break
+                debt += b - v
+                cur[j] = b
+            if debt < 0:
+                _lift_bottom(cur, -debt)
+                debt = 0
+        for lj in range(li - 1, -1, -1):
+            if debt == 0:
+                break
+            debt -= _shave_top(vals[lj], floor_of(lj), debt)
+    # 쉬운 단계에서 다 못 갚은 몫: 어려운 단계 위쪽부터. 아래 단계가 깎이면 위 단계의 하한도
+    # 내려가므로 한 바퀴로 모자라면 다시 돈다 (최소 합계 검사를 통과했으니 반드시 끝난다)
+    while debt > 0:
+        paid = 0
+        for li in range(len(vals) - 1, -1, -1):
+            got = _shave_top(vals[li], floor_of(li), debt)
+            debt -= got
+            paid += got
+            if debt == 0:
+                break
+        if paid == 0:
+            raise ValueError("난이도별 배점을 합계에 맞출 수 없습니다.")
+
+    for idxs, vs in zip(levels, vals):
+        for i, v in zip(idxs, vs):
+            tenths[i] = v
+    return tenths
+
+
+def _level_order(scheme):
+    return ["하", "중", "상"] if scheme == "3단계" else ["하", "중하", "중", "중상", "상"]
+
+
+def _scheme_presets(scheme):
+    """난이도 체계별 (curve, bias, p_map, 쉬운 순서) 프리셋"""
+    if scheme == "3단계":
+        return CURVE_3, BIAS_3, P_3, _level_order(scheme)
+    return CURVE_5, BIAS_5, P_5, _level_order(scheme)
+
+
+def _auto_counts(total, scheme_v):
+    total = int(total)
+    if scheme_v == "3단계":
+        ratios = RATIOS_3
+        keys = ["상", "중", "하"]
+    else:
+        ratios = RATIOS_5
+        keys = ["상", "중상", "중", "중하", "하"]
+    cnts = _split_counts(total, [ratios[k] for k in keys])
+    return {keys[i]: cnts[i] for i in range(len(keys))}
+
+
+def _empty_section(section_pts):
+    return {
+        "codes": [],
+        "rows": [],
+        "tenths": [],
+        "counts": {},
+        "anchors": {},
+        "section_points": _round1(section_pts),
+        "exp": (0.0, 0.0),
+    }
+
+
+def _finish_section(
+    codes, tenths, count_map, easy_order, avg, scale, curve, bias, p_map, section_pts, label
+):
+    """보정된 배점(0.1점 단위) → 동점 해소 · 정렬 · 기준 배점 · 기대 통계 (build_section 후반부)"""
+    rank = {lvl: i for i, lvl in enumerate(easy_order)}
+    tenths = _break_cross_difficulty_ties(codes, tenths, rank, _to_tenths(section_pts))
+    items = sorted(zip(codes, tenths), key=lambda it: (rank.get(it[0], 999), it[1]))
+    rows = [
+        {"번호": i + 1, "유형": label, "난이도": c, "배점": t / 10}
+        for i, (c, t) in enumerate(items)
+    ]
+    anchors = {}
+    for lvl in easy_order:
+        if lvl in count_map:
+            anchors[lvl] = (
+                max(1, _to_tenths(avg * curve.get(lvl, 1.0) * scale + bias.get(lvl, 0.0))) / 10
+            )
+    codes = [c for c, _ in items]
+    tenths = [t for _, t in items]
+    ordered_counts = {lvl: count_map.get(lvl, 0) for lvl in easy_order if lvl in count_map}
+    return {
+        "codes": codes,
+        "rows": rows,
+        "tenths": tenths,
+        "counts": ordered_counts,
+        "anchors": anchors,
+        "section_points": _round1(section_pts),
+        "exp": _expected_stats(codes, tenths, p_map),
+    }
 
 
 def build_section(n_q, section_pts, scheme, ratios, curve, bias, p_map, label):
     if n_q <= 0 or section_pts <= 0:
-        return {
-            "codes": [],
-            "rows": [],
-            "counts": {},
-            "anchors": {},
-            "section_points": _round1(section_pts),
-            "exp": (0.0, 0.0),
-        }
-    easy_order = ["하", "중", "상"] if scheme == "3단계" else ["하", "중하", "중", "중상", "상"]
-    rank = {lvl: i for i, lvl in enumerate(easy_order)}
+        return _empty_section(section_pts)
+    easy_order = _level_order(scheme)
     keys = list(ratios.keys())
     counts = _split_counts(n_q, [ratios[k] for k in keys])
     count_map = {keys[i]: counts[i] for i in range(len(keys))}
@@ -160,41 +348,26 @@ def build_section(n_q, section_pts, scheme, ratios, curve, bias, p_map, label):
     raw = [avg * curve.get(c, 1.0) for c in codes]
     s = sum(raw) if raw else 1.0
     scale = section_pts / s
-    raw = [x * scale for x in raw]
-    raw = [max(0.1, x + bias.get(c, 0.0)) for x, c in zip(raw, codes)]
+    # 실수 → 0.1점 단위 정수 변환은 여기서 한 번만
+    tenths = [_to_tenths(max(0.1, x * scale + bias.get(c, 0.0))) for x, c in zip(raw, codes)]
     by_label = {}
     for i, c in enumerate(codes):
         by_label.setdefault(c, []).append(i)
     for _, idxs in by_label.items():
         offs = _offsets_zero_sum(len(idxs))
         for i, off in zip(idxs, offs):
-            raw[i] = max(0.1, raw[i] + off)
-    points = _correct_to_total_0p1(raw, section_pts)
-    points = _break_cross_difficulty_ties(codes, points, rank)
-    items = [{"난이도": c, "배점": _round1(p)} for c, p in zip(codes, points)]
-    items.sort(key=lambda r: (rank.get(r["난이도"], 999), r["배점"]))
-    rows = [
-        {"번호": i + 1, "유형": label, "난이도": it["난이도"], "배점": it["배점"]}
-        for i, it in enumerate(items)
-    ]
-    anchors = {}
-    for lvl in easy_order:
-        if lvl in count_map:
-            anchors[lvl] = _round1(
-                max(0.1, avg * curve.get(lvl, 1.0) * scale + bias.get(lvl, 0.0))
-            )
-    exp_mean, exp_sd = _expected_stats(
-        [it["난이도"] for it in items], [it["배점"] for it in items], p_map
+            tenths[i] = max(1, tenths[i] + off)
+    tenths = _correct_to_total_0p1(tenths, _to_tenths(section_pts))
+    return _finish_section(
+        codes, tenths, count_map, easy_order, avg, scale, curve, bias, p_map, section_pts, label
     )
-    ordered_counts = {lvl: count_map.get(lvl, 0) for lvl in easy_order if lvl in count_map}
-    return {
-        "codes": [it["난이도"] for it in items],
-        "rows": rows,
-        "counts": ordered_counts,
-        "anchors": anchors,
-        "section_points": _round1(section_pts),
-        "exp": (exp_mean, exp_sd),
-    }
+
+
+def _combine_exp(mc_plan, cr_plan):
+    """객관식 + 서술형 기대 평균/표준편차 (독립 가정)"""
+    g_mean = _round1(mc_plan["exp"][0] + cr_plan["exp"][0])
+    g_sd = _round1((mc_plan["exp"][1] ** 2 + cr_plan["exp"][1] ** 2) ** 0.5)
+    return g_mean, g_sd
 
 
 # ---------- 표 렌더링 (HTML, JS로 취소선/합계) ----------
@@ -222,7 +395,7 @@ def render_section_html(name, plan, easy_order, section_id: str):
         html.append("<p>(문항 없음)</p></div>")
         return "\n".join(html)
 
-    total_all = _round1(sum(r["배점"] for r in rows))
+    total_all = sum(plan["tenths"]) / 10
 
     html.append("<table class='bp-table'>")
     html.append(
@@ -255,6 +428,94 @@ def render_section_html(name, plan, easy_order, section_id: str):
     return "\n".join(html)
 
 
+# ---------- 계획 캐시 (LRU) ----------
+PLAN_CACHE_SIZE = 256
+
+
+class PlanCache:
+    """
+    정규화된 입력 → (섹션 계획, 렌더링 HTML) 프로세스 공용 LRU 캐시
+    - 같은 문항 수/배점/체계로 '최종 생성'을 반복할 때 build_section/render 를 건너뛴다.
+    - 반환되는 계획(dict)은 공유 객체이므로 수정하지 않는다.
+    """
+
+    def __init__(self, maxsize=PLAN_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, build):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+        value = build()
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+_plan_cache = PlanCache()
+
+
+def _section_key(n_q, section_pts, scheme, ratios, curve, bias, p_map, label):
+    return (
+        int(n_q),
+        _round1(section_pts),
+        scheme,
+        tuple(ratios.items()),
+        tuple(curve.items()),
+        tuple(bias.items()),
+        tuple(p_map.items()),
+        label,
+    )
+
+
+def cached_section(n_q, section_pts, scheme, ratios, curve, bias, p_map, label, order, section_id):
+    """build_section + render_section_html 결과를 캐시에서 꺼내거나 새로 계산"""
+    # 키와 계산에 같은 값을 쓴다 (0.1점 단위로 같은 합계가 서로 다른 계획을 나눠 갖지 않게)
+    section_pts = _round1(section_pts)
+    key = _section_key(n_q, section_pts, scheme, ratios, curve, bias, p_map, label) + (
+        tuple(order),
+        section_id,
+    )
+
+    def build():
+        plan = build_section(n_q, section_pts, scheme, ratios, curve, bias, p_map, label)
+        return plan, render_section_html(label, plan, order, section_id)
+
+    return _plan_cache.get_or_build(key, build)
+
+
+def invalidate_plan_cache():
+    """RATIOS_*/CURVE_*/BIAS_*/P_* 프리셋을 바꾼 뒤 호출 (캐시 비우기)"""
+    _plan_cache.clear()
+
+
+def plan_cache_stats():
+    return _plan_cache.stats()
+
+
 # ---------- 파서/보조 ----------
 def _parse_int(txt, name):
     if txt is None or str(txt).strip() == "":
@@ -305,6 +566,69 @@ def _sum_panel(current, target, title):
     )
 
 
+def final_outputs(stb, stc):
+    """STEP4 '최종 생성' 결과: (요약 Markdown, 객관식 HTML, 서술형 HTML)"""
+    subject_v = stb.get("subject") or "(과목)"
+    mc_q_v, cr_q_v = stb.get("mc_q"), stb.get("cr_q")
+    mc_pts_v, cr_pts_v = stb.get("mc_pts"), stb.get("cr_pts")
+    scheme_v = stc.get("scheme", "3단계")
+    mc_total = _parse_int(mc_q_v, "객관식 문항 수")
+    cr_total = _parse_int(cr_q_v, "서술형 문항 수")
+
+    mc_ratios = _counts_to_ratios(stc["mc"], mc_total)
+    cr_ratios = _counts_to_ratios(stc["cr"], cr_total)
+
+    curve, bias, pmap, order = _scheme_presets(scheme_v)
+
+    mc_plan, mc_html = cached_section(
+        mc_total,
+        _parse_float(mc_pts_v, "객관식 만점 점수"),
+        scheme_v,
+        mc_ratios,
+        curve,
+        bias,
+        pmap,
+        "객관식",
+        order,
+        "mc",
+    )
+    cr_plan, cr_html = cached_section(
+        cr_total,
+        _parse_float(cr_pts_v, "서술형 만점 점수"),
+        scheme_v,
+        cr_ratios,
+        curve,
+        bias,
+        pmap,
+        "서술형",
+        order,
+        "cr",
+    )
+
+    total_points = _round1(float(mc_pts_v) + float(cr_pts_v))
+    g_mean, g_sd = _combine_exp(mc_plan, cr_plan)
+    dist = distribution_summary(exam_distribution([mc_plan, cr_plan], pmap), total_points)
+    pct = dist["percentiles"]
+    cut_str = " / ".join(
+        f"{name}({cut:.0f}점↑) {prob * 100:.1f}%"
+        for name, (cut, prob) in dist["cutoffs"].items()
+    )
+
+    summary = [
+        "## 요약",
+        f"- 과목: **{subject_v}**",
+        f"- 총 문항수: **{int(mc_total)+int(cr_total)}문항**, 총점 **{total_points:.1f}점**",
+        f"- 난이도 체계: **{scheme_v}**",
+        f"- 기대 평균(근사): **{g_mean}점**, 기대 표준편차(근사): **{g_sd}점**",
+        f"- 예상 점수 분포: 하위 10% **{pct[10]:.1f}점**, 중앙값 **{pct[50]:.1f}점**, "
+        f"상위 10% **{pct[90]:.1f}점**",
+        f"- 성취도 컷 도달 확률: {cut_str}",
+        "> 실제 값은 집단/문항 상관/채점에 따라 달라질 수 있습니다.",
+    ]
+
+    return "\n".join(summary), mc_html, cr_html
+
+
 # ---------- CSS ----------
 BLUEPRINT_CSS = """
 .bp-table { width: 100%; border-collapse: collapse; }
@@ -339,9 +663,10 @@ def create_blueprint_app():
             "### 시험 블루프린트\n**STEP1 → STEP2 → STEP3 → STEP4** 순서로 진행하세요."
         )
 
-        st_basic = gr.State({})
-        st_scheme = gr.State("3단계")
-        st_counts = gr.State({})
+        # STEP1~3 상태: 서명한 토큰을 숨긴 칸에 (워커가 여럿이어도 요청마다 함께 온다)
+        st_basic = gr.Textbox(dump_state({}), visible=False)
+        st_scheme = gr.Textbox(dump_state("3단계"), visible=False)
+        st_counts = gr.Textbox(dump_state({}), visible=False)
 
         with gr.Row():
             with gr.Column(scale=1, min_width=380):
@@ -489,7 +814,7 @@ def create_blueprint_app():
                 _ = _parse_float(cr_pts_v, "서술형 만점 점수")
             except Exception as e:
                 return (
-                    {},
+                    dump_state({}),
                     gr.update(interactive=False, value="3단계"),
                     "#### STEP2 · 난이도 단계 선택  \n(선택 후 'STEP2 입력' 클릭)",
                     gr.update(value=_scheme_badge_text("3단계")),
@@ -504,7 +829,7 @@ def create_blueprint_app():
                 "cr_pts": cr_pts_v,
             }
             return (
-                basic,
+                dump_state(basic),
                 gr.update(interactive=True, value="3단계"),
                 "#### STEP2 · 난이도 단계 선택  \n(선택 후 'STEP2 입력' 클릭)",
                 gr.update(value=_scheme_badge_text("3단계")),
@@ -516,6 +841,7 @@ def create_blueprint_app():
             fn=on_step1,
             inputs=[subject, mc_q, cr_q, mc_pts, cr_pts],
             outputs=[st_basic, scheme, step2_header, scheme_badge, btn_step2, preview_md],
+            queue=QUEUE,
         )
 
         def on_mc_pts_change(mc_pts_v):
@@ -526,32 +852,22 @@ def create_blueprint_app():
             remain = max(0.0, 100.0 - v)
             return gr.update(value=str(_round1(remain)))
 
-        mc_pts.change(fn=on_mc_pts_change, inputs=[mc_pts], outputs=[cr_pts])
+        mc_pts.change(fn=on_mc_pts_change, inputs=[mc_pts], outputs=[cr_pts], queue=QUEUE)
 
         def on_scheme_change(scheme_v):
             return gr.update(value=_scheme_badge_text(scheme_v))
 
-        scheme.change(fn=on_scheme_change, inputs=[scheme], outputs=[scheme_badge])
+        scheme.change(fn=on_scheme_change, inputs=[scheme], outputs=[scheme_badge], queue=QUEUE)
 
         # ----- STEP2 -----
-        def _auto_counts(total, scheme_v):
-            total = int(total)
-            if scheme_v == "3단계":
-                ratios = RATIOS_3
-                keys = ["상", "중", "하"]
-            else:
-                ratios = RATIOS_5
-                keys = ["상", "중상", "중", "중하", "하"]
-            cnts = _split_counts(total, [ratios[k] for k in keys])
-            return {keys[i]: cnts[i] for i in range(len(keys))}
-
         def on_step2(stb, scheme_v):
+            stb = load_state(stb, {})
             try:
                 mc_total = _parse_int(stb.get("mc_q"), "객관식 문항 수")
                 cr_total = _parse_int(stb.get("cr_q"), "서술형 문항 수")
             except Exception as e:
                 return (
-                    scheme_v,
+                    dump_state(scheme_v),
                     gr.update(value=_scheme_badge_text(scheme_v)),
                     gr.update(visible=False),
                     gr.update(visible=False),
@@ -633,7 +949,7 @@ def create_blueprint_app():
             cr_panel, cr_ok = _sum_panel(sum(cr_counts.values()), cr_total, "서술형")
 
             return (
-                scheme_v,
+                dump_state(scheme_v),
                 gr.update(value=_scheme_badge_text(scheme_v)),
                 *vis,
                 *mc_vals,
@@ -675,6 +991,7 @@ def create_blueprint_app():
                 btn_step3,
                 preview_md,
             ],
+            queue=QUEUE,
         )
 
         # --- STEP3 ---
@@ -698,6 +1015,8 @@ def create_blueprint_app():
             cr_ml5,
             cr_l5,
         ):
+            stb = load_state(stb, {})
+            scheme_v = load_state(scheme_v, "3단계")
             mc_total = _parse_int(stb.get("mc_q"), "객관식 문항 수")
             cr_total = _parse_int(stb.get("cr_q"), "서술형 문항 수")
 
@@ -763,6 +1082,7 @@ def create_blueprint_app():
                 fn=on_counts_change,
                 inputs=num_inputs,
                 outputs=[mc_total_md, cr_total_md, btn_step3],
+                queue=QUEUE,
             )
 
         def on_step3_done(
@@ -785,6 +1105,9 @@ def create_blueprint_app():
             cr_ml5,
             cr_l5,
         ):
+            stb = load_state(stb, {})
+            scheme_v = load_state(scheme_v, "3단계")
+
             def _i(x):
                 try:
                     return int(x)
@@ -838,7 +1161,7 @@ def create_blueprint_app():
                 [f"{k}:{stc['cr'].get(k,0)}" for k in order if k in stc["cr"]]
             )
             prev = f"### 확인용 미리보기\n- 객관식: {mc_str}\n- 서술형: {cr_str}"
-            return stc, gr.update(value=prev), gr.update(interactive=(mc_ok and cr_ok))
+            return dump_state(stc), gr.update(value=prev), gr.update(interactive=(mc_ok and cr_ok))
 
         btn_step3.click(
             fn=on_step3_done,
@@ -863,73 +1186,28 @@ def create_blueprint_app():
                 cr_lo5,
             ],
             outputs=[st_counts, preview_md, btn_final],
+            queue=QUEUE,
         )
 
         # ----- STEP4 -----
-        def on_final(stb, stc):
-            subject_v = stb.get("subject") or "(과목)"
-            mc_q_v, cr_q_v = stb.get("mc_q"), stb.get("cr_q")
-            mc_pts_v, cr_pts_v = stb.get("mc_pts"), stb.get("cr_pts")
-            scheme_v = stc.get("scheme", "3단계")
-            mc_total = _parse_int(mc_q_v, "객관식 문항 수")
-            cr_total = _parse_int(cr_q_v, "서술형 문항 수")
-
-            mc_ratios = _counts_to_ratios(stc["mc"], mc_total)
-            cr_ratios = _counts_to_ratios(stc["cr"], cr_total)
-
-            if scheme_v == "3단계":
-                curve, bias, pmap, order = CURVE_3, BIAS_3, P_3, ["하", "중", "상"]
-            else:
-                curve, bias, pmap, order = (
-                    CURVE_5,
-                    BIAS_5,
-                    P_5,
-                    ["하", "중하", "중", "중상", "상"],
-                )
-
-            mc_plan = build_section(
-                mc_total,
-                _parse_float(mc_pts_v, "객관식 만점 점수"),
-                scheme_v,
-                mc_ratios,
-                curve,
-                bias,
-                pmap,
-                "객관식",
-            )
-            cr_plan = build_section(
-                cr_total,
-                _parse_float(cr_pts_v, "서술형 만점 점수"),
-                scheme_v,
-                cr_ratios,
-                curve,
-                bias,
-                pmap,
-                "서술형",
-            )
-
-            total_points = _round1(float(mc_pts_v) + float(cr_pts_v))
-            g_mean = _round1(mc_plan["exp"][0] + cr_plan["exp"][0])
-            g_sd = _round1((mc_plan["exp"][1] ** 2 + cr_plan["exp"][1] ** 2) ** 0.5)
-
-            summary = [
-                "## 요약",
-                f"- 과목: **{subject_v}**",
-                f"- 총 문항수: **{int(mc_total)+int(cr_total)}문항**, 총점 **{total_points:.1f}점**",
-                f"- 난이도 체계: **{scheme_v}**",
-                f"- 기대 평균(근사): **{g_mean}점**, 기대 표준편차(근사): **{g_sd}점**",
-                "> 실제 값은 집단/문항 상관/채점에 따라 달라질 수 있습니다.",
-            ]
-
-            mc_html = render_section_html("객관식", mc_plan, order, "mc")
-            cr_html = render_section_html("서술형", cr_plan, order, "cr")
-
-            return "\n".join(summary), mc_html, cr_html
+        async def on_final(stb, stc):
+            # 문항이 많으면 계산 풀에서 (apps/compute_pool.py)
+            stb, stc = load_state(stb, {}), load_state(stc, {})
+            try:
+                size = int(float(stb.get("mc_q") or 0)) + int(float(stb.get("cr_q") or 0))
+            except (TypeError, ValueError):
+                size = 0
+            try:
+                return await offload(final_outputs, stb, stc, size=size)
+            except ValueError as e:
+                # 합계가 너무 작아 난이도 순서를 지킬 수 없는 경우 등
+                return f"❗ 최종 생성 오류: {e}", "", ""
 
         btn_final.click(
             fn=on_final,
             inputs=[st_basic, st_counts],
             outputs=[summary_md, mc_md, cr_md],
+            queue=QUEUE,
         )
 
         # ---------- 전역 JS (키보드 네비 + 체크박스 취소선/합계) ----------
@@ -1114,6 +1392,6 @@ def create_blueprint_app():
         def _noop():
             return
 
-        demo.load(fn=_noop, inputs=[], outputs=[], js=keyboard_js)
+        demo.load(fn=_noop, inputs=[], outputs=[], js=keyboard_js, queue=QUEUE)
 
     return demo
@@ -0,0 +1,269 @@
+"""
+하위 앱 프로세스 격리 (앞단 FastAPI → 로컬 Unix 소켓 프록시)
+큰 블루프린트 계산이 /counter 와 랜딩 페이지까지 멈추지 않도록, 격리 모드(TS_ISOLATE_APPS=1)에서는
+/blueprint · /counter 를 각자의 자식 프로세스(apps.subapp_server)로 띄우고 앞단은 요청을 그대로 넘긴다.
+- 자식마다 uvicorn 워커 수를 따로 (TS_SUBAPP_WORKERS="/blueprint=2,/counter=1")
+- 상태 확인: HEALTH_INTERVAL 마다 /_health. 프로세스가 죽었거나 MAX_FAILURES 번 연속 응답이 없으면
+  다시 시작 (RESTART_BACKOFF 만큼 쉬었다가)
+- 준비 중 · 재시작 중인 앱으로 온 요청은 READY_WAIT 동안 기다렸다가, 그래도 안 되면 503
+  (연결이 끊겨 프로세스가 죽은 것을 먼저 알면 바로 재시작을 깨우고, 본문 없는 GET/HEAD 는 한 번 다시 보낸다)
+- 응답은 받는 대로 흘려보내므로 Gradio 큐의 SSE 스트림도 그대로 동작한다.
+"""
+
+import asyncio
+import logging
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+from apps.subapp_server import HEALTH_PATH
+
+logger = logging.getLogger("uvicorn.error")
+
+HEALTH_INTERVAL = 5.0
+HEALTH_TIMEOUT = 5.0
+MAX_FAILURES = 3
+# gradio 불러오기가 수 초 걸리므로 시작 확인은 넉넉히
+START_TIMEOUT = 120.0
+READY_WAIT = 30.0
+RESTART_BACKOFF = (1, 2, 5, 10, 30)
+STOP_TIMEOUT = 10.0
+HOP_BY_HOP = {
+    b"connection", b"keep-alive", b"proxy-authenticate", b"proxy-authorization",
+    b"te", b"trailer", b"transfer-encoding", b"upgrade",
+}
+
+
+def parse_workers(text):
+    """'/blueprint=2, /counter=1' → {경로: 워커 수}"""
+    out = {}
+    for part in str(text or "").replace(",", " ").split():
+        path, _, n = part.partition("=")
+        try:
+            out["/" + path.strip("/")] = max(1, int(n))
+        except ValueError:
+            raise ValueError(f"워커 수 형식이 올바르지 않습니다: {part} (예: /blueprint=2)")
+    return out
+
+
+def _plain_headers(raw):
+    return [(k, v) for k, v in raw if k.lower() not in HOP_BY_HOP]
+
+
+async def _unavailable(send, message):
+    body = message.encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": 503,
+        "headers": [
+            (b"content-type", b"text/plain; charset=utf-8"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", b"5"),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class SubAppProcess:
+    """하위 앱 자식 프로세스 하나 (감시 + 재시작) 이자 그 앞의 ASGI 프록시"""
+
+    def __init__(self, path, factory, socket_dir, workers=1):
+        self.path = path
+        self.factory = factory
+        self.workers = workers
+        self.socket = os.path.join(socket_dir, path.strip("/").replace("/", "_") + ".sock")
+        self.proc = None
+        self.client = None
+        self.ready = None
+        self.restarts = 0
+        self.failures = 0
+        self.started_at = None
+        self.last_ok = None
+        self._task = None
+        self._wake = None
+        self._closing = False
+
+    # ---------- 프로세스 ----------
+    def _spawn(self):
+        if os.path.exists(self.socket):
+            os.unlink(self.socket)
+        env = dict(
+            os.environ,
+            TS_SUBAPP_PATH=self.path,
+            TS_SUBAPP_FACTORY=self.factory,
+            TS_WORKERS=str(self.workers),
+        )
+        self.proc = subprocess.Popen(
+            [
+                sys.executable, "-m", "uvicorn", "apps.subapp_server:create_app", "--factory",
+                "--uds", self.socket, "--workers", str(self.workers), "--log-level", "warning",
+            ],
+            env=env,
+        )
+        self.started_at = time.monotonic()
+        self.failures = 0
+
+    def _stop_proc(self):
+        if self.proc is None or self.proc.poll() is not None:
+            return
+        self.proc.terminate()
+        try:
+            self.proc.wait(timeout=STOP_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            self.proc.wait()
+
+    async def start(self):
+        self.ready = asyncio.Event()
+        self._wake = asyncio.Event()
+        self.client = httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(uds=self.socket),
+            base_url="http://subapp",
+            timeout=None,
+            limits=httpx.Limits(max_connections=None, max_keepalive_connections=64),
+        )
+        self._spawn()
+        self._task = asyncio.create_task(self._supervise())
+
+    async def close(self):
+        self._closing = True
+        if self._task is not None:
+            self._task.cancel()
+        await asyncio.to_thread(self._stop_proc)
+        if self.client is not None:
+            await self.client.aclose()
+        if os.path.exists(self.socket):
+            os.unlink(self.socket)
+
+    # ---------- 상태 확인 ----------
+    async def check(self):
+        try:
+            r = await self.client.get(HEALTH_PATH, timeout=HEALTH_TIMEOUT)
+            return r.status_code == 200
+        except httpx.HTTPError:
+            return False
+
+    async def _supervise(self):
+        backoff = 0
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wake.wait(), HEALTH_INTERVAL if self.ready.is_set() else 0.2)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            if self.proc.poll() is not None:
+                reason = f"종료 코드 {self.proc.returncode}"
+            elif await self.check():
+                if not self.ready.is_set():
+                    logger.info(
+                        "%s 프로세스 준비 (%.1f초, pid %d)",
+                        self.path, time.monotonic() - self.started_at, self.proc.pid,
+                    )
+                    self.ready.set()
+                self.failures = 0
+                self.last_ok = time.time()
+                backoff = 0
+                continue
+            elif not self.ready.is_set():
+                if time.monotonic() - self.started_at < START_TIMEOUT:
+                    continue
+                reason = "시작 시간 초과"
+            else:
+                self.failures += 1
+                if self.failures < MAX_FAILURES:
+                    continue
+                reason = f"상태 확인 {self.failures}회 연속 실패"
+
+            logger.warning("%s 다시 시작: %s", self.path, reason)
+            self.ready.clear()
+            await asyncio.to_thread(self._stop_proc)
+            await asyncio.sleep(RESTART_BACKOFF[min(backoff, len(RESTART_BACKOFF) - 1)])
+            backoff += 1
+            self.restarts += 1
+            self._spawn()
+
+    def status(self):
+        alive = self.proc is not None and self.proc.poll() is None
+        return {
+            "path": self.path,
+            "pid": self.proc.pid if alive else None,
+            "workers": self.workers,
+            "ready": alive and self.ready.is_set(),
+            "restarts": self.restarts,
+            "failures": self.failures,
+            "uptime": round(time.monotonic() - self.started_at, 1) if alive else None,
+            "last_ok": self.last_ok,
+        }
+
+    # ---------- 프록시 ----------
+    async def _wait_ready(self):
+        if self.ready.is_set():
+            return True
+        try:
+            await asyncio.wait_for(self.ready.wait(), READY_WAIT)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "websocket":
+            await send({"type": "websocket.close", "code": 1013})
+            return
+        if scope["type"] != "http":
+            return
+        if not await self._wait_ready():
+            await _unavailable(send, f"{self.path} 준비 중입니다. 잠시 뒤 다시 시도해 주세요.")
+            return
+
+        # Mount 는 raw_path 를 건드리지 않으므로 원래 주소 그대로 (/counter/…)
+        url = (scope.get("raw_path") or scope["path"].encode("utf-8")).decode("latin-1")
+        if scope.get("query_string"):
+            url += "?" + scope["query_string"].decode("latin-1")
+        headers = _plain_headers(scope["headers"])
+        names = {k.lower() for k, _ in headers}
+        if b"x-forwarded-proto" not in names:
+            headers.append((b"x-forwarded-proto", scope.get("scheme", "http").encode()))
+        if scope.get("client") and b"x-forwarded-for" not in names:
+            headers.append((b"x-forwarded-for", scope["client"][0].encode()))
+
+        async def body():
+            while True:
+                message = await receive()
+                if message["type"] != "http.request":
+                    return
+                yield message.get("body", b"")
+                if not message.get("more_body"):
+                    return
+
+        no_body = scope["method"] in ("GET", "HEAD")
+        retry = no_body
+        while True:
+            request = self.client.build_request(
+                scope["method"], url, headers=headers, content=None if no_body else body()
+            )
+            try:
+                response = await self.client.send(request, stream=True)
+                break
+            except httpx.HTTPError:
+                if self.proc is not None and self.proc.poll() is not None:
+                    # 다음 상태 확인까지 기다리지 않고 바로 재시작
+                    self.ready.clear()
+                    self._wake.set()
+                if not (retry and await self._wait_ready()):
+                    await _unavailable(send, f"{self.path} 에 연결하지 못했습니다. 잠시 뒤 다시 시도해 주세요.")
+                    return
+                retry = False
+        try:
+            await send({
+                "type": "http.response.start",
+                "status": response.status_code,
+                "headers": _plain_headers(response.headers.raw),
+            })
+            async for chunk in response.aiter_raw():
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            await send({"type": "http.response.body", "body": b""})
+        finally:
+            await response.aclose()
@@ -0,0 +1,139 @@
+"""
+Gradio 하위 앱 지연 생성 · 마운트
+gradio 불러오기와 Blocks 생성이 수 초 걸리므로, 지연 모드에서는 서버가 먼저 / 와 /static 을
+받고 /blueprint · /counter 는 첫 요청(또는 시작 뒤 백그라운드 warm-up) 때 만든다.
+- 자리 표시 Mount(LazyGradioApp)가 첫 요청을 잡아 Blocks 를 스레드에서 만들고,
+  gr.mount_gradio_app 으로 만든 진짜 Mount 로 자기 자리를 바꾼다 (이후 요청은 바로 Gradio 로).
+- 서버 수명 주기는 이미 시작했으므로 Gradio 앱의 수명 주기(큐 등)는 전용 작업에서 직접 연다.
+- FirstByteTimer: 첫 응답 바이트까지 걸린 시간을 로그로 남긴다.
+
+    lazy = LazyGradioApp(app, "/counter", "apps.counter_12345:create_counter_app")
+    app.mount("/counter", lazy)
+    await lazy.ensure()   # warm-up
+    await lazy.close()    # 종료
+"""
+
+import asyncio
+import importlib
+import logging
+import threading
+import time
+from contextlib import nullcontext
+
+import anyio
+
+logger = logging.getLogger("uvicorn.error")
+# Gradio 의 Blocks 문맥은 프로세스 전역이라 두 앱을 동시에 만들면 섞인다 — 한 번에 하나씩
+_build_lock = threading.Lock()
+
+
+def _phase(profile, name):
+    return profile.phase(name) if profile is not None else nullcontext()
+
+
+def build_blocks(path, factory, profile=None):
+    """'모듈:함수' → Blocks (profile 이 있으면 '<경로> import' · '<경로> build' 단계로 기록)"""
+    module, name = factory.split(":")
+    with _phase(profile, f"{path} import"):
+        create = getattr(importlib.import_module(module), name)
+    with _build_lock, _phase(profile, f"{path} build"):
+        return create()
+
+
+class LazyGradioApp:
+    """경로 하나를 맡는 ASGI 자리 표시 앱. factory 는 '모듈:함수' 문자열 (Blocks 를 반환)"""
+
+    def __init__(self, parent, path, factory, profile=None):
+        self.parent = parent
+        self.path = path
+        self.factory = factory
+        self.profile = profile
+        self.app = None
+        self.build_seconds = None
+        self._lock = None
+        self._stop = None
+        self._task = None
+
+    async def ensure(self):
+        """Gradio 앱을 만들어 마운트 (이미 있으면 그대로). 동시에 들어온 요청은 한 번만 만든다"""
+        if self.app is not None:
+            return self.app
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self.app is None:
+                t0 = time.perf_counter()
+                blocks = await anyio.to_thread.run_sync(build_blocks, self.path, self.factory, self.profile)
+                with _phase(self.profile, f"{self.path} mount"):
+                    self.app = await self._mount(blocks)
+                self.build_seconds = time.perf_counter() - t0
+                logger.info("%s 준비 (%.2f초)", self.path, self.build_seconds)
+        return self.app
+
+    async def _mount(self, blocks):
+        import gradio as gr
+
+        router = self.parent.router
+        lifespan = router.lifespan_context
+        gr.mount_gradio_app(self.parent, blocks, path=self.path)
+        # 이미 시작한 서버라 바꿔 끼운 수명 주기는 쓰이지 않는다 — 원래대로 두고 아래에서 직접 연다
+        router.lifespan_context = lifespan
+        route = router.routes.pop()
+        gradio_app = route.app
+
+        started = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._task = asyncio.create_task(self._run_lifespan(gradio_app, started))
+        await started.wait()
+        if self._task.done():
+            self._task.result()
+
+        for i, r in enumerate(router.routes):
+            if getattr(r, "app", None) is self:
+                router.routes[i] = route
+                break
+        return gradio_app
+
+    async def _run_lifespan(self, gradio_app, started):
+        """Gradio 앱 수명 주기를 같은 작업 안에서 열고 닫는다 (anyio 취소 범위 규칙)"""
+        try:
+            async with gradio_app.router.lifespan_context(gradio_app):
+                blocks = gradio_app.get_blocks()
+                blocks.run_startup_events()
+                await blocks.run_extra_startup_events()
+                started.set()
+                await self._stop.wait()
+        finally:
+            started.set()
+
+    async def close(self):
+        if self._task is not None:
+            self._stop.set()
+            await self._task
+
+    async def __call__(self, scope, receive, send):
+        app = await self.ensure()
+        await app(scope, receive, send)
+
+
+class FirstByteTimer:
+    """
+    ASGI 미들웨어: 첫 HTTP 응답이 나갈 때 stats["started"](perf_counter) 부터의 시간을
+    stats["first_byte"] 에 한 번 기록하고 로그로 남긴다
+    """
+
+    def __init__(self, app, stats):
+        self.app = app
+        self.stats = stats
+
+    async def __call__(self, scope, receive, send):
+        if "first_byte" in self.stats or scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        async def timed_send(message):
+            if "first_byte" not in self.stats and message["type"] == "http.response.start":
+                self.stats["first_byte"] = time.perf_counter() - self.stats["started"]
+                logger.info("첫 응답까지 %.2f초 (%s)", self.stats["first_byte"], scope.get("path", ""))
+            await send(message)
+
+        await self.app(scope, receive, timed_send)
@@ -0,0 +1,130 @@
+"""
+서명한 클라이언트 상태 (여러 워커 배포용)
+gr.State 는 프로세스 메모리에 있어서 워커가 여럿이면 다른 워커로 간 요청이 STEP1~3 진행을 잃는다.
+상태를 JSON → HMAC-SHA256 서명 토큰으로 만들어 숨긴 Textbox 에 두면 요청마다 브라우저가 함께
+보내므로 어느 워커든 같은 상태를 받는다. 서명이 맞지 않으면(변조 · 다른 비밀 키) 기본값으로 돌아간다.
+
+- 비밀 키: TS_SESSION_SECRET (배포에서는 이것을 쓴다). 없으면 사용자 전용 디렉터리
+  (임시 디렉터리/teacher-support-<uid>, 0700)에 키 파일(0600)을 한 번 만들어 같은 컴퓨터의
+  워커들이 함께 쓴다. 디렉터리나 파일의 주인 · 권한이 다르면(다른 사용자가 미리 만들어 둔 경우)
+  쓰지 않고 오류를 낸다. 컨테이너를 여러 대 띄우면 TS_SESSION_SECRET 을 같게 주어야 한다.
+- TS_WORKERS > 1 이면 Gradio 큐(SSE)를 쓰지 않는다: 큐 참가(POST)와 결과 스트림(GET)이
+  서로 다른 워커로 가면 결과가 오지 않으므로, 이벤트를 요청 하나로 끝나는 /run 호출로 보낸다.
+
+    token = dump_state({"mc_q": "23"})
+    load_state(token, {})  # → {"mc_q": "23"}
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import stat
+import tempfile
+
+WORKERS = max(1, int(os.environ.get("TS_WORKERS", "1") or 1))
+MULTI_WORKER = WORKERS > 1
+# 이벤트 queue= 값 (워커가 하나일 때만 큐)
+QUEUE = not MULTI_WORKER
+SECRET_DIR = os.path.join(tempfile.gettempdir(), f"teacher-support-{os.getuid()}")
+SECRET_NAME = "session.key"
+# 토큰 길이 상한 (숨긴 칸에 큰 값을 넣어 보내는 것 방지)
+MAX_TOKEN = 64 * 1024
+
+
+def _check_private(st, what):
+    """내 것이고 그룹 · 다른 사용자 권한이 없어야 한다"""
+    if st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise RuntimeError(
+            f"세션 키 {what}의 주인이나 권한이 올바르지 않습니다. TS_SESSION_SECRET 을 설정해 주세요."
+        )
+
+
+def _private_dir(path=SECRET_DIR):
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode):
+        raise RuntimeError(f"세션 키 디렉터리가 디렉터리가 아닙니다: {path}")
+    _check_private(st, "디렉터리")
+    return path
+
+
+def _read_key(path):
+    fd = os.open(path, os.O_RDONLY | os.O_NOFOLLOW)
+    with open(fd, "rb") as f:
+        _check_private(os.fstat(fd), "파일")
+        return f.read()
+
+
+def _shared_secret(directory=SECRET_DIR):
+    """
+    같은 컴퓨터의 워커들이 함께 쓰는 키 — 먼저 만든 워커의 파일을 나머지가 읽는다
+    새 키는 O_CREAT | O_EXCL, 0600 으로 만든 임시 파일에 다 쓴 뒤 link 로 한 번에 내놓는다
+    (다른 워커가 반쯤 쓴 키를 읽지 않도록).
+    """
+    path = os.path.join(_private_dir(directory), SECRET_NAME)
+    try:
+        key = _read_key(path)
+        if len(key) >= 32:
+            return key
+        raise RuntimeError(f"세션 키 파일이 너무 짧습니다: {path}")
+    except FileNotFoundError:
+        pass
+    tmp = f"{path}.{os.getpid()}.{secrets.token_hex(4)}"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_NOFOLLOW, 0o600)
+    with open(fd, "wb") as f:
+        f.write(secrets.token_bytes(32))
+    try:
+        os.link(tmp, path)  # 이미 있으면 실패 → 먼저 만든 키를 쓴다
+    except FileExistsError:
+        pass
+    finally:
+        os.unlink(tmp)
+    return _read_key(path)
+
+
+_key = None
+
+
+def _secret():
+    global _key
+    if _key is None:
+        env = os.environ.get("TS_SESSION_SECRET", "")
+        _key = env.encode("utf-8") if env else _shared_secret()
+    return _key
+
+
+def _b64(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _unb64(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _sign(body):
+    return _b64(hmac.new(_secret(), body.encode("utf-8"), hashlib.sha256).digest())
+
+
+def dump_state(value):
+    """JSON 으로 바꿀 수 있는 값 → '본문.서명' 토큰"""
+    body = _b64(json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+    return f"{body}.{_sign(body)}"
+
+
+def load_state(token, default=None):
+    """토큰 → 값 (비었거나 서명이 틀리면 default)"""
+    if not isinstance(token, str) or not token or len(token) > MAX_TOKEN:
+        return default
+    body, _, sig = token.partition(".")
+    if not sig or not hmac.compare_digest(sig.encode("utf-8"), _sign(body).encode("ascii")):
+        return default
+    try:
+        return json.loads(_unb64(body))
+    except ValueError:
+        return default
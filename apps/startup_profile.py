@@ -0,0 +1,71 @@
+"""
+시작 시간 프로파일러
+uvicorn app:app 부터 첫 응답까지 시간이 어디에 쓰이는지 단계별로 잰다.
+- 단계: 모듈 불러오기(fastapi, gradio, 하위 앱 모듈), 하위 앱별 Blocks 생성 · 마운트, 정적 파일 압축 등
+- TS_PROFILE_STARTUP=1 일 때만 기록하고, 진단 주소(/_diag/startup)로 JSON 을 내보낸다.
+  꺼져 있으면 phase() 는 아무것도 하지 않는다.
+
+    profile = StartupProfile(started)
+    with profile.phase("import gradio"):
+        import gradio
+    profile.report()  # {"enabled", "total", "phases": [{"name", "start", "seconds", "thread"}…]}
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+ENABLED = os.environ.get("TS_PROFILE_STARTUP", "") == "1"
+
+
+class StartupProfile:
+    """단계 기록 (started 는 perf_counter 기준 시작 시각). 백그라운드 warm-up 스레드에서도 기록한다"""
+
+    def __init__(self, started=None, enabled=ENABLED):
+        self.started = time.perf_counter() if started is None else started
+        self.enabled = enabled
+        self.phases = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name):
+        if not self.enabled:
+            yield
+            return
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, t0, time.perf_counter() - t0)
+
+    def add(self, name, t0, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.phases.append({
+                "name": name,
+                "start": round(t0 - self.started, 4),
+                "seconds": round(seconds, 4),
+                "thread": threading.current_thread().name,
+            })
+
+    def report(self, stats=None):
+        """시작 순서대로 단계 목록 + stats(ready, first_byte 등, 초)"""
+        with self._lock:
+            phases = sorted(self.phases, key=lambda p: p["start"])
+        out = {
+            "enabled": self.enabled,
+            "total": round(time.perf_counter() - self.started, 4),
+            "phases": phases,
+        }
+        for key, value in (stats or {}).items():
+            if key != "started":
+                out[key] = round(value, 4) if isinstance(value, float) else value
+        return out
+
+    def summary(self, limit=10):
+        """로그용 한 줄 (오래 걸린 단계부터)"""
+        with self._lock:
+            top = sorted(self.phases, key=lambda p: -p["seconds"])[:limit]
+        return ", ".join(f"{p['name']} {p['seconds']:.2f}초" for p in top)
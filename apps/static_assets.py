@@ -0,0 +1,325 @@
+"""
+정적 파일 제공 · 미리 압축
+/static 의 텍스트 자산(js, css, html, json, svg …)을 시작할 때 한 번 gzip/brotli 로 압축해
+메모리에 들고, 요청의 Accept-Encoding 에 맞는 바이트를 그대로 보낸다 (요청마다 압축하지 않음).
+- brotli 패키지가 없으면 gzip 만 쓴다.
+- 작거나(MIN_SIZE 미만) 압축해도 별로 줄지 않는 파일은 원본 그대로.
+- 파일이 바뀌면(수정 시각 · 크기) 그 파일만 다시 압축한다.
+- 빌드 단계에서 최고 압축률로 옆 파일(x.js.br, x.js.gz)을 만들어 두면 시작할 때 압축하지 않고
+  그 파일을 읽는다 (원본보다 새것일 때만).
+
+자산 목록(AssetManifest): js/main.js → js/main.3f2a9c1b0d.js 처럼 내용 해시를 붙인 주소를 만들고,
+HTML 의 src/href 를 해시 주소로 바꿔 보낸다. 해시 주소는 내용이 바뀌면 주소도 바뀌므로
+1년 immutable 캐시, 원래 주소는 그대로 동작한다 (캐시 헤더 없음).
+
+    from apps.static_assets import PrecompressedStatic
+    static_files = PrecompressedStatic(directory="static", url_prefix="/static")
+    app.mount("/static", static_files, name="static")
+    static_files.manifest.url("js/main.js")  # → /static/js/main.3f2a9c1b0d.js
+
+빌드 단계 (Docker 이미지 등):
+    python -m apps.static_assets static
+"""
+
+import gzip
+import hashlib
+import os
+import posixpath
+import re
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+try:
+    import brotli
+except ImportError:  # brotli 없이도 gzip 으로 동작
+    brotli = None
+
+COMPRESSIBLE = {
+    ".css", ".csv", ".html", ".htm", ".js", ".json", ".map", ".mjs",
+    ".svg", ".tsx", ".ts", ".txt", ".xml", ".md",
+}
+MIN_SIZE = 1024
+# 압축본이 원본의 이 비율보다 크면 원본을 보낸다
+MAX_RATIO = 0.9
+# 같은 q 값이면 앞쪽 우선
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+ETAG_SUFFIX = {"br": "-br", "gzip": "-gz"}
+SIBLING_EXT = {"br": ".br", "gzip": ".gz"}
+# 시작할 때 압축하는 품질 (11 은 1 MB 남짓에도 수 초라 빌드 단계에서만)
+BROTLI_QUALITY = 9
+BUILD_BROTLI_QUALITY = 11
+
+# 해시 주소를 만드는 자산 (HTML 은 진입점이라 원래 주소 그대로)
+HASHABLE = {
+    ".css", ".js", ".mjs", ".json", ".map", ".svg",
+    ".png", ".jpg", ".jpeg", ".gif", ".webp", ".ico", ".woff", ".woff2",
+}
+HASH_LEN = 10
+IMMUTABLE = "public, max-age=31536000, immutable"
+_ASSET_ATTR = re.compile(r"""(\b(?:src|href)\s*=\s*)(["'])([^"'#?]+)\2""")
+
+
+# ---------- Accept-Encoding ----------
+def pick_encoding(headers, offered=ENCODINGS):
+    """요청 헤더 → offered 중 받아 주는 인코딩 (없으면 None). q 값이 높은 것, 같으면 offered 순서"""
+    accepted = {}
+    for part in headers.get("accept-encoding", "").split(","):
+        name, *params = [p.strip() for p in part.split(";")]
+        if not name:
+            continue
+        q = 1.0
+        for p in params:
+            if p.startswith("q="):
+                try:
+                    q = float(p[2:])
+                except ValueError:
+                    q = 0.0
+        accepted[name.lower()] = q
+    best = None
+    for enc in offered:
+        q = accepted.get(enc, accepted.get("*", 0.0))
+        if q > 0 and (best is None or q > best[1]):
+            best = (enc, q)
+    return best[0] if best else None
+
+
+# ---------- 압축 ----------
+def compress_bytes(data, brotli_quality=BROTLI_QUALITY):
+    """원본 바이트 → {인코딩: 압축 바이트} (충분히 줄어드는 것만)"""
+    out = {}
+    gz = gzip.compress(data, compresslevel=9, mtime=0)
+    if len(gz) <= len(data) * MAX_RATIO:
+        out["gzip"] = gz
+    if brotli is not None:
+        br = brotli.compress(data, quality=brotli_quality)
+        if len(br) <= len(data) * MAX_RATIO:
+            out["br"] = br
+    return out
+
+
+def _compressible(path, size):
+    return size >= MIN_SIZE and os.path.splitext(path)[1].lower() in COMPRESSIBLE
+
+
+def _read_siblings(path, st):
+    """빌드 단계에서 만든 옆 파일 중 원본보다 새것 {인코딩: 바이트}"""
+    out = {}
+    for enc, ext in SIBLING_EXT.items():
+        if enc not in ENCODINGS:
+            continue
+        try:
+            if os.stat(path + ext).st_mtime < st.st_mtime:
+                continue
+            with open(path + ext, "rb") as f:
+                out[enc] = f.read()
+        except OSError:
+            continue
+    return out
+
+
+def write_siblings(directory, brotli_quality=BUILD_BROTLI_QUALITY):
+    """빌드 단계: directory 아래 압축 대상 파일마다 .br/.gz 옆 파일을 쓴다. 반환: 쓴 파일 수"""
+    written = 0
+    for root, _, names in os.walk(directory):
+        for name in names:
+            path = os.path.join(root, name)
+            if not _compressible(path, os.path.getsize(path)):
+                continue
+            with open(path, "rb") as f:
+                variants = compress_bytes(f.read(), brotli_quality)
+            for enc, data in variants.items():
+                with open(path + SIBLING_EXT[enc], "wb") as f:
+                    f.write(data)
+                written += 1
+    return written
+
+
+# ---------- 내용 해시 주소 ----------
+def hashed_name(rel, digest):
+    """'js/main.js' + 해시 → 'js/main.<해시 앞 HASH_LEN자리>.js'"""
+    base, ext = posixpath.splitext(rel)
+    return f"{base}.{digest[:HASH_LEN]}{ext}"
+
+
+class AssetManifest:
+    """
+    정적 디렉터리의 자산 목록 (시작할 때 한 번)
+    - urls: {원래 상대 경로: 해시 상대 경로}
+    - sources: {해시 상대 경로: (원래 상대 경로, 수정 시각)}
+    """
+
+    def __init__(self, directory, url_prefix="/static"):
+        self.directory = os.path.realpath(directory)
+        self.prefix = url_prefix.rstrip("/")
+        self.urls = {}
+        self.sources = {}
+        self.build()
+
+    def build(self):
+        self.urls.clear()
+        self.sources.clear()
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if posixpath.splitext(name)[1].lower() not in HASHABLE:
+                    continue
+                path = os.path.join(root, name)
+                rel = os.path.relpath(path, self.directory).replace(os.sep, "/")
+                with open(path, "rb") as f:
+                    digest = hashlib.sha256(f.read()).hexdigest()
+                hashed = hashed_name(rel, digest)
+                self.urls[rel] = hashed
+                self.sources[hashed] = (rel, os.stat(path).st_mtime)
+        return len(self.urls)
+
+    def url(self, rel):
+        """상대 경로 → 해시 주소 (목록에 없으면 원래 주소)"""
+        rel = rel.lstrip("/")
+        return f"{self.prefix}/{self.urls.get(rel, rel)}"
+
+    def source(self, path):
+        """요청 경로가 해시 주소면 원래 상대 경로 (시작 뒤 파일이 바뀌었으면 None)"""
+        entry = self.sources.get(path.replace(os.sep, "/"))
+        if entry is None:
+            return None
+        rel, mtime = entry
+        try:
+            if os.stat(os.path.join(self.directory, rel)).st_mtime != mtime:
+                return None
+        except OSError:
+            return None
+        return rel
+
+    def rewrite_html(self, text, base=""):
+        """
+        HTML 의 src/href 중 목록에 있는 자산을 해시 주소로 바꾼다.
+        base: 이 HTML 의 상대 디렉터리 (상대 경로 'core.js', '../theme.js' 해석용)
+        """
+        def repl(m):
+            ref = m.group(3).strip()
+            if ref.startswith(self.prefix + "/"):
+                rel = ref[len(self.prefix) + 1 :]
+            elif ref.startswith("/") or ":" in ref:
+                return m.group(0)
+            else:
+                rel = posixpath.normpath(posixpath.join(base, ref))
+            if rel not in self.urls:
+                return m.group(0)
+            return f"{m.group(1)}{m.group(2)}{self.prefix}/{self.urls[rel]}{m.group(2)}"
+
+        return _ASSET_ATTR.sub(repl, text)
+
+
+class PrecompressedStatic(StaticFiles):
+    """
+    StaticFiles + 시작할 때 만든 압축본 캐시
+    {실제 경로: (수정 시각, 크기, {인코딩: 바이트}, 바꾼 HTML 본문, 그 ETag)}
+    url_prefix 를 주면 자산 목록을 만들어 해시 주소를 받고, HTML 의 자산 주소를 바꿔 보낸다.
+    """
+
+    def __init__(self, *args, url_prefix=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.compressed = {}
+        self.manifest = AssetManifest(self.directory, url_prefix) if url_prefix and self.directory else None
+        self.precompress()
+
+    async def get_response(self, path, scope):
+        source = self.manifest.source(path) if self.manifest else None
+        if source is None:
+            return await super().get_response(path, scope)
+        response = await super().get_response(source, scope)
+        if response.status_code in (200, 304):
+            response.headers["Cache-Control"] = IMMUTABLE
+        return response
+
+    def precompress(self):
+        """디렉터리 전체를 훑어 압축본을 만든다. 반환: (파일 수, 원본 바이트, 가장 작은 압축 바이트)"""
+        files = raw = packed = 0
+        for directory in self.all_directories:
+            for root, _, names in os.walk(directory):
+                for name in names:
+                    path = os.path.realpath(os.path.join(root, name))
+                    st = os.stat(path)
+                    if not self._cached(path, st.st_size):
+                        continue
+                    entry = self._compress(path, st)
+                    if entry[2]:
+                        files += 1
+                        raw += st.st_size
+                        packed += min(len(b) for b in entry[2].values())
+        return files, raw, packed
+
+    def _is_html(self, path):
+        return self.manifest is not None and os.path.splitext(path)[1].lower() in (".html", ".htm")
+
+    def _cached(self, path, size):
+        return self._is_html(path) or _compressible(path, size)
+
+    def _compress(self, path, st):
+        with open(path, "rb") as f:
+            data = f.read()
+        body = etag = None
+        if self._is_html(path):
+            base = os.path.relpath(os.path.dirname(path), self.manifest.directory).replace(os.sep, "/")
+            try:
+                rewritten = self.manifest.rewrite_html(data.decode("utf-8"), "" if base == "." else base)
+            except UnicodeDecodeError:
+                rewritten = None
+            if rewritten is not None and rewritten.encode("utf-8") != data:
+                body = data = rewritten.encode("utf-8")
+                # 내용 해시 ETag (참조한 자산이 바뀌면 HTML 도 새 ETag)
+                etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        # 옆 파일은 원본을 압축한 것이므로 바꾼 HTML 에는 쓰지 않는다
+        variants = {} if body is not None else _read_siblings(path, st)
+        if len(variants) < len(ENCODINGS) and len(data) >= MIN_SIZE:
+            variants = {**compress_bytes(data), **variants}
+        entry = (st.st_mtime, st.st_size, variants, body, etag)
+        self.compressed[path] = entry
+        return entry
+
+    def _entry(self, full_path, stat_result):
+        path = os.path.realpath(full_path)
+        entry = self.compressed.get(path)
+        if entry is None:
+            if not self._cached(path, stat_result.st_size):
+                return None
+        elif entry[:2] == (stat_result.st_mtime, stat_result.st_size):
+            return entry
+        # 새로 생기거나 바뀐 파일
+        return self._compress(path, stat_result)
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        request_headers = Headers(scope=scope)
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+        entry = self._entry(full_path, stat_result) if status_code == 200 else None
+        variants, body, etag = entry[2:] if entry else ({}, None, None)
+        if variants:
+            response.headers["Vary"] = "Accept-Encoding"
+        encoding = None
+        if variants and (body is not None or "range" not in request_headers):
+            encoding = pick_encoding(request_headers, [e for e in ENCODINGS if e in variants])
+        if encoding is None and body is None:
+            if self.is_not_modified(response.headers, request_headers):
+                return NotModifiedResponse(response.headers)
+            return response
+
+        headers = {
+            k: v for k, v in response.headers.items() if k not in ("content-length", "accept-ranges")
+        }
+        if etag is not None:
+            headers["etag"] = etag
+        if encoding is not None:
+            # 인코딩마다 다른 표현이므로 ETag 도 구분한다
+            headers["etag"] = headers["etag"][:-1] + ETAG_SUFFIX[encoding] + '"'
+            headers["content-encoding"] = encoding
+        if self.is_not_modified(Headers(headers), request_headers):
+            return NotModifiedResponse(Headers(headers))
+        return Response(variants[encoding] if encoding else body, status_code=status_code, headers=headers)
+
+
+if __name__ == "__main__":
+    import sys
+
+    for d in sys.argv[1:] or ["static"]:
+        print(f"{d}: 압축 파일 {write_siblings(d)}개")
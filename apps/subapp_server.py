@@ -0,0 +1,41 @@
+"""
+하위 앱 하나만 띄우는 서버 (프로세스 격리 모드의 자식 프로세스)
+앞단(app.py)이 경로 · Blocks 함수를 환경 변수로 넘겨 uvicorn --factory 로 띄운다.
+앞단과 같은 경로(/blueprint, /counter)에 마운트하므로 프록시는 주소를 바꾸지 않는다.
+
+    TS_SUBAPP_PATH=/counter TS_SUBAPP_FACTORY=apps.counter_12345:create_counter_app \
+        uvicorn apps.subapp_server:create_app --factory --uds /tmp/counter.sock
+"""
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+
+from apps import compute_pool
+from apps.lazy_apps import build_blocks
+
+HEALTH_PATH = "/_health"
+
+
+@asynccontextmanager
+async def lifespan(app):
+    warm = asyncio.create_task(compute_pool.warm_up())
+    yield
+    warm.cancel()
+    compute_pool.shutdown()
+
+
+def create_app():
+    import gradio as gr
+
+    path = os.environ["TS_SUBAPP_PATH"]
+    factory = os.environ["TS_SUBAPP_FACTORY"]
+    app = FastAPI(title=f"Teacher Support {path}", lifespan=lifespan)
+
+    @app.get(HEALTH_PATH, include_in_schema=False)
+    async def health():
+        return {"ok": True, "path": path, "pid": os.getpid()}
+
+    return gr.mount_gradio_app(app, build_blocks(path, factory), path=path)
@@ -0,0 +1,128 @@
+"""
+동점 해소(_break_cross_difficulty_ties) 규모별 벤치마크 + 불변식 검사
+문항 1,000 ~ 10,000개 섹션에서 시간이 문항 수에 거의 비례하는지 확인하고,
+무작위로 섞은 (단계, 배점) 조합과 build_sections_batch 섹션 모두에서
+- 합계가 그대로인지
+- 단계마다 최댓값 < 바로 위 단계 최솟값 (난이도가 높을수록 배점이 엄격히 큼)
+를 확인한다. 합계가 최소 필요량보다 작은 조합은 ValueError 여야 한다.
+
+실행: python -m benchmarks.bench_tie_break
+"""
+
+import random
+import time
+
+from apps.blueprint_batch import build_sections_batch
+from apps.exam_blueprint import (
+    _break_cross_difficulty_ties,
+    _counts_to_ratios,
+    _level_order,
+    _scheme_presets,
+)
+
+SIZES = [1000, 2000, 5000, 10000]
+N_RANDOM = 5000
+N_SECTIONS = 5000
+
+
+def _case(n, scheme, seed):
+    """단계 경계마다 배점이 겹치도록 만든 섹션"""
+    rnd = random.Random(seed)
+    order = _level_order(scheme)
+    codes = [order[i * len(order) // n] for i in range(n)]
+    tenths = [10 + 2 * order.index(c) + rnd.randint(-3, 3) for c in codes]
+    rnd.shuffle(codes)
+    return codes, tenths, {lvl: i for i, lvl in enumerate(order)}
+
+
+def check_levels(codes, tenths, rank):
+    """단계별 (최소, 최대) 가 엄격히 증가하지 않으면 AssertionError"""
+    spans = {}
+    for c, t in zip(codes, tenths):
+        lo, hi = spans.get(rank[c], (t, t))
+        spans[rank[c]] = (min(lo, t), max(hi, t))
+    levels = [spans[r] for r in sorted(spans)]
+    for (_, hi), (lo, _) in zip(levels, levels[1:]):
+        assert hi < lo, f"단계 순서 깨짐: {levels}"
+    assert min(tenths) >= 1
+
+
+def random_mixes(n_cases=N_RANDOM, seed=0):
+    """무작위 (단계, 배점) 조합 — 3·5단계, 가능/불가능 모두. 반환: (가능, 불가능) 개수"""
+    rnd = random.Random(seed)
+    feasible = infeasible = 0
+    for _ in range(n_cases):
+        scheme = rnd.choice(["3단계", "5단계"])
+        order = _level_order(scheme)
+        rank = {lvl: i for i, lvl in enumerate(order)}
+        n = rnd.randint(2, 60)
+        codes = [rnd.choice(order) for _ in range(n)]
+        tenths = [rnd.randint(1, rnd.choice([2, 5, 40, 200])) for _ in range(n)]
+        total = sum(tenths)
+        used = sorted({rank[c] for c in codes})
+        minimum = sum(used.index(rank[c]) + 1 for c in codes)
+        try:
+            out = _break_cross_difficulty_ties(codes, list(tenths), rank)
+        except ValueError:
+            assert total < minimum, (codes, tenths)
+            infeasible += 1
+            continue
+        assert total >= minimum
+        assert sum(out) == total, (codes, tenths)
+        check_levels(codes, out, rank)
+        feasible += 1
+    return feasible, infeasible
+
+
+def random_sections(n_sections=N_SECTIONS, seed=0):
+    """build_sections_batch 무작위 섹션 — 합계 · 단계 순서 (불가능한 조합은 ValueError)"""
+    rnd = random.Random(seed)
+    ok = rejected = 0
+    for _ in range(n_sections):
+        scheme = rnd.choice(["3단계", "5단계"])
+        order = _level_order(scheme)
+        curve, bias, pmap, _ = _scheme_presets(scheme)
+        n = rnd.randint(1, 60)
+        counts = {lvl: 0 for lvl in reversed(order)}
+        for _ in range(n):
+            counts[rnd.choice(order)] += 1
+        pts = round(rnd.uniform(1.0, 100.0), 1)
+        sec = (n, pts, scheme, _counts_to_ratios(counts, n), curve, bias, pmap, "객관식")
+        used = [lvl for lvl in order if counts[lvl]]
+        minimum = sum((i + 1) * counts[lvl] for i, lvl in enumerate(used))
+        try:
+            (plan,) = build_sections_batch([sec])
+        except ValueError:
+            assert round(pts * 10) < minimum, sec
+            rejected += 1
+            continue
+        assert sum(plan["tenths"]) == round(pts * 10), (sec, plan["tenths"])
+        check_levels(plan["codes"], plan["tenths"], {lvl: i for i, lvl in enumerate(order)})
+        ok += 1
+    return ok, rejected
+
+
+def run(sizes=SIZES, repeat=5):
+    results = []
+    for n in sizes:
+        for scheme in ["3단계", "5단계"]:
+            best = float("inf")
+            for r in range(repeat):
+                codes, tenths, rank = _case(n, scheme, r)
+                total = sum(tenths)
+                t0 = time.perf_counter()
+                out = _break_cross_difficulty_ties(codes, tenths, rank)
+                best = min(best, time.perf_counter() - t0)
+                assert sum(out) == total
+                check_levels(codes, out, rank)
+            results.append({"n": n, "scheme": scheme, "ms": best * 1000})
+    return results
+
+
+if __name__ == "__main__":
+    for row in run():
+        print(f"{row['scheme']} n={row['n']:>6}: {row['ms']:8.2f} ms  ({row['ms'] * 1000 / row['n']:.2f} µs/문항)")
+    feasible, infeasible = random_mixes()
+    print(f"무작위 조합: 가능 {feasible}개 통과 · 불가능 {infeasible}개 ValueError")
+    ok, rejected = random_sections()
+    print(f"build_sections_batch: {ok}개 통과 · 합계 부족 {rejected}개 ValueError")
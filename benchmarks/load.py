@@ -0,0 +1,138 @@
+"""
+여러 워커 부하 테스트 (블루프린트 STEP1 → STEP2 → STEP3 → STEP4)
+워커 수마다 uvicorn app:app --workers N 을 띄우고, 교사 여러 명이 동시에 네 단계를 끝까지 진행한다.
+요청마다 새 연결이라 단계마다 다른 워커로 갈 수 있다 — 서명한 상태가 이어지지 않으면 실패로 센다.
+- 처리량: 초당 끝낸 진행 수 (워커 1개 대비 배율)
+- 상태 오류가 하나라도 있으면 종료 코드 1, --min-speedup 을 주면 가장 많은 워커의 배율도 확인
+
+실행:
+    python -m benchmarks.load                         # 워커 1, 2, 4 · 동시 사용자 8 · 각 10초
+    python -m benchmarks.load --workers 1 4 --questions 500 --seconds 20 --min-speedup 2
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.startup import ROOT, _free_port, _wait_ok
+
+RUN = "/blueprint/gradio_api/run"
+TIMEOUT = 180
+
+
+def _post(base, endpoint, data):
+    req = urllib.request.Request(
+        f"{base}{RUN}/{endpoint}",
+        data=json.dumps({"data": data}).encode("utf-8"),
+        headers={"Content-Type": "application/json", "Connection": "close"},
+    )
+    with urllib.request.urlopen(req, timeout=60) as r:
+        return json.loads(r.read())["data"]
+
+
+def teacher_flow(base, questions):
+    """한 교사의 STEP1~4. 반환: 최종 요약이 제대로 나왔는지"""
+    mc_q, cr_q = str(questions), str(max(1, questions // 5))
+    out = _post(base, "on_step1", ["부하", mc_q, cr_q, "80", "20"])
+    stb = out[0]
+    out = _post(base, "on_step2", [stb, "3단계"])
+    sts, mc, cr = out[0], out[6:9], out[14:17]
+    out = _post(base, "on_step3_done", [stb, sts, *mc, *cr] + [None] * 10)
+    stc = out[0]
+    summary = _post(base, "on_final", [stb, stc])[0]
+    return f"총 문항수: **{questions + int(cr_q)}문항**" in summary
+
+
+def measure(workers, users, seconds, questions):
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    env = dict(os.environ, TS_WORKERS=str(workers), TS_LAZY_APPS="0", PYTHONWARNINGS="ignore")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.perf_counter() + TIMEOUT
+        # 워커마다 준비될 때까지 (새 연결은 아무 워커로나 간다)
+        for _ in range(4 * workers):
+            _wait_ok(base + "/blueprint/config", deadline, proc)
+        teacher_flow(base, questions)
+
+        done, failed, latencies = [0], [0], []
+        lock = threading.Lock()
+        stop = time.perf_counter() + seconds
+
+        def user():
+            while time.perf_counter() < stop:
+                t0 = time.perf_counter()
+                try:
+                    ok = teacher_flow(base, questions)
+                except (urllib.error.URLError, ConnectionError, TimeoutError, ValueError, KeyError):
+                    ok = False
+                with lock:
+                    if ok:
+                        done[0] += 1
+                        latencies.append(time.perf_counter() - t0)
+                    else:
+                        failed[0] += 1
+
+        t_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=users) as pool:
+            for _ in range(users):
+                pool.submit(user)
+        elapsed = time.perf_counter() - t_start
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+    return {
+        "flows_per_s": done[0] / elapsed,
+        "p50_s": statistics.median(latencies) if latencies else None,
+        "done": done[0],
+        "failed": failed[0],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--questions", type=int, default=200, help="객관식 문항 수 (STEP4 계산량)")
+    parser.add_argument("--min-speedup", type=float, default=None)
+    opts = parser.parse_args(argv)
+
+    print(f"CPU {os.cpu_count()}개 · 동시 사용자 {opts.users} · 객관식 {opts.questions}문항")
+    results = {}
+    for w in opts.workers:
+        res = results[w] = measure(w, opts.users, opts.seconds, opts.questions)
+        base = results[opts.workers[0]]["flows_per_s"]
+        speedup = res["flows_per_s"] / base if base else 0.0
+        p50 = f"{res['p50_s'] * 1000:.0f} ms" if res["p50_s"] is not None else "-"
+        print(
+            f"워커 {w:>2}: {res['flows_per_s']:7.2f} 진행/초  x{speedup:.2f}  "
+            f"p50 {p50}  완료 {res['done']} · 실패 {res['failed']}"
+        )
+
+    failed = sum(r["failed"] for r in results.values())
+    if failed:
+        print(f"상태 오류 · 실패 {failed}건")
+        return 1
+    if opts.min_speedup is not None and len(opts.workers) > 1:
+        top = results[opts.workers[-1]]["flows_per_s"] / results[opts.workers[0]]["flows_per_s"]
+        if top < opts.min_speedup:
+            print(f"배율 부족: x{top:.2f} < x{opts.min_speedup:.2f}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
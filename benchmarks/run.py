@@ -0,0 +1,183 @@
+"""
+블루프린트 · 카운터 엔진 벤치마크 (브라우저 없이 실행)
+문항 10 ~ 10,000개 규모에서 교사가 기다리는 핸들러들의 시간과 최대 메모리를 재고,
+저장된 JSON 기준값(benchmarks/baseline.json)과 비교해 회귀를 잡는다.
+
+실행:
+    python -m benchmarks.run                  # 측정 + 기준값 비교 (회귀 시 종료 코드 1)
+    python -m benchmarks.run --update         # 현재 측정값을 기준값으로 저장
+    python -m benchmarks.run --sizes 10 100   # 일부 규모만
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from apps.counter_12345 import CounterState, analyze_and_update, analyze_delta, create_table_html
+from apps.counter_patterns import detect_patterns
+from apps.counter_rebalance import rebalance_codes
+from apps.exam_blueprint import (
+    _auto_counts,
+    _counts_to_ratios,
+    _scheme_presets,
+    build_section,
+    final_outputs,
+    invalidate_plan_cache,
+    render_section_html,
+)
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+SIZES = [10, 100, 1000, 10000]
+# 기준값 대비 이 배수를 넘으면 회귀 (시간 · 메모리 공통)
+THRESHOLD = 1.5
+# 측정 시간이 너무 짧은 케이스는 잡음이 커서 절대 허용치를 둔다
+MIN_MS = 0.5
+MIN_TIME_PER_CASE = 0.2
+
+
+# ---------- 케이스 ----------
+def _section_args(n, scheme="3단계"):
+    curve, bias, pmap, order = _scheme_presets(scheme)
+    ratios = _counts_to_ratios(_auto_counts(n, scheme), n)
+    return (n, float(4 * n), scheme, ratios, curve, bias, pmap, "객관식"), order
+
+
+def _answers(n, seed=0):
+    rnd = random.Random(seed)
+    vals = [str(rnd.randint(1, 5)) for _ in range(n)]
+    for i in range(0, n, 37):
+        vals[i] = ""
+    for i in range(5, n, 53):
+        vals[i] = "7"
+    return vals
+
+
+def cases(sizes):
+    """(이름, 문항 수, 준비된 호출) 목록"""
+    out = []
+    for n in sizes:
+        args, order = _section_args(n)
+        plan = build_section(*args)
+        # 만점은 단계 순서를 지킬 수 있는 합계로 (문항당 0.1점 × 단계 이상)
+        stb = {"subject": "벤치", "mc_q": str(n), "cr_q": str(max(1, n // 5)),
+               "mc_pts": str(max(80, n)), "cr_pts": str(max(20, n // 5))}
+        stc = {"scheme": "3단계", "mc": _auto_counts(n, "3단계"),
+               "cr": _auto_counts(max(1, n // 5), "3단계")}
+        answers = _answers(n)
+        payload = json.dumps(answers)
+        packed = "".join(v if len(v) == 1 else "_" for v in answers)
+
+        state = CounterState(n)
+        state.load(answers)
+        state.painted = True
+        edits = [json.dumps({"rows": n, "sid": state.id, "changes": {"0": v}}) for v in ("2", "4")]
+
+        def delta(n=n, state=state, edits=edits):
+            # 한 칸씩 번갈아 고치는 증분 분석
+            edits.reverse()
+            return analyze_delta(str(n), edits[0], state)
+
+        def final(stb=stb, stc=stc):
+            invalidate_plan_cache()
+            return final_outputs(stb, stc)
+
+        out += [
+            ("blueprint.build_section", n, lambda args=args: build_section(*args)),
+            ("blueprint.render_section_html", n,
+             lambda plan=plan, order=order: render_section_html("객관식", plan, order, "mc")),
+            ("blueprint.final", n, final),
+            ("counter.create_table_html", n,
+             lambda n=n, answers=answers: create_table_html(n, answers, [3], [0], [5])),
+            ("counter.analyze_and_update", n,
+             lambda n=n, payload=payload: analyze_and_update(str(n), payload)),
+            ("counter.analyze_and_update_packed", n,
+             lambda n=n, packed=packed: analyze_and_update(str(n), packed)),
+            ("counter.analyze_delta", n, delta),
+            ("counter.rebalance", n, lambda state=state: rebalance_codes(state.codes, 5)),
+            ("counter.detect_patterns", n, lambda state=state: detect_patterns(state.codes, 5)),
+        ]
+    return out
+
+
+# ---------- 측정 ----------
+def _time_ms(fn):
+    fn()
+    samples = []
+    start = time.perf_counter()
+    while len(samples) < 3 or (time.perf_counter() - start < MIN_TIME_PER_CASE and len(samples) < 200):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def _peak_kb(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def run(sizes=SIZES):
+    results = {}
+    for name, n, fn in cases(sizes):
+        results[f"{name}[{n}]"] = {"ms": round(_time_ms(fn), 4), "peak_kb": round(_peak_kb(fn), 1)}
+    return results
+
+
+def compare(results, baseline, threshold):
+    """기준값 대비 회귀 목록 [(케이스, 항목, 기준, 현재)]"""
+    regressions = []
+    for key, cur in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        if cur["ms"] > max(base["ms"] * threshold, base["ms"] + MIN_MS):
+            regressions.append((key, "ms", base["ms"], cur["ms"]))
+        if cur["peak_kb"] > max(base["peak_kb"] * threshold, base["peak_kb"] + 64):
+            regressions.append((key, "peak_kb", base["peak_kb"], cur["peak_kb"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--update", action="store_true", help="기준값 파일 갱신")
+    parser.add_argument("--threshold", type=float, default=None)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    opts = parser.parse_args(argv)
+
+    results = run(opts.sizes)
+    stored = json.loads(opts.baseline.read_text(encoding="utf-8")) if opts.baseline.exists() else {}
+    threshold = opts.threshold or stored.get("threshold", THRESHOLD)
+    baseline = stored.get("results", {})
+
+    for key, cur in results.items():
+        base = baseline.get(key)
+        ratio = f"x{cur['ms'] / base['ms']:.2f}" if base and base["ms"] else "-"
+        print(f"{key:<42} {cur['ms']:>10.3f} ms {cur['peak_kb']:>10.1f} KB  {ratio}")
+
+    if opts.update:
+        baseline.update(results)
+        opts.baseline.write_text(
+            json.dumps({"threshold": threshold, "results": baseline}, ensure_ascii=False, indent=2) + "\n",
+            encoding="utf-8",
+        )
+        print(f"기준값 저장: {opts.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, threshold)
+    for key, field, base, cur in regressions:
+        print(f"회귀: {key} {field} {base} → {cur} (허용 x{threshold})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+콜드 스타트 벤치마크 (uvicorn 프로세스를 새로 띄워 첫 응답까지)
+즉시 모드 · 지연 모드(TS_LAZY_APPS=1) 각각 uvicorn app:app 을 띄우고
+- first_byte: 프로세스 시작부터 / 첫 200 응답까지 (바깥에서 잰 벽시계 시간)
+- subapps: /counter/ · /blueprint/ 까지 (지연 모드는 warm-up 또는 첫 요청 때 생성)
+를 재서 예산(BUDGETS)을 넘으면 종료 코드 1. 단계별 시간은 /_diag/startup 에서 가져와 함께 보여 준다.
+
+실행:
+    python -m benchmarks.startup                 # 두 모드, 각 3회 중앙값
+    python -m benchmarks.startup --modes lazy --runs 5
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# 모드별 예산 (초). 하위 앱 시간은 gradio 불러오기가 대부분이라 넉넉히
+BUDGETS = {
+    "eager": {"first_byte": 20.0, "subapps": 20.0},
+    "lazy": {"first_byte": 3.0, "subapps": 20.0},
+}
+MODE_ENV = {"eager": "0", "lazy": "1"}
+TIMEOUT = 120
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ok(url, deadline, proc):
+    while time.perf_counter() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"서버가 종료됨 (코드 {proc.returncode})")
+        try:
+            with urllib.request.urlopen(url, timeout=TIMEOUT) as r:
+                if r.status == 200:
+                    return r.read()
+        except (urllib.error.URLError, ConnectionError, TimeoutError):
+            time.sleep(0.02)
+    raise TimeoutError(url)
+
+
+def measure(mode):
+    """서버 한 번 띄워 {first_byte, subapps, phases} (초)"""
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    env = dict(os.environ, TS_LAZY_APPS=MODE_ENV[mode], TS_PROFILE_STARTUP="1", PYTHONWARNINGS="ignore")
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = t0 + TIMEOUT
+        _wait_ok(base + "/", deadline, proc)
+        first_byte = time.perf_counter() - t0
+        for path in ("/counter/", "/blueprint/"):
+            _wait_ok(base + path, deadline, proc)
+        subapps = time.perf_counter() - t0
+        report = json.loads(_wait_ok(base + "/_diag/startup", deadline, proc))
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+    return {"first_byte": first_byte, "subapps": subapps, "phases": report["phases"]}
+
+
+def run(modes, runs):
+    results = {}
+    for mode in modes:
+        samples = [measure(mode) for _ in range(runs)]
+        results[mode] = {
+            key: round(statistics.median(s[key] for s in samples), 3) for key in ("first_byte", "subapps")
+        }
+        results[mode]["phases"] = samples[-1]["phases"]
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--modes", nargs="+", choices=list(BUDGETS), default=list(BUDGETS))
+    parser.add_argument("--runs", type=int, default=3)
+    opts = parser.parse_args(argv)
+
+    over = []
+    for mode, res in run(opts.modes, opts.runs).items():
+        print(f"[{mode}] 첫 응답 {res['first_byte']:.2f}초 · 하위 앱까지 {res['subapps']:.2f}초")
+        for p in sorted(res["phases"], key=lambda p: -p["seconds"])[:8]:
+            print(f"    {p['name']:<24} {p['seconds']:>7.3f}초  (+{p['start']:.2f})")
+        for key, budget in BUDGETS[mode].items():
+            if res[key] > budget:
+                over.append(f"예산 초과: {mode} {key} {res[key]:.2f}초 > {budget:.2f}초")
+    for line in over:
+        print(line)
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,24 @@
+import pytest
+
+from apps import compute_pool
+
+
+class BrokenPool:
+    """submit 할 때마다 BrokenProcessPool 을 내는 계산 풀 (지금 프로세스로 넘어가는지 확인용)"""
+
+    def submit(self, *args):
+        raise compute_pool.BrokenProcessPool("gone")
+
+    def shutdown(self, **kwargs):
+        pass
+
+
+@pytest.fixture
+def shared_pool():
+    yield compute_pool.get_pool()
+    compute_pool.shutdown()
+
+
+@pytest.fixture
+def broken_pool(shared_pool, monkeypatch):
+    monkeypatch.setattr(compute_pool, "get_pool", lambda: BrokenPool())
@@ -0,0 +1,48 @@
+import random
+
+import pytest
+
+from apps.blueprint_batch import build_sections_batch
+from apps.exam_blueprint import _counts_to_ratios, _level_order, _scheme_presets, build_section
+
+
+def _sections(n_sections, seed=0):
+    rnd = random.Random(seed)
+    out = []
+    for _ in range(n_sections):
+        scheme = rnd.choice(["3단계", "5단계"])
+        order = _level_order(scheme)
+        curve, bias, pmap, _ = _scheme_presets(scheme)
+        n = rnd.randint(0, 60)
+        counts = {lvl: 0 for lvl in reversed(order)}
+        for _ in range(n):
+            counts[rnd.choice(order)] += 1
+        pts = round(rnd.uniform(0.0, 120.0), 1)
+        out.append((n, pts, scheme, _counts_to_ratios(counts, n), curve, bias, pmap, "객관식"))
+    return out
+
+
+def _feasible(sec):
+    try:
+        return build_section(*sec)
+    except ValueError:
+        return None
+
+
+def test_batch_matches_build_section():
+    sections = [sec for sec in _sections(3000) if _feasible(sec) is not None]
+    plans = build_sections_batch(sections, chunk_size=256)
+    assert plans == [build_section(*sec) for sec in sections]
+
+
+def test_infeasible_section_raises():
+    bad = next(sec for sec in _sections(3000, seed=1) if sec[0] and _feasible(sec) is None)
+    good = [sec for sec in _sections(50) if _feasible(sec) is not None]
+    with pytest.raises(ValueError):
+        build_sections_batch(good + [bad])
+
+
+def test_unknown_level_uses_section_path():
+    curve, bias, pmap, _ = _scheme_presets("3단계")
+    sec = (10, 30.0, "3단계", {"상": 0.3, "기타": 0.7}, curve, bias, pmap, "객관식")
+    assert build_sections_batch([sec]) == [build_section(*sec)]
@@ -0,0 +1,22 @@
+import pytest
+
+from apps.blueprint_sim import simulate_plans
+from apps.exam_blueprint import _auto_counts, _counts_to_ratios, _scheme_presets, build_section
+
+
+def _plans():
+    curve, bias, p_map, _ = _scheme_presets("3단계")
+    ratios = _counts_to_ratios(_auto_counts(20, "3단계"), 20)
+    return [build_section(20, 80.0, "3단계", ratios, curve, bias, p_map, "객관식")], p_map
+
+
+@pytest.mark.parametrize("n", [0, -5])
+def test_student_count_must_be_positive(n):
+    plans, p_map = _plans()
+    with pytest.raises(ValueError):
+        simulate_plans(plans, p_map, n_students=n)
+
+
+def test_single_student():
+    plans, p_map = _plans()
+    assert simulate_plans(plans, p_map, n_students=1)["n_students"] == 1
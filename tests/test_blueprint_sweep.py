@@ -0,0 +1,23 @@
+import math
+
+from apps.blueprint_sweep import sweep_heatmap_html, sweep_presets
+from apps.exam_blueprint import RATIOS_3
+
+# 20문항 3.0점: 세 단계로 나누면 최소 합계를 못 넘고, 한 단계에 몰면 만들 수 있다
+SPEC = {"mc_q": 20, "mc_pts": 3.0, "cr_q": 1, "cr_pts": 5, "scheme": "3단계"}
+RATIOS = {"기본": RATIOS_3, "하만": {"하": 1.0, "중": 0.0, "상": 0.0}}
+
+
+def test_infeasible_combination_is_marked_not_fatal():
+    result = sweep_presets(SPEC, ratios=RATIOS, target_mean=2.0)
+    by_ratio = {row["ratios"]: row for row in result["table"]}
+    assert not by_ratio["기본"]["feasible"] and math.isnan(by_ratio["기본"]["mean"])
+    assert by_ratio["하만"]["feasible"] and by_ratio["하만"]["mean"] > 0
+    assert [row["ratios"] for row in result["best"]] == ["하만"]
+    assert "—" in sweep_heatmap_html(result, rows="ratios", cols="curve")
+
+
+def test_pool_path_marks_the_same_combinations():
+    local = sweep_presets(SPEC, ratios=RATIOS)
+    pooled = sweep_presets(SPEC, ratios=RATIOS, processes=2)
+    assert [r["feasible"] for r in pooled["table"]] == [r["feasible"] for r in local["table"]]
@@ -0,0 +1,23 @@
+from apps.counter_bulk import CHUNK_KEYS, analyze_bulk, bulk_report_html
+
+ROWS = [(f"시험{i}", [str((i + j) % 4 + 1) for j in range(20)] + ["5", ""]) for i in range(CHUNK_KEYS * 3 + 7)]
+
+
+def test_choice_count_follows_k():
+    report = analyze_bulk(ROWS[:3], k=4, use_pool=False)
+    assert list(report["choice_totals"]) == [1, 2, 3, 4]
+    exam = report["exams"][0]
+    assert exam["invalid"] == [21] and exam["empty"] == [22]
+    assert "5번" not in bulk_report_html(report)
+    report = analyze_bulk(ROWS[:3], k=5, use_pool=False)
+    assert report["exams"][0]["invalid"] == []
+
+
+def test_pool_matches_in_process(shared_pool):
+    pooled = analyze_bulk(ROWS, k=4, use_pool=True)
+    assert [e["name"] for e in pooled["exams"]] == [name for name, _ in ROWS]
+    assert pooled == analyze_bulk(ROWS, k=4, use_pool=False)
+
+
+def test_broken_pool_falls_back(broken_pool):
+    assert analyze_bulk(ROWS, k=4, use_pool=True) == analyze_bulk(ROWS, k=4, use_pool=False)
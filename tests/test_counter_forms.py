@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from apps.counter_forms import MAX_FORMS, PARALLEL_MIN_FORMS, generate_forms, stream_forms
+from apps.counter_12345 import CounterState
+
+MASTER = [str(v) for v in np.random.default_rng(0).integers(1, 6, size=30)]
+
+
+def test_pool_forms_match_in_process(shared_pool):
+    n = PARALLEL_MIN_FORMS + 5
+    pooled = generate_forms(MASTER, n, use_pool=True)
+    local = generate_forms(MASTER, n, use_pool=False)
+    assert [f["index"] for f in pooled] == list(range(n))
+    assert pooled == local
+
+
+def test_broken_pool_falls_back(broken_pool):
+    forms = generate_forms(MASTER, 40, use_pool=True)
+    assert forms == generate_forms(MASTER, 40, use_pool=False)
+
+
+@pytest.mark.parametrize("n", [0, MAX_FORMS + 1])
+def test_form_count_capped(n):
+    with pytest.raises(ValueError):
+        generate_forms(MASTER, n)
+    state = CounterState(len(MASTER))
+    state.load(MASTER)
+    out = list(stream_forms(state, n, ""))
+    assert len(out) == 1 and "🚫" in out[0]
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from apps.counter_patterns import STEP_MIN_LEN, PatternTracker, detect_patterns
+
+N_KEYS = 1000
+N_QUESTIONS = 30
+
+
+def _random_keys(k, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.integers(1, k + 1, size=(N_KEYS, N_QUESTIONS))
+
+
+@pytest.mark.parametrize("k", [2, 3, 4])
+def test_step_check_skipped_below_min_len(k):
+    # 2~4지선다에서는 1-2, 1-2-3 같은 줄이 흔하므로 순서 경고를 내지 않는다
+    fired = sum(bool(detect_patterns(key, k)["steps"]) for key in _random_keys(k))
+    assert fired == 0
+
+
+@pytest.mark.parametrize("k", [5, 6, 10])
+def test_step_warning_rare_on_random_keys(k):
+    fired = sum(bool(detect_patterns(key, k)["steps"]) for key in _random_keys(k))
+    assert fired / N_KEYS < 0.03
+
+
+def test_step_detected_at_min_len():
+    codes = [2, 4, 1, 2, 3, 4, 5, 2, 5, 3, 1, 4]
+    steps = detect_patterns(codes, 5)["steps"]
+    assert steps == [(2, STEP_MIN_LEN, [1, 2, 3, 4, 5])]
+    assert detect_patterns([5, 4, 3, 2, 1, 3], 5)["steps"] == [(0, 5, [5, 4, 3, 2, 1])]
+
+
+def test_short_step_not_flagged():
+    assert detect_patterns([1, 2, 3, 4, 1, 3], 5)["steps"] == []
+    assert detect_patterns([1, 2, 1, 2, 2, 1], 2)["steps"] == []
+
+
+@pytest.mark.parametrize("n, k", [(7, 5), (60, 4), (300, 5), (2000, 6)])
+def test_tracker_matches_full_detection(n, k):
+    # 무작위 편집(한 칸 · 여러 칸 · 반복 단위 덮어쓰기) 뒤마다 전체 탐지와 같아야 한다
+    rng = np.random.default_rng(n)
+    alphabet = np.arange(-1, k + 1)
+    codes = rng.choice(alphabet[: rng.integers(3, k + 3)], size=n).astype(np.int16)
+    tracker = PatternTracker(codes, k)
+    for _ in range(200):
+        if rng.random() < 0.3:
+            start = int(rng.integers(n))
+            idxs = list(range(start, min(n, start + int(rng.integers(1, 13)))))
+            unit = rng.integers(1, k + 1, size=int(rng.integers(1, 5)))
+            codes[idxs] = np.resize(unit, len(idxs))
+        else:
+            idxs = rng.integers(n, size=int(rng.choice([1, 1, 2, 3, 20]))).tolist()
+            codes[idxs] = rng.choice(alphabet, size=len(idxs))
+        before = set(tracker.cells)
+        flips = tracker.update(codes, idxs)
+        full = detect_patterns(codes, k)
+        assert tracker.patterns() == {kind: v for kind, v in full.items() if kind != "cells"}
+        assert tracker.cells == set(full["cells"])
+        assert flips == before ^ tracker.cells
@@ -0,0 +1,22 @@
+import time
+
+import pytest
+
+from apps.counter_rebalance import parse_locked
+
+
+def test_parse_locked_ranges():
+    assert parse_locked("3, 7 12-14 20~18", 30) == {2, 6, 11, 12, 13, 17, 18, 19}
+    assert parse_locked("0-2, 29-40", 30) == {0, 1, 28, 29}
+    assert parse_locked("", 30) == set()
+
+
+def test_parse_locked_huge_range_is_clamped():
+    t0 = time.perf_counter()
+    assert parse_locked("1-50000000000, 99999999999999", 100) == set(range(100))
+    assert time.perf_counter() - t0 < 0.5
+
+
+def test_parse_locked_rejects_garbage():
+    with pytest.raises(ValueError):
+        parse_locked("3, x", 30)
@@ -0,0 +1,56 @@
+import json
+
+import numpy as np
+
+from apps import counter_12345 as counter
+from apps.counter_12345 import CounterState, analyze_delta, dump_counter_state, load_counter_state
+
+
+def _other_worker(token):
+    # 다른 워커: 최근 상태 캐시 없이 토큰에서 다시 만든다
+    counter._live_states.clear()
+    return load_counter_state(token)
+
+
+def _edit(state, changes):
+    delta = json.dumps({"rows": state.nq, "sid": state.id, "changes": changes})
+    return analyze_delta(str(state.nq), delta, state)
+
+
+def test_token_round_trip():
+    state = CounterState(8, 4)
+    state.load(["1", "2", "", "x", "12", "3", "3", "0"])
+    state.highlight = [3]
+    state.painted = True
+    loaded = _other_worker(dump_counter_state(state))
+    assert loaded is not state
+    assert (loaded.id, loaded.nq, loaded.k, loaded.values) == (state.id, 8, 4, state.values)
+    assert np.array_equal(loaded.codes, state.codes)
+    assert loaded.highlight == [3] and loaded.painted
+    assert loaded.pattern == state.pattern
+
+
+def test_tampered_or_empty_token_is_dropped():
+    state = CounterState(5)
+    token = dump_counter_state(state)
+    body, _, sig = token.partition(".")
+    assert _other_worker(body + "." + sig[::-1]) is None
+    assert _other_worker("") is None
+    assert dump_counter_state(None) == ""
+
+
+def test_edits_continue_on_another_worker():
+    rng = np.random.default_rng(0)
+    values = [str(v) for v in rng.integers(1, 6, size=60)]
+    local, remote = CounterState(60), CounterState(60)
+    local.load(values)
+    remote.load(values)
+    remote.id = local.id
+    _edit(local, {})
+    token = dump_counter_state(_edit(remote, {})[-1])
+    for _ in range(30):
+        changes = {str(int(i)): str(int(v)) for i, v in zip(rng.integers(60, size=2), rng.integers(1, 6, size=2))}
+        expected = _edit(local, changes)
+        got = _edit(_other_worker(token), changes)
+        assert got[1:5] == expected[1:5]
+        token = dump_counter_state(got[-1])
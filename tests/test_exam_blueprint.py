@@ -0,0 +1,72 @@
+import random
+
+import pytest
+
+from apps.exam_blueprint import (
+    _auto_counts,
+    _break_cross_difficulty_ties,
+    _counts_to_ratios,
+    _level_order,
+    _scheme_presets,
+    build_section,
+)
+
+
+def _levels(codes, tenths, rank):
+    out = {}
+    for c, t in zip(codes, tenths):
+        out.setdefault(rank[c], []).append(t)
+    return [sorted(out[r]) for r in sorted(out)]
+
+
+def test_valid_plan_comes_back_unchanged():
+    rnd = random.Random(0)
+    rank = {lvl: i for i, lvl in enumerate(_level_order("5단계"))}
+    for _ in range(500):
+        codes = [rnd.choice(list(rank)) for _ in range(rnd.randint(1, 40))]
+        base = {r: rnd.randint(1, 5) + 10 * r for r in range(5)}
+        tenths = [base[rank[c]] + rnd.randint(0, 4) for c in codes]
+        out = _break_cross_difficulty_ties(codes, list(tenths), rank, sum(tenths))
+        assert out == tenths
+
+
+def test_overlap_moves_only_what_it_needs():
+    # 하 9 9 10 11 11 / 중 11 … : 하 를 1.0 으로 깎은 만큼 중 에 얹으면 된다 (중 을 1.2 로 올릴 필요 없음)
+    scheme = "3단계"
+    curve, bias, p_map, order = _scheme_presets(scheme)
+    ratios = _counts_to_ratios(_auto_counts(17, scheme), 17)
+    plan = build_section(17, 20.0, scheme, ratios, curve, bias, p_map, "객관식")
+    levels = _levels(plan["codes"], plan["tenths"], {lvl: i for i, lvl in enumerate(order)})
+    assert levels[0][-1] == 10 and levels[1][0] == 11
+    assert sum(plan["tenths"]) == 200
+
+
+@pytest.mark.parametrize("scheme", ["3단계", "5단계"])
+def test_levels_strictly_increase_on_total(scheme):
+    rnd = random.Random(1)
+    order = _level_order(scheme)
+    rank = {lvl: i for i, lvl in enumerate(order)}
+    for _ in range(500):
+        codes = [rnd.choice(order) for _ in range(rnd.randint(2, 40))]
+        tenths = [rnd.randint(1, 30) for _ in codes]
+        try:
+            out = _break_cross_difficulty_ties(codes, list(tenths), rank, sum(tenths))
+        except ValueError:
+            continue
+        levels = _levels(codes, out, rank)
+        assert sum(out) == sum(tenths)
+        assert all(a[-1] < b[0] for a, b in zip(levels, levels[1:]))
+
+
+def test_cached_section_builds_from_the_rounded_total():
+    from apps.exam_blueprint import cached_section, invalidate_plan_cache
+
+    # 5문항 6.96점은 반올림 전 값으로 만들면 7.0점과 배점이 다르다 — 같은 키를 쓰므로 7.0점 계획이어야 한다
+    curve, bias, p_map, order = _scheme_presets("3단계")
+    ratios = _counts_to_ratios(_auto_counts(5, "3단계"), 5)
+    expected = build_section(5, 7.0, "3단계", ratios, curve, bias, p_map, "객관식")
+    for totals in [(6.96, 7.0), (7.0, 6.96)]:
+        invalidate_plan_cache()
+        for pts in totals:
+            plan, _ = cached_section(5, pts, "3단계", ratios, curve, bias, p_map, "객관식", order, "mc")
+            assert plan == expected
@@ -0,0 +1,51 @@
+import os
+import stat
+
+import pytest
+
+from apps.session_state import SECRET_NAME, _shared_secret, dump_state, load_state
+
+
+def test_key_created_private_and_reused(tmp_path):
+    directory = tmp_path / "keys"
+    key = _shared_secret(str(directory))
+    assert len(key) == 32
+    assert stat.S_IMODE(os.stat(directory).st_mode) == 0o700
+    assert stat.S_IMODE(os.stat(directory / SECRET_NAME).st_mode) == 0o600
+    assert _shared_secret(str(directory)) == key
+    assert os.listdir(directory) == [SECRET_NAME]
+
+
+def test_open_directory_rejected(tmp_path):
+    directory = tmp_path / "keys"
+    directory.mkdir(mode=0o755)
+    os.chmod(directory, 0o755)
+    with pytest.raises(RuntimeError):
+        _shared_secret(str(directory))
+
+
+def test_planted_key_rejected(tmp_path):
+    directory = tmp_path / "keys"
+    directory.mkdir(mode=0o700)
+    planted = directory / SECRET_NAME
+    planted.write_bytes(b"k" * 32)
+    os.chmod(planted, 0o644)
+    with pytest.raises(RuntimeError):
+        _shared_secret(str(directory))
+
+
+def test_symlinked_key_rejected(tmp_path):
+    directory = tmp_path / "keys"
+    directory.mkdir(mode=0o700)
+    target = tmp_path / "elsewhere"
+    target.write_bytes(b"k" * 32)
+    os.chmod(target, 0o600)
+    os.symlink(target, directory / SECRET_NAME)
+    with pytest.raises(OSError):
+        _shared_secret(str(directory))
+
+
+def test_signed_round_trip():
+    token = dump_state({"mc_q": "23"})
+    assert load_state(token, {}) == {"mc_q": "23"}
+    assert load_state(token[:-2] + "xx", {}) == {}